@@ -1,9 +1,14 @@
 from google.adk.agents import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset, SseConnectionParams
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
 import os
 from dotenv import load_dotenv
+from adk_extensions.line_delivery import LineDeliveryQueue, LineDeliveryToolset, without_push_tools
+from adk_extensions.line_flex import listing_carousel_tool, repair_flex_before_tool
+from adk_extensions.mcp_cache import CachingToolset, airbnb_cache_ttls
+from adk_extensions.mcp_gateway import create_mcp_toolset
+from adk_extensions.mcp_projection import ProjectingToolset, airbnb_projections
+from adk_extensions.tool_concurrency import ConcurrencyLimitedToolset
 
 # Load environment variables
 load_dotenv()
@@ -16,7 +21,9 @@ if not CHANNEL_ACCESS_TOKEN or not DESTINATION_USER_ID:
     print("⚠️  Warning: CHANNEL_ACCESS_TOKEN or DESTINATION_USER_ID not set in .env file")
     print("LINE Bot MCP toolset will not be available.") 
 
-airbnb_mcp_toolset = MCPToolset(
+# Shared MCP gateway when MCP_GATEWAY_URL is set, otherwise MCP_POOL_SIZE warm npx processes per toolset
+airbnb_mcp_server = create_mcp_toolset(
+    "airbnb",
     connection_params=StdioConnectionParams(
         server_params=StdioServerParameters(
             command="npx",
@@ -29,7 +36,23 @@ airbnb_mcp_toolset = MCPToolset(
     ),
 )
 
-line_bot_mcp_toolset = MCPToolset(
+# Several lookups from one model turn run in parallel (MCP_MAX_PARALLEL_CALLS at a time),
+# results are cut down to the fields the agent uses, and since search and listing
+# results are read-only, repeat calls are served from cache
+airbnb_mcp_toolset = CachingToolset(
+    ProjectingToolset(
+        ConcurrencyLimitedToolset(airbnb_mcp_server, name="airbnb"),
+        projections=airbnb_projections(),
+    ),
+    ttls=airbnb_cache_ttls(),
+)
+
+# LINE pushes go through a background delivery queue (batched, rate-limited, retried) so the
+# agent turn does not wait for the LINE API; LINE_DELIVERY_MODE=mcp pushes through the MCP server
+LINE_DELIVERY_QUEUE = os.getenv("LINE_DELIVERY_MODE", "queue") == "queue"
+
+line_bot_mcp_toolset = ConcurrencyLimitedToolset(create_mcp_toolset(
+    "line_bot",
     connection_params=StdioConnectionParams(
         server_params=StdioServerParameters(
             command="npx",
@@ -43,6 +66,13 @@ line_bot_mcp_toolset = MCPToolset(
             },
         ),
     ),
+    tool_filter=without_push_tools if LINE_DELIVERY_QUEUE else None,
+), name="line_bot")
+
+line_push_toolset = (
+    LineDeliveryToolset(LineDeliveryQueue.from_env(), default_user_id=DESTINATION_USER_ID)
+    if LINE_DELIVERY_QUEUE
+    else line_bot_mcp_toolset
 )
 
 agent_instruction_prompt = """
@@ -54,16 +84,10 @@ agent_instruction_prompt = """
 - และหากลูกต้าขอข้อมูลที่พักใดเป็นพิเศษให้ดึงจาก Airbnb ได้ ด้วย airbnb_mcp_toolset
 - แนะนำตัวเลือกที่เหมาะสมอย่างสุภาพและเข้าใจง่าย  
 - ตอบกลับเป็นภาษาเดียวกับที่ผู้ใช้ใช้ในการสนทนา 
-- เมื่อผู้ใช้ต้องการรับผลใน LINE ให้สร้าง Flex Message เท่านั้น 
-    -  ให้สร้าง Flex Message ตาม สเปค LINE Flex Message อย่างเคร่งครัด (มี type, altText, contents, และโครงสร้าง bubble/carousel ถูกต้อง) 
-    - และใช้เครื่องมือ line_bot_mcp_toolset ในการส่ง Flex Message
-
-ข้อจำกัด Flex:
-- altText ต้องมี (สูงสุด ~400 ตัวอักษร)
-- carousel.contents สูงสุด 12 bubbles
-- รูปใน hero ไม่มีไม่เป็นไร
-- ใช้ wrap: true กับข้อความยาว
-- หลีกเลี่ยงข้อความยาวเกินไปใน text เดียว ให้แบ่งเป็นหลายบรรทัด
+- เมื่อผู้ใช้ต้องการรับผลที่พักใน LINE ให้ใช้เครื่องมือ push_listing_carousel
+    - ส่งเฉพาะข้อมูลที่พัก (name, price, rating, location, url, image_url) และ alt_text สั้น ๆ
+    - ไม่ต้องเขียน JSON ของ Flex Message เอง ระบบจะสร้าง carousel ให้ตามสเปค LINE
+- ข้อความอื่นใน LINE ให้ใช้เครื่องมือ line_bot_mcp_toolset ได้ตามปกติ
 """
 
 root_agent = Agent(
@@ -71,5 +95,12 @@ root_agent = Agent(
     name='travel_manager',
     description="Travel Agent Manager",
     instruction=agent_instruction_prompt,
-    tools=[airbnb_mcp_toolset, line_bot_mcp_toolset],
+    tools=[
+        airbnb_mcp_toolset,
+        line_bot_mcp_toolset,
+        *([line_push_toolset] if LINE_DELIVERY_QUEUE else []),
+        listing_carousel_tool(line_push_toolset),
+    ],
+    # Flex Messages the model writes itself are checked and repaired before LINE sees them
+    before_tool_callback=repair_flex_before_tool,
 )
\ No newline at end of file
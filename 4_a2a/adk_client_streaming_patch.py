@@ -8,65 +8,153 @@ Import this module BEFORE importing agent.py to ensure patches are applied.
 """
 
 import logging
+import os
+import sys
+import time
+
+# Make the shared adk_extensions package (project root) importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from adk_extensions.metrics import REGISTRY  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
+A2A_HANDLE_SECONDS = REGISTRY.histogram(
+    "a2a_client_handle_response_seconds",
+    "Time spent converting one A2A response into an ADK event.",
+    labelnames=("agent", "kind"),
+)
+A2A_FIRST_CHUNK_SECONDS = REGISTRY.histogram(
+    "a2a_remote_time_to_first_chunk_seconds",
+    "Time from delegating to a remote A2A agent until its first response arrives.",
+    labelnames=("agent",),
+)
+A2A_CHUNK_GAP_SECONDS = REGISTRY.histogram(
+    "a2a_remote_inter_chunk_seconds",
+    "Gap between consecutive streamed responses from a remote A2A agent.",
+    labelnames=("agent",),
+)
+A2A_DELEGATION_SECONDS = REGISTRY.histogram(
+    "a2a_remote_delegation_seconds",
+    "Total duration of one delegation to a remote A2A agent.",
+    labelnames=("agent",),
+)
+
+# invocation_id -> [delegation start, last response arrival]
+_delegation_clock: dict[str, list[float]] = {}
+
+# invocation_id -> Event holding the fields shared by every partial event of a delegation
+_event_templates: dict = {}
+
+
+def _observe_arrival(agent_name: str, invocation_id: str) -> None:
+    clock = _delegation_clock.get(invocation_id)
+    if clock is None:
+        return
+    now = time.perf_counter()
+    if clock[1] is None:
+        A2A_FIRST_CHUNK_SECONDS.observe(now - clock[0], agent=agent_name)
+    else:
+        A2A_CHUNK_GAP_SECONDS.observe(now - clock[1], agent=agent_name)
+    clock[1] = now
+
 
 def apply_remote_agent_streaming_patch():
     """Patch RemoteA2aAgent to handle partial streaming events."""
     try:
         from google.adk.agents import remote_a2a_agent
         from google.adk.events import Event
+        from google.adk.events.event_actions import EventActions
         from google.genai import types as genai_types
-        from a2a.types import TaskArtifactUpdateEvent
+        from a2a.types import TaskArtifactUpdateEvent, TextPart
+        
+        # Copying these is much cheaper than validating a new Part/Content per token
+        text_part_template = genai_types.Part(text="")
+        content_template = genai_types.Content(role="model", parts=[])
         
         # Store original _handle_a2a_response method
         original_handle_response = remote_a2a_agent.RemoteA2aAgent._handle_a2a_response
+        original_run_async_impl = remote_a2a_agent.RemoteA2aAgent._run_async_impl
+        
+        async def timed_run_async_impl(self, ctx):
+            """Time the whole delegation and the arrival of each remote response."""
+            _delegation_clock[ctx.invocation_id] = [time.perf_counter(), None]
+            try:
+                with A2A_DELEGATION_SECONDS.time(agent=self.name):
+                    async for event in original_run_async_impl(self, ctx):
+                        yield event
+            finally:
+                _delegation_clock.pop(ctx.invocation_id, None)
+                _event_templates.pop(ctx.invocation_id, None)
+        
+        async def timed_handle_a2a_response(self, a2a_response, ctx):
+            """Time the conversion of each A2A response and record its arrival."""
+            _observe_arrival(self.name, ctx.invocation_id)
+            start = time.perf_counter()
+            event = await patched_handle_a2a_response(self, a2a_response, ctx)
+            kind = "partial" if event is not None and event.partial else "full"
+            A2A_HANDLE_SECONDS.observe(time.perf_counter() - start, agent=self.name, kind=kind)
+            return event
+        
+        def partial_event_template(self, ctx):
+            """Event with this delegation's invocation/author/branch, built once per delegation."""
+            template = _event_templates.get(ctx.invocation_id)
+            if template is None:
+                template = Event(
+                    invocation_id=ctx.invocation_id,
+                    author=self.name,
+                    branch=ctx.branch,
+                    partial=True,
+                )
+                if ctx.invocation_id in _delegation_clock:
+                    _event_templates[ctx.invocation_id] = template
+            return template
+        
+        def artifact_text(artifact):
+            """Text of the artifact's text parts, merged into one string."""
+            texts = []
+            for part in artifact.parts:
+                # A2A parts are Part(root=TextPart | FilePart | DataPart)
+                root = getattr(part, 'root', part)
+                if type(root) is TextPart and root.text:
+                    texts.append(root.text)
+            return texts[0] if len(texts) == 1 else "".join(texts)
         
         async def patched_handle_a2a_response(self, a2a_response, ctx):
             """Patched version that handles streaming artifact updates with partial flag."""
-            # Check if this is a streaming artifact update (tuple with TaskArtifactUpdateEvent)
+            # Streaming artifact update: (task, TaskArtifactUpdateEvent) with append=True
             if isinstance(a2a_response, tuple) and len(a2a_response) >= 2:
-                task, last_update = a2a_response[0], a2a_response[1]
-                
-                # Handle TaskArtifactUpdateEvent with append=True (partial streaming)
-                if isinstance(last_update, TaskArtifactUpdateEvent):
-                    is_partial = last_update.append and not last_update.last_chunk
-                    
-                    if is_partial:
-                        # Create event directly from the artifact update
-                        parts = []
-                        if last_update.artifact and last_update.artifact.parts:
-                            for part in last_update.artifact.parts:
-                                # Handle Part(root=TextPart(...)) structure from A2A
-                                text_content = None
-                                
-                                # Try direct text attribute
-                                if hasattr(part, 'text') and part.text:
-                                    text_content = part.text
-                                # Try root.text (Part wrapping TextPart)
-                                elif hasattr(part, 'root') and hasattr(part.root, 'text'):
-                                    text_content = part.root.text
-                                
-                                if text_content:
-                                    parts.append(genai_types.Part.from_text(text=text_content))
-                        
-                        if parts:
-                            event = Event(
-                                invocation_id=ctx.invocation_id,
-                                author=self.name,
-                                branch=ctx.branch,
-                                content=genai_types.Content(role="model", parts=parts),
-                                partial=True,  # Mark as partial!
-                            )
-                            return event
+                last_update = a2a_response[1]
+                if (
+                    isinstance(last_update, TaskArtifactUpdateEvent)
+                    and last_update.append
+                    and not last_update.last_chunk
+                    and last_update.artifact
+                    and last_update.artifact.parts
+                ):
+                    text = artifact_text(last_update.artifact)
+                    if text:
+                        content = content_template.model_copy(
+                            update={"parts": [text_part_template.model_copy(update={"text": text})]}
+                        )
+                        return partial_event_template(self, ctx).model_copy(
+                            update={
+                                "id": Event.new_id(),
+                                "timestamp": time.time(),
+                                "content": content,
+                                "actions": EventActions(),
+                            }
+                        )
             
             # Fall back to original handler for non-partial events
             event = await original_handle_response(self, a2a_response, ctx)
             return event
         
         # Apply the patch
-        remote_a2a_agent.RemoteA2aAgent._handle_a2a_response = patched_handle_a2a_response
+        remote_a2a_agent.RemoteA2aAgent._handle_a2a_response = timed_handle_a2a_response
+        remote_a2a_agent.RemoteA2aAgent._run_async_impl = timed_run_async_impl
         logger.info("✅ Applied RemoteA2aAgent streaming patch")
         return True
         
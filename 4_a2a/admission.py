@@ -0,0 +1,186 @@
+"""
+Admission Control Module
+
+Bounds how many agent turns the gateway runs at once.
+
+Every turn fans out to Gemini and to the remote travel agent, so accepting
+every request under a burst slows everybody down. ``AdmissionController``
+admits a turn only while both the global limit and the user's own limit have
+room; everyone else waits in one FIFO queue (a user at their limit does not
+block the users behind them) and is rejected after a timeout or when the
+queue is full. Waiting callers are told their queue position so the gateway
+can stream ``queued`` events.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter, deque
+from typing import AsyncGenerator
+
+from adk_extensions.metrics import REGISTRY
+
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "gateway_admission_wait_seconds",
+    "Time a turn waited in the admission queue before it started.",
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "gateway_admission_rejected_total",
+    "Turns rejected by admission control.",
+    labelnames=("reason",),
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a turn cannot be admitted (queue full or wait timed out)."""
+
+
+class _Waiter:
+    __slots__ = ("user_id", "admitted", "moved", "enqueued_at")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.admitted = asyncio.get_running_loop().create_future()
+        self.moved = asyncio.Event()
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """Global + per-user in-flight limits with a fair, bounded wait queue."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        max_per_user: int = 2,
+        max_queue: int = 100,
+        queue_timeout: float = 30.0,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self._per_user: Counter[str] = Counter()
+        self._queue: list[_Waiter] = []
+
+        self.admitted_total = 0
+        self.queued_total = 0
+        self.rejected_total: Counter[str] = Counter()
+        self.wait_seconds_sum = 0.0
+        self._recent_waits: deque[float] = deque(maxlen=1000)
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "16")),
+            max_per_user=int(os.getenv("ADMISSION_MAX_PER_USER", "2")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "100")),
+            queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30")),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def _has_room(self, user_id: str) -> bool:
+        return self.in_flight < self.max_in_flight and self._per_user[user_id] < self.max_per_user
+
+    def _grant(self, user_id: str, waited: float) -> None:
+        self.in_flight += 1
+        self._per_user[user_id] += 1
+        self.admitted_total += 1
+        self.wait_seconds_sum += waited
+        self._recent_waits.append(waited)
+        ADMISSION_WAIT_SECONDS.observe(waited)
+
+    def _admit_waiting(self) -> None:
+        """Admit queued callers in FIFO order, skipping users that are at their limit."""
+        moved = False
+        for waiter in list(self._queue):
+            if self.in_flight >= self.max_in_flight:
+                break
+            if self._has_room(waiter.user_id):
+                self._queue.remove(waiter)
+                self._grant(waiter.user_id, time.monotonic() - waiter.enqueued_at)
+                waiter.admitted.set_result(True)
+                moved = True
+        if moved:
+            for waiter in self._queue:
+                waiter.moved.set()
+
+    async def acquire(self, user_id: str) -> AsyncGenerator[int, None]:
+        """Wait for a slot, yielding the 1-based queue position whenever it changes.
+
+        Yields nothing when a slot is free right away. Once the generator is
+        exhausted the caller holds a slot and must call ``release``.
+        """
+        # Waiters that could run are admitted as soon as a slot frees up, so the
+        # ones still queued are all stuck at their own per-user limit.
+        if self._has_room(user_id) and not any(self._has_room(w.user_id) for w in self._queue):
+            self._grant(user_id, 0.0)
+            return
+        if len(self._queue) >= self.max_queue:
+            self.rejected_total["queue_full"] += 1
+            ADMISSION_REJECTED.inc(reason="queue_full")
+            raise AdmissionRejected("Server is busy, please retry shortly")
+
+        waiter = _Waiter(user_id)
+        self._queue.append(waiter)
+        self.queued_total += 1
+        deadline = waiter.enqueued_at + self.queue_timeout
+        handed_over = False
+        last_position = 0
+        try:
+            while not waiter.admitted.done():
+                position = self._queue.index(waiter) + 1
+                if position != last_position:
+                    last_position = position
+                    yield position
+                waiter.moved.clear()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                moved = asyncio.ensure_future(waiter.moved.wait())
+                await asyncio.wait({waiter.admitted, moved}, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                moved.cancel()
+            if not waiter.admitted.done():
+                self.rejected_total["timeout"] += 1
+                ADMISSION_REJECTED.inc(reason="timeout")
+                raise AdmissionRejected(f"Timed out after {self.queue_timeout:.0f}s in queue")
+            handed_over = True
+        finally:
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+                for other in self._queue:
+                    other.moved.set()
+            elif not handed_over:
+                # Admitted, but the caller went away before it could use the slot
+                self.release(user_id)
+
+    def release(self, user_id: str) -> None:
+        """Return a slot and admit whoever can run next."""
+        self.in_flight -= 1
+        self._per_user[user_id] -= 1
+        if self._per_user[user_id] <= 0:
+            del self._per_user[user_id]
+        self._admit_waiting()
+
+    def stats(self) -> dict:
+        waits = sorted(self._recent_waits)
+
+        def percentile(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3) if waits else 0.0
+
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_in_flight": self.max_in_flight,
+            "max_per_user": self.max_per_user,
+            "admitted_total": self.admitted_total,
+            "queued_total": self.queued_total,
+            "rejected_total": dict(self.rejected_total),
+            "wait_seconds_sum": round(self.wait_seconds_sum, 3),
+            "wait_seconds_p50": percentile(0.50),
+            "wait_seconds_p95": percentile(0.95),
+        }
@@ -1,14 +1,28 @@
 # Apply ADK client streaming patch BEFORE any ADK imports
 import adk_client_streaming_patch  # noqa: F401
 
+import os
+
 from google.adk.agents import LlmAgent
 from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 from a2a.client.client import ClientConfig as A2AClientConfig
 from a2a.client.client_factory import ClientFactory as A2AClientFactory
+from adk_extensions.a2a_transport import create_a2a_httpx_client_from_env
+
+# Travel agent replicas; requests are balanced across all of them
+TRAVEL_AGENT_URLS = [
+    url.strip().rstrip("/")
+    for url in os.getenv("A2A_TRAVEL_AGENT_URLS", "http://localhost:8001").split(",")
+    if url.strip()
+]
 
-# Create A2A client factory with streaming enabled
-a2a_client_config = A2AClientConfig(streaming=True)
+# Create A2A client factory with streaming enabled, on a pooled keep-alive
+# client that also caches the agent card (see A2A_HTTP_* in .env.example)
+a2a_client_config = A2AClientConfig(
+    streaming=True,
+    httpx_client=create_a2a_httpx_client_from_env(endpoints=TRAVEL_AGENT_URLS),
+)
 a2a_client_factory = A2AClientFactory(config=a2a_client_config)
 
 # Remote Travel Agent (A2A sub-agent) with streaming enabled
@@ -18,7 +32,7 @@ remote_travel_agent = RemoteA2aAgent(
         "ผู้ช่วยการท่องเที่ยวที่เชี่ยวชาญด้านการวางแผนการเดินทางและค้นหาที่พัก Airbnb "
         "สามารถค้นหาที่พัก ดูรายละเอียด และแนะนำตัวเลือกที่เหมาะสมได้"
     ),
-    agent_card=f"http://localhost:8001/{AGENT_CARD_WELL_KNOWN_PATH}",
+    agent_card=f"{TRAVEL_AGENT_URLS[0]}/{AGENT_CARD_WELL_KNOWN_PATH}",
     a2a_client_factory=a2a_client_factory,
 )
 
@@ -0,0 +1,111 @@
+"""
+Benchmark: partial A2A artifact -> ADK Event conversion on the client
+
+Feeds a synthetic token stream of ``(Task, TaskArtifactUpdateEvent)`` responses
+through the previous ``hasattr``-based conversion (one validated Part, Content
+and Event per chunk) and through the patched ``RemoteA2aAgent._handle_a2a_response``
+(template copies, ``TextPart`` type dispatch, merged text parts), and reports
+events/sec.
+
+Run from 4_a2a/:
+    python benchmarks/bench_client_patch.py --tokens 1000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adk_client_streaming_patch  # noqa: E402
+
+from a2a.types import (  # noqa: E402
+    Artifact,
+    Part,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent  # noqa: E402
+from google.adk.events import Event  # noqa: E402
+from google.genai import types as genai_types  # noqa: E402
+
+TOKENS = ["การ", "เดิน", "ทาง", " ", "Bangkok", " ", "ที่พัก", "ใกล้", "BTS", ", "]
+
+
+def make_stream(n_tokens: int, parts_per_chunk: int):
+    task = Task(id="task-1", context_id="ctx-1", status=TaskStatus(state=TaskState.working))
+    responses = []
+    for i in range(n_tokens):
+        parts = [Part(root=TextPart(text=TOKENS[(i + j) % len(TOKENS)])) for j in range(parts_per_chunk)]
+        update = TaskArtifactUpdateEvent(
+            task_id="task-1",
+            context_id="ctx-1",
+            artifact=Artifact(artifact_id="artifact-1", parts=parts),
+            append=True,
+            last_chunk=False,
+        )
+        responses.append((task, update))
+    return responses
+
+
+async def baseline(agent, a2a_response, ctx):
+    """The previous per-chunk conversion from patched_handle_a2a_response."""
+    task, last_update = a2a_response[0], a2a_response[1]
+    parts = []
+    for part in last_update.artifact.parts:
+        text_content = None
+        if hasattr(part, 'text') and part.text:
+            text_content = part.text
+        elif hasattr(part, 'root') and hasattr(part.root, 'text'):
+            text_content = part.root.text
+        if text_content:
+            parts.append(genai_types.Part.from_text(text=text_content))
+    return Event(
+        invocation_id=ctx.invocation_id,
+        author=agent.name,
+        branch=ctx.branch,
+        content=genai_types.Content(role="model", parts=parts),
+        partial=True,
+    )
+
+
+async def run_case(name: str, handle, agent, responses, rounds: int):
+    ctx = SimpleNamespace(invocation_id="bench-invocation", branch=None)
+    # Same state as during a live delegation, so per-invocation templates are kept
+    adk_client_streaming_patch._delegation_clock[ctx.invocation_id] = [time.perf_counter(), None]
+
+    events = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for response in responses:
+            await handle(agent, response, ctx)
+            events += 1
+    elapsed = time.perf_counter() - start
+
+    adk_client_streaming_patch._delegation_clock.pop(ctx.invocation_id, None)
+    adk_client_streaming_patch._event_templates.pop(ctx.invocation_id, None)
+    print(f"{name:<22} events/sec={events / elapsed:>10.0f}  us/event={elapsed / events * 1e6:>7.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=1000, help="partial chunks per stream")
+    parser.add_argument("--rounds", type=int, default=20, help="streams to convert")
+    parser.add_argument("--parts", type=int, default=1, help="text parts per chunk")
+    args = parser.parse_args()
+
+    agent = RemoteA2aAgent(name="travel_agent", agent_card="http://localhost:8001/.well-known/agent-card.json")
+    responses = make_stream(args.tokens, args.parts)
+    print(f"{args.rounds} streams x {args.tokens} chunks, {args.parts} text part(s) per chunk\n")
+    await run_case("hasattr (before)", baseline, agent, responses, args.rounds)
+    await run_case("fast path (after)", RemoteA2aAgent._handle_a2a_response, agent, responses, args.rounds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark: one model turn asking for several airbnb_listing_details lookups
+
+A scripted model asks for ``--calls`` listing lookups in one response, then
+answers. The tools come from ``fake_slow_mcp.py`` (each call sleeps
+``--delay-ms``) behind ``ConcurrencyLimitedToolset``; the turn is timed with
+the limit at 1 (calls one after another) and at ``--limit``. The function
+responses must come back in the order the model asked for them.
+
+Run from 4_a2a/:
+    python benchmarks/bench_parallel_tools.py --calls 6 --limit 4 --delay-ms 300
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import AsyncGenerator
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from google.adk.agents import Agent  # noqa: E402
+from google.adk.models.base_llm import BaseLlm  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.adk.models.llm_response import LlmResponse  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams  # noqa: E402
+from google.genai import types as genai_types  # noqa: E402
+from mcp import StdioServerParameters  # noqa: E402
+
+from adk_extensions.mcp_pool import PooledMCPToolset  # noqa: E402
+from adk_extensions.tool_concurrency import ConcurrencyLimitedToolset  # noqa: E402
+
+FAKE_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_slow_mcp.py")
+
+
+class ScriptedModel(BaseLlm):
+    """Asks for ``calls`` listing lookups, then answers once the results are in."""
+
+    calls: int = 6
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if llm_request.contents[-1].parts[0].function_response is None:
+            parts = [
+                genai_types.Part(function_call=genai_types.FunctionCall(
+                    id=f"call-{i}", name="airbnb_listing_details", args={"id": str(i)},
+                ))
+                for i in range(self.calls)
+            ]
+        else:
+            parts = [genai_types.Part(text="done")]
+        yield LlmResponse(content=genai_types.Content(role="model", parts=parts))
+
+
+async def run_turn(toolset, calls: int) -> tuple[float, list[str]]:
+    agent = Agent(name="travel_manager", model=ScriptedModel(model="scripted", calls=calls), tools=[toolset])
+    runner = InMemoryRunner(agent=agent, app_name="bench")
+    session = await runner.session_service.create_session(app_name="bench", user_id="bench")
+    message = genai_types.Content(role="user", parts=[genai_types.Part(text="details of 6 listings")])
+
+    order = []
+    start = time.perf_counter()
+    async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        order.extend(response.id for response in event.get_function_responses())
+    return time.perf_counter() - start, order
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=6, help="function calls in the model response")
+    parser.add_argument("--limit", type=int, default=4, help="parallel calls allowed per toolset")
+    parser.add_argument("--delay-ms", type=int, default=300, help="fake MCP server latency per call")
+    parser.add_argument("--pool-size", type=int, default=2, help="fake MCP server processes")
+    args = parser.parse_args()
+
+    server = PooledMCPToolset(
+        name="airbnb",
+        size=args.pool_size,
+        connection_params=StdioConnectionParams(
+            server_params=StdioServerParameters(
+                command=sys.executable,
+                args=[FAKE_SERVER],
+                env={"FAKE_MCP_DELAY_MS": str(args.delay_ms)},
+            ),
+        ),
+    )
+    await server.warm_up()
+    print(f"{args.calls} listing lookups per turn, {args.delay_ms}ms each, {args.pool_size} server processes\n")
+    try:
+        expected = [f"call-{i}" for i in range(args.calls)]
+        for label, limit in (("sequential (limit 1)", 1), (f"parallel (limit {args.limit})", args.limit)):
+            toolset = ConcurrencyLimitedToolset(server, name="airbnb", max_concurrency=limit)
+            elapsed, order = await run_turn(toolset, args.calls)
+            in_order = "yes" if order == expected else f"NO: {order}"
+            print(f"{label:<22} turn={elapsed * 1000:>7.0f}ms  responses in order: {in_order}")
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
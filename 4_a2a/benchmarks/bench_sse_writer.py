@@ -0,0 +1,122 @@
+"""
+Benchmark: per-token SSE frames vs. SSEFrameWriter coalescing
+
+Feeds a synthetic token stream (partial events followed by one final event)
+through the old per-part framing loop and through ``SSEFrameWriter``, writes
+every frame to a local socket the way the ASGI server would, and reports
+frames, frames/sec, bytes and CPU time per stream.
+
+Run from 4_a2a/:
+    python benchmarks/bench_sse_writer.py --tokens 2000 --streams 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sse_writer import SSEFrameWriter  # noqa: E402
+
+TOKENS = ["การ", "เดิน", "ทาง", " ", "Bangkok", " ", "ที่พัก", "ใกล้", "BTS", ", "]
+
+
+def make_event(text: str, partial: bool):
+    part = SimpleNamespace(text=text)
+    return SimpleNamespace(
+        author="assistant_agent",
+        partial=partial,
+        content=SimpleNamespace(parts=[part]),
+    )
+
+
+async def token_stream(n_tokens: int, token_interval: float):
+    full = []
+    for i in range(n_tokens):
+        token = TOKENS[i % len(TOKENS)]
+        full.append(token)
+        if token_interval:
+            await asyncio.sleep(token_interval)
+        yield make_event(token, True)
+    yield make_event("".join(full), False)
+
+
+async def baseline(events):
+    """The original per-part framing loop from stream_agent_response."""
+    async for event in events:
+        if event.content and event.content.parts:
+            for part in event.content.parts:
+                if hasattr(part, "text") and part.text:
+                    data = {
+                        "type": "text",
+                        "content": part.text,
+                        "author": event.author,
+                        "partial": getattr(event, "partial", False),
+                    }
+                    yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def run_case(name: str, make_frames, n_streams: int, n_tokens: int, token_interval: float):
+    async def one_stream():
+        # One socket write + drain per frame, drained by a reader on the other end
+        client_sock, server_sock = socket.socketpair()
+        reader, client_writer = await asyncio.open_connection(sock=client_sock)
+        _server_reader, writer = await asyncio.open_connection(sock=server_sock)
+
+        async def drain_client():
+            while await reader.read(65536):
+                pass
+
+        drainer = asyncio.create_task(drain_client())
+        frames = 0
+        size = 0
+        async for frame in make_frames(token_stream(n_tokens, token_interval)):
+            data = frame.encode("utf-8")
+            writer.write(data)
+            await writer.drain()
+            frames += 1
+            size += len(data)
+        writer.close()
+        await writer.wait_closed()
+        await drainer
+        client_writer.close()
+        return frames, size
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    results = await asyncio.gather(*(one_stream() for _ in range(n_streams)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    frames = sum(r[0] for r in results)
+    size = sum(r[1] for r in results)
+    print(
+        f"{name:<22} frames/stream={frames / n_streams:>8.1f}  "
+        f"frames/sec={frames / wall:>10.0f}  bytes/stream={size / n_streams:>9.0f}  "
+        f"cpu/stream={cpu / n_streams * 1000:>7.2f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000, help="partial events per stream")
+    parser.add_argument("--streams", type=int, default=20, help="concurrent streams")
+    parser.add_argument("--token-interval-ms", type=float, default=0.0, help="delay between tokens")
+    parser.add_argument("--window-ms", type=float, default=25.0)
+    parser.add_argument("--max-bytes", type=int, default=2048)
+    args = parser.parse_args()
+
+    interval = args.token_interval_ms / 1000.0
+    print(f"{args.streams} streams x {args.tokens} tokens, token interval {args.token_interval_ms} ms\n")
+    await run_case("per-token (before)", baseline, args.streams, args.tokens, interval)
+    writer = SSEFrameWriter(window_ms=args.window_ms, max_bytes=args.max_bytes)
+    await run_case("coalesced (after)", writer.stream, args.streams, args.tokens, interval)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
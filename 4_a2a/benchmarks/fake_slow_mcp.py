@@ -0,0 +1,31 @@
+"""
+Fake slow Airbnb MCP server (stdio) for the benchmarks.
+
+Every ``airbnb_listing_details`` / ``airbnb_search`` call sleeps
+``FAKE_MCP_DELAY_MS`` milliseconds, like a scrape of airbnb.com would.
+"""
+
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+DELAY = float(os.getenv("FAKE_MCP_DELAY_MS", "300")) / 1000
+
+mcp = FastMCP("fake-airbnb")
+
+
+@mcp.tool()
+async def airbnb_search(location: str) -> str:
+    await asyncio.sleep(DELAY)
+    return f"listings in {location}"
+
+
+@mcp.tool()
+async def airbnb_listing_details(id: str) -> str:
+    await asyncio.sleep(DELAY)
+    return f"details of listing {id}"
+
+
+if __name__ == "__main__":
+    mcp.run("stdio")
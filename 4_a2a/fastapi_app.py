@@ -13,21 +13,25 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 # Apply ADK client streaming patch BEFORE any ADK imports
 import adk_client_streaming_patch  # noqa: F401
 
-import json
+import time
 import uuid
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import StreamingResponse, HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from google.adk.runners import Runner
 from google.adk.agents.run_config import RunConfig, StreamingMode
-from google.adk.sessions import InMemorySessionService
 from google.genai import types as genai_types
 
+from adk_extensions.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+from admission import AdmissionController, AdmissionRejected
 from agent import root_agent
+from session_store import create_session_service, ensure_session
+from sse_writer import SSEFrameWriter, format_sse
+from stream_resume import TurnInProgressError, TurnRegistry
 
 app = FastAPI(title="ADK Assistant API", version="1.0.0")
 
@@ -39,8 +43,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Session service for managing conversations
-session_service = InMemorySessionService()
+# Session service for managing conversations (SQLite by default, see SESSION_BACKEND)
+session_service = create_session_service()
 
 # Create runner for the agent
 runner = Runner(
@@ -49,31 +53,117 @@ runner = Runner(
     session_service=session_service,
 )
 
+# Batches token-level SSE frames (see SSE_COALESCE_* in .env)
+frame_writer = SSEFrameWriter.from_env()
+
+# Running turns, replayable after a reconnect with Last-Event-ID
+turns = TurnRegistry(
+    buffer_size=int(os.getenv("SSE_REPLAY_BUFFER_FRAMES", "256")),
+    retention=float(os.getenv("SSE_REPLAY_RETENTION_SECONDS", "120")),
+)
+
+# Global / per-user limits on in-flight turns (see ADMISSION_* in .env)
+admission = AdmissionController.from_env()
+
+# Per-stage latency, exported at /metrics
+TURN_SECONDS = REGISTRY.histogram(
+    "gateway_turn_seconds",
+    "Duration of one agent turn, from admission to the last event.",
+)
+FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "gateway_time_to_first_token_seconds",
+    "Time from the start of a turn to the first text of each author.",
+    labelnames=("author",),
+)
+INTER_TOKEN_SECONDS = REGISTRY.histogram(
+    "gateway_inter_token_seconds",
+    "Gap between consecutive partial text events of one author.",
+    labelnames=("author",),
+)
+REGISTRY.gauge("gateway_admission_in_flight", "Agent turns currently running.", fn=lambda: admission.in_flight)
+REGISTRY.gauge("gateway_admission_queue_depth", "Turns waiting for admission.", fn=lambda: admission.queue_depth)
+
+
+@app.on_event("shutdown")
+async def close_session_service():
+    """Stop running turns and flush buffered session writes before the worker exits."""
+    await turns.close()
+    if hasattr(session_service, "close"):
+        await session_service.close()
+
 
 class ChatRequest(BaseModel):
     message: str
     session_id: str | None = None
 
 
+# Load counters reported to the gateway router (see gateway_cluster.py)
+worker_load = {
+    "worker_id": os.getenv("GATEWAY_WORKER_ID", "0"),
+    "pid": os.getpid(),
+    "started_at": time.time(),
+    "active_streams": 0,
+    "total_streams": 0,
+}
+
+
 async def stream_agent_response(
     user_id: str,
     session_id: str,
     message: str,
 ) -> AsyncGenerator[str, None]:
-    """Stream agent response as SSE events."""
-    
+    """Stream agent response as SSE events, once the turn is admitted."""
+    try:
+        async for position in admission.acquire(user_id):
+            yield format_sse({"type": "queued", "position": position})
+    except AdmissionRejected as e:
+        yield format_sse({"type": "rejected", "message": str(e)})
+        yield format_sse({"type": "done"})
+        return
+
+    worker_load["active_streams"] += 1
+    worker_load["total_streams"] += 1
+    try:
+        async for frame in _stream_turn(user_id, session_id, message):
+            yield frame
+    finally:
+        worker_load["active_streams"] -= 1
+        admission.release(user_id)
+
+
+async def timed_events(events):
+    """Record time-to-first-token and inter-token gaps per author while passing events through."""
+    start = time.perf_counter()
+    last_text_at: dict[str, float] = {}
+    try:
+        async for event in events:
+            if event.content and event.content.parts and any(p.text for p in event.content.parts):
+                now = time.perf_counter()
+                previous = last_text_at.get(event.author)
+                if previous is None:
+                    FIRST_TOKEN_SECONDS.observe(now - start, author=event.author)
+                elif event.partial:
+                    INTER_TOKEN_SECONDS.observe(now - previous, author=event.author)
+                last_text_at[event.author] = now
+            yield event
+    finally:
+        TURN_SECONDS.observe(time.perf_counter() - start)
+        await events.aclose()
+
+
+async def _stream_turn(
+    user_id: str,
+    session_id: str,
+    message: str,
+) -> AsyncGenerator[str, None]:
+    """Run one agent turn and yield its SSE frames."""
     # Ensure session exists
-    session = await session_service.get_session(
+    await ensure_session(
+        session_service,
         app_name="assistant_app",
         user_id=user_id,
         session_id=session_id,
     )
-    if not session:
-        await session_service.create_session(
-            app_name="assistant_app",
-            user_id=user_id,
-            session_id=session_id,
-        )
     
     # Create user message
     user_content = genai_types.Content(
@@ -84,37 +174,23 @@ async def stream_agent_response(
     # Stream events from the agent with SSE streaming mode for token-level output
     run_config = RunConfig(streaming_mode=StreamingMode.SSE)
     
-    async for event in runner.run_async(
+    events = runner.run_async(
         user_id=user_id,
         session_id=session_id,
         new_message=user_content,
         run_config=run_config,
-    ):
-        # Extract text content from event
-        if event.content and event.content.parts:
-            for part in event.content.parts:
-                if hasattr(part, 'text') and part.text:
-                    # Send as SSE event
-                    data = {
-                        "type": "text",
-                        "content": part.text,
-                        "author": event.author,
-                        "partial": getattr(event, 'partial', False),
-                    }
-                    yield f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    )
+    # Coalesce partial text into one frame per window / byte budget
+    async for frame in frame_writer.stream(timed_events(events)):
+        yield frame
     
     # Send done event
-    yield f"data: {json.dumps({'type': 'done'})}\n\n"
+    yield format_sse({"type": "done"})
 
 
-@app.post("/chat/stream")
-async def chat_stream(request: ChatRequest):
-    """Stream chat response via SSE."""
-    user_id = "default_user"
-    session_id = request.session_id or str(uuid.uuid4())
-    
+def sse_response(frames: AsyncGenerator[str, None], session_id: str) -> StreamingResponse:
     return StreamingResponse(
-        stream_agent_response(user_id, session_id, request.message),
+        frames,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -124,6 +200,65 @@ async def chat_stream(request: ChatRequest):
     )
 
 
+@app.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    x_session_id: str | None = Header(default=None),
+    x_user_id: str | None = Header(default=None),
+    last_event_id: str | None = Header(default=None),
+):
+    """Stream chat response via SSE.
+
+    A request carrying a ``Last-Event-ID`` of the session's buffered turn
+    resumes that turn instead of starting a new one. An id of any other turn
+    is ignored and the message starts a new turn as usual.
+    """
+    user_id = x_user_id or "default_user"
+    # Same precedence as the router (gateway_cluster.py), which always sets X-Session-Id:
+    # the turn must live on the worker the router sends this session's resumes to
+    session_id = x_session_id or request.session_id or str(uuid.uuid4())
+
+    turn = turns.get(session_id)
+    if turn and turn.owns(last_event_id):
+        return sse_response(turn.subscribe(last_event_id), session_id)
+
+    try:
+        turn = turns.start(session_id, stream_agent_response(user_id, session_id, request.message))
+    except TurnInProgressError as e:
+        return JSONResponse({"error": str(e)}, status_code=409, headers={"X-Session-Id": session_id})
+    return sse_response(turn.subscribe(), session_id)
+
+
+@app.get("/chat/stream/{session_id}")
+async def resume_chat_stream(
+    session_id: str,
+    last_event_id: str | None = Header(default=None),
+):
+    """Reattach to the session's latest turn (EventSource reconnects land here)."""
+    turn = turns.get(session_id)
+    if not turn:
+        return JSONResponse({"error": "No resumable turn for this session"}, status_code=404)
+    return sse_response(turn.subscribe(last_event_id), session_id)
+
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """In-flight turns, queue depth and queue wait times."""
+    return admission.stats()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for the gateway and the A2A client hop."""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/worker/load")
+async def load():
+    """Report this worker's stream load."""
+    return {**worker_load, "uptime_seconds": round(time.time() - worker_load["started_at"], 1)}
+
+
 @app.get("/", response_class=HTMLResponse)
 async def index():
     """Simple chat UI for testing."""
@@ -185,45 +320,72 @@ async def index():
             const assistantDiv = addMessage('', false);
             assistantDiv.classList.add('streaming');
             
-            try {
-                const response = await fetch('/chat/stream', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ message, session_id: sessionId })
-                });
-                
-                sessionId = response.headers.get('X-Session-Id') || sessionId;
-                
-                const reader = response.body.getReader();
-                const decoder = new TextDecoder();
-                let fullText = '';
-                
-                while (true) {
-                    const { done, value } = await reader.read();
-                    if (done) break;
+            let fullText = '';
+            let lastEventId = null;
+            let finished = false;
+            
+            // Reconnects resume the same turn from the last received event id
+            for (let attempt = 0; attempt < 4 && !finished; attempt++) {
+                if (!lastEventId) fullText = '';  // replay starts from the first frame
+                try {
+                    const headers = Object.assign(
+                        { 'Content-Type': 'application/json' },
+                        sessionId ? { 'X-Session-Id': sessionId } : {},
+                        lastEventId ? { 'Last-Event-ID': lastEventId } : {}
+                    );
+                    const response = attempt === 0
+                        ? await fetch('/chat/stream', {
+                            method: 'POST',
+                            headers,
+                            body: JSON.stringify({ message, session_id: sessionId })
+                        })
+                        : await fetch('/chat/stream/' + encodeURIComponent(sessionId), { headers });
                     
-                    const chunk = decoder.decode(value);
-                    const lines = chunk.split('\\n');
+                    sessionId = response.headers.get('X-Session-Id') || sessionId;
+                    if (!response.ok) break;
                     
-                    for (const line of lines) {
-                        if (line.startsWith('data: ')) {
-                            try {
-                                const data = JSON.parse(line.slice(6));
-                                if (data.type === 'text' && data.author === 'assistant_agent') {
-                                    if (data.partial) {
-                                        fullText += data.content;
-                                    } else {
-                                        fullText = data.content;
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    
+                    while (true) {
+                        const { done, value } = await reader.read();
+                        if (done) break;
+                        
+                        const chunk = decoder.decode(value);
+                        const lines = chunk.split('\\n');
+                        
+                        for (const line of lines) {
+                            if (line.startsWith('id: ')) {
+                                lastEventId = line.slice(4);
+                            } else if (line.startsWith('data: ')) {
+                                try {
+                                    const data = JSON.parse(line.slice(6));
+                                    if (data.type === 'done') {
+                                        finished = true;
+                                    } else if (data.type === 'queued') {
+                                        assistantDiv.textContent = '⏳ รอคิวลำดับที่ ' + data.position;
+                                    } else if (data.type === 'rejected') {
+                                        assistantDiv.textContent = '⚠️ ' + data.message;
+                                    } else if (data.type === 'text' && data.author === 'assistant_agent') {
+                                        if (data.partial) {
+                                            fullText += data.content;
+                                        } else {
+                                            fullText = data.content;
+                                        }
+                                        assistantDiv.textContent = fullText;
+                                        chatBox.scrollTop = chatBox.scrollHeight;
                                     }
-                                    assistantDiv.textContent = fullText;
-                                    chatBox.scrollTop = chatBox.scrollHeight;
-                                }
-                            } catch (e) {}
+                                } catch (e) {}
+                            }
                         }
                     }
+                } catch (error) {
+                    if (!sessionId) {
+                        assistantDiv.textContent = 'Error: ' + error.message;
+                        break;
+                    }
+                    await new Promise(resolve => setTimeout(resolve, 1000));
                 }
-            } catch (error) {
-                assistantDiv.textContent = 'Error: ' + error.message;
             }
             
             assistantDiv.classList.remove('streaming');
@@ -237,5 +399,20 @@ async def index():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ADK Assistant SSE gateway")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of worker processes; sessions are pinned to a worker by X-Session-Id",
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        from gateway_cluster import run_cluster
+        run_cluster(args.workers, host=args.host, port=args.port)
+    else:
+        import uvicorn
+        uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,212 @@
+"""
+Gateway Cluster Module
+
+Multi-worker launch mode for the FastAPI SSE gateway.
+
+``python fastapi_app.py --workers N`` starts N uvicorn processes of
+``fastapi_app:app`` on consecutive internal ports and a small router on the
+public port. The router hashes the ``X-Session-Id`` header (or the request's
+``session_id``, or the id in ``/chat/stream/{session_id}``) onto a consistent
+hash ring, so every turn of a conversation is served by the same worker, and
+streams the worker's SSE response back as-is.
+
+Per-worker load is available at ``GET /workers``.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+SESSION_HEADER = "X-Session-Id"
+RESUME_PATH_PREFIX = "chat/stream/"
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "host"}
+
+
+class ConsistentHashRing:
+    """Hash ring with virtual nodes; adding a node only remaps ~1/N of the keys."""
+
+    def __init__(self, nodes: list[str], replicas: int = 128):
+        self.replicas = replicas
+        self._ring: list[tuple[int, str]] = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    def add(self, node: str) -> None:
+        for i in range(self.replicas):
+            bisect.insort(self._ring, (self._hash(f"{node}#{i}"), node))
+
+    def remove(self, node: str) -> None:
+        self._ring = [entry for entry in self._ring if entry[1] != node]
+
+    def get(self, key: str) -> str:
+        if not self._ring:
+            raise LookupError("Hash ring is empty")
+        index = bisect.bisect(self._ring, (self._hash(key), ""))
+        return self._ring[index % len(self._ring)][1]
+
+
+class WorkerProcess:
+    """One ``uvicorn fastapi_app:app`` process bound to an internal port."""
+
+    def __init__(self, worker_id: int, host: str, port: int):
+        self.worker_id = worker_id
+        self.host = host
+        self.port = port
+        self.process: subprocess.Popen | None = None
+        self.in_flight = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> None:
+        env = {**os.environ, "GATEWAY_WORKER_ID": str(self.worker_id)}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "fastapi_app:app", "--host", self.host, "--port", str(self.port)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env,
+        )
+        logger.info(f"🚀 Started worker {self.worker_id} (pid {self.process.pid}) on {self.url}")
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self) -> None:
+        if self.is_alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def create_router_app(workers: list[WorkerProcess], monitor_interval: float = 2.0) -> FastAPI:
+    """Build the session-affine router in front of the worker processes."""
+    by_url = {worker.url: worker for worker in workers}
+    ring = ConsistentHashRing(list(by_url))
+    client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=None))
+    router = FastAPI(title="ADK Assistant Gateway Router", version="1.0.0")
+
+    async def monitor_workers():
+        # Respawn crashed workers on the same port so the ring never changes;
+        # their sessions live in the shared session store and carry over.
+        while True:
+            await asyncio.sleep(monitor_interval)
+            for worker in workers:
+                if not worker.is_alive():
+                    logger.warning(f"⚠️ Worker {worker.worker_id} exited, restarting")
+                    worker.in_flight = 0
+                    worker.start()
+
+    @router.on_event("startup")
+    async def start_monitor():
+        router.state.monitor = asyncio.create_task(monitor_workers())
+
+    @router.on_event("shutdown")
+    async def stop_workers():
+        router.state.monitor.cancel()
+        await client.aclose()
+        for worker in workers:
+            worker.stop()
+
+    async def proxy(request: Request, worker: WorkerProcess, body: bytes, headers: dict) -> Response:
+        upstream = client.build_request(
+            request.method,
+            worker.url + request.url.path,
+            params=request.query_params,
+            headers=headers,
+            content=body,
+        )
+        worker.in_flight += 1
+        try:
+            response = await client.send(upstream, stream=True)
+        except httpx.HTTPError:
+            worker.in_flight -= 1
+            return JSONResponse({"error": f"worker {worker.worker_id} unavailable"}, status_code=503)
+
+        async def release():
+            await response.aclose()
+            worker.in_flight -= 1
+
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+            background=BackgroundTask(release),
+        )
+
+    @router.get("/workers")
+    async def workers_load():
+        """Per-worker load as seen by the router and reported by each worker."""
+        results = []
+        for worker in workers:
+            entry = {
+                "worker_id": worker.worker_id,
+                "url": worker.url,
+                "alive": worker.is_alive(),
+                "router_in_flight": worker.in_flight,
+            }
+            try:
+                response = await client.get(f"{worker.url}/worker/load", timeout=2.0)
+                entry.update(response.json())
+            except (httpx.HTTPError, ValueError):
+                entry["error"] = "unreachable"
+            results.append(entry)
+        return {"workers": results}
+
+    @router.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+    async def route(path: str, request: Request):
+        body = await request.body()
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+        session_id = request.headers.get(SESSION_HEADER)
+        if not session_id and path.startswith(RESUME_PATH_PREFIX):
+            session_id = path[len(RESUME_PATH_PREFIX):]
+        if not session_id and body:
+            try:
+                session_id = json.loads(body).get("session_id")
+            except (ValueError, AttributeError):
+                session_id = None
+        if not session_id and request.method == "POST":
+            # New conversation: pin the id here so the worker and the ring agree on it
+            session_id = str(uuid.uuid4())
+        if session_id:
+            headers[SESSION_HEADER] = session_id
+
+        worker = by_url[ring.get(session_id or path)]
+        return await proxy(request, worker, body, headers)
+
+    return router
+
+
+def run_cluster(workers: int, host: str = "0.0.0.0", port: int = 8002, worker_base_port: int | None = None):
+    """Start ``workers`` gateway processes and the session-affine router (blocking)."""
+    import uvicorn
+
+    base_port = worker_base_port or port + 100
+    processes = [WorkerProcess(i, "127.0.0.1", base_port + i) for i in range(workers)]
+    for worker in processes:
+        worker.start()
+
+    try:
+        uvicorn.run(create_router_app(processes), host=host, port=port)
+    finally:
+        for worker in processes:
+            worker.stop()
@@ -6,9 +6,83 @@ Import this module BEFORE importing any ADK modules to ensure patches are applie
 """
 
 import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+
+# Make the shared adk_extensions package (project root) importable
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from adk_extensions.metrics import REGISTRY, instrument_mcp_tools  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
+CONVERT_SECONDS = REGISTRY.histogram(
+    "a2a_server_convert_event_seconds",
+    "Time spent converting one ADK event into A2A events.",
+    labelnames=("kind",),
+)
+CHUNK_GAP_SECONDS = REGISTRY.histogram(
+    "a2a_server_inter_chunk_seconds",
+    "Gap between consecutive partial artifact chunks of one task.",
+)
+
+# task_id -> time of the last partial chunk (bounded, tasks are never closed explicitly)
+_last_chunk_at: OrderedDict[str, float] = OrderedDict()
+_MAX_TRACKED_TASKS = 1024
+
+
+class PartialChunkCoalescer:
+    """Merges consecutive partial text chunks of a task into fewer artifact updates.
+
+    Text is held until ``max_chars`` characters are buffered or ``window_ms``
+    has passed since the first buffered chunk, checked whenever the next event
+    of the task arrives. A non-partial event always flushes first, so the
+    executor's ``last_chunk=True`` artifact is never delayed; ``window_ms=0``
+    disables coalescing.
+    """
+
+    def __init__(self, window_ms: float = 20.0, max_chars: int = 200):
+        self.window = window_ms / 1000.0
+        self.max_chars = max_chars
+        # task_id -> [texts, buffered chars, time of the first buffered chunk]
+        self._buffers: OrderedDict[str, list] = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "PartialChunkCoalescer":
+        return cls(
+            window_ms=float(os.getenv("A2A_COALESCE_WINDOW_MS", "20")),
+            max_chars=int(os.getenv("A2A_COALESCE_MAX_CHARS", "200")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def add(self, task_id: str, text: str) -> str | None:
+        """Buffer ``text``; return the merged text once it is due."""
+        now = time.perf_counter()
+        buffer = self._buffers.get(task_id)
+        if buffer is None:
+            buffer = self._buffers[task_id] = [[], 0, now]
+            if len(self._buffers) > _MAX_TRACKED_TASKS:
+                self._buffers.popitem(last=False)
+        buffer[0].append(text)
+        buffer[1] += len(text)
+        if buffer[1] >= self.max_chars or now - buffer[2] >= self.window:
+            return self.flush(task_id)
+        return None
+
+    def flush(self, task_id: str) -> str | None:
+        buffer = self._buffers.pop(task_id, None)
+        return "".join(buffer[0]) if buffer else None
+
+
+coalescer = PartialChunkCoalescer.from_env()
+
 
 def apply_request_converter_patch():
     """Patch the request converter to use StreamingMode.SSE for A2A requests."""
@@ -55,10 +129,26 @@ def apply_event_converter_patch():
     """Patch the event converter to handle partial events for token streaming."""
     try:
         from google.adk.a2a.converters import event_converter
-        from a2a.types import TaskArtifactUpdateEvent, Artifact
+        from a2a.types import TaskArtifactUpdateEvent, Artifact, Part, TextPart
         
         original_convert = event_converter.convert_event_to_a2a_events
         
+        def partial_artifact_event(parts, task_id, context_id):
+            return TaskArtifactUpdateEvent(
+                task_id=task_id,
+                context_id=context_id,
+                artifact=Artifact(artifact_id=f"partial-{task_id}", parts=parts),
+                append=True,
+                last_chunk=False,
+            )
+        
+        def flushed_events(task_id, context_id):
+            """Artifact update for text still buffered for the task, if any."""
+            text = coalescer.flush(task_id)
+            if not text:
+                return []
+            return [partial_artifact_event([Part(root=TextPart(text=text))], task_id, context_id)]
+        
         def patched_convert_event_to_a2a_events(event, invocation_context, task_id=None, context_id=None, part_converter=None):
             """Patched version that handles partial events for token streaming."""
             if part_converter is None:
@@ -73,6 +163,10 @@ def apply_event_converter_patch():
             a2a_events = []
             
             try:
+                if not event.partial:
+                    # Buffered text goes out before the final message of the turn
+                    a2a_events.extend(flushed_events(task_id, context_id))
+                
                 if event.error_code:
                     error_event = event_converter._create_error_status_event(event, invocation_context, task_id, context_id)
                     a2a_events.append(error_event)
@@ -81,14 +175,16 @@ def apply_event_converter_patch():
                 if hasattr(event, 'partial') and event.partial:
                     message = event_converter.convert_event_to_a2a_message(event, invocation_context, part_converter=part_converter)
                     if message and message.parts:
-                        artifact_event = TaskArtifactUpdateEvent(
-                            task_id=task_id,
-                            context_id=context_id,
-                            artifact=Artifact(artifact_id=f"partial-{task_id}", parts=message.parts),
-                            append=True,
-                            last_chunk=False,
-                        )
-                        a2a_events.append(artifact_event)
+                        parts = message.parts
+                        if coalescer.enabled and all(
+                            type(part.root) is TextPart and not part.root.metadata for part in parts
+                        ):
+                            text = coalescer.add(task_id, "".join(part.root.text for part in parts))
+                            if text:
+                                a2a_events.append(partial_artifact_event([Part(root=TextPart(text=text))], task_id, context_id))
+                        else:
+                            a2a_events.extend(flushed_events(task_id, context_id))
+                            a2a_events.append(partial_artifact_event(parts, task_id, context_id))
                     return a2a_events
                 
                 message = event_converter.convert_event_to_a2a_message(event, invocation_context, part_converter=part_converter)
@@ -102,7 +198,25 @@ def apply_event_converter_patch():
             
             return a2a_events
         
-        event_converter.convert_event_to_a2a_events = patched_convert_event_to_a2a_events
+        def timed_convert_event_to_a2a_events(event, invocation_context, task_id=None, context_id=None, part_converter=None):
+            """Time each conversion and the gaps between partial chunks of a task."""
+            start = time.perf_counter()
+            a2a_events = patched_convert_event_to_a2a_events(event, invocation_context, task_id, context_id, part_converter)
+            now = time.perf_counter()
+            partial = bool(event and event.partial)
+            CONVERT_SECONDS.observe(now - start, kind="partial" if partial else "full")
+            if partial and a2a_events:
+                previous = _last_chunk_at.pop(task_id, None)
+                if previous is not None:
+                    CHUNK_GAP_SECONDS.observe(now - previous)
+                _last_chunk_at[task_id] = now
+                if len(_last_chunk_at) > _MAX_TRACKED_TASKS:
+                    _last_chunk_at.popitem(last=False)
+            elif not partial:
+                _last_chunk_at.pop(task_id, None)
+            return a2a_events
+        
+        event_converter.convert_event_to_a2a_events = timed_convert_event_to_a2a_events
         logger.info("✅ Applied event_converter patch for partial token streaming")
         return True
         
@@ -116,6 +230,7 @@ def apply_all_patches():
     success = True
     success &= apply_request_converter_patch()
     success &= apply_event_converter_patch()
+    success &= instrument_mcp_tools()
     
     if success:
         logger.info("🚀 All ADK streaming patches applied successfully!")
@@ -7,14 +7,24 @@ nest_asyncio.apply()
 import adk_streaming_patch  # noqa: F401
 
 from google.adk.agents import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
 from google.adk.a2a.utils.agent_to_a2a import to_a2a
 from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
 from a2a.types import AgentCapabilities
+from starlette.requests import Request
+from starlette.responses import Response
+from adk_extensions.agent_card import AgentCardETagMiddleware
+from adk_extensions.mcp_cache import CachingToolset, airbnb_cache_ttls
+from adk_extensions.mcp_gateway import create_mcp_toolset
+from adk_extensions.mcp_projection import ProjectingToolset, airbnb_projections
+from adk_extensions.tool_concurrency import ConcurrencyLimitedToolset
+from adk_extensions.mcp_pool import PooledMCPToolset
+from adk_extensions.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
 
-airbnb_mcp_toolset = MCPToolset(
+# Airbnb MCP tools via the shared MCP gateway (MCP_GATEWAY_URL) or a warm local pool
+airbnb_mcp_server = create_mcp_toolset(
+    "airbnb",
     connection_params=StdioConnectionParams(
         server_params=StdioServerParameters(
             command="npx",
@@ -27,6 +37,17 @@ airbnb_mcp_toolset = MCPToolset(
     ),
 )
 
+# Several lookups from one model turn run in parallel (MCP_MAX_PARALLEL_CALLS at a time),
+# results are cut down to the fields the agent uses, and since search and listing
+# results are read-only, repeat calls are served from cache
+airbnb_mcp_toolset = CachingToolset(
+    ProjectingToolset(
+        ConcurrencyLimitedToolset(airbnb_mcp_server, name="airbnb"),
+        projections=airbnb_projections(),
+    ),
+    ttls=airbnb_cache_ttls(),
+)
+
 agent_instruction_prompt = """
 คุณคือผู้ช่วยการท่องเที่ยวที่เชี่ยวชาญด้านการวางแผนการเดินทางและที่พัก Airbnb
 หน้าที่ของคุณ:
@@ -34,6 +55,7 @@ agent_instruction_prompt = """
 - ควรถามคำถามเพื่อความชัดเจนเพิ่มเติมเสมอ (เช่น สถานที่ งบประมาณ วันที่เข้าพัก จำนวนผู้เข้าพัก)  
 - เมื่อได้ข้อมูลครบให้ Search ที่พักจาก Airbnb ด้วย airbnb_mcp_toolset
 - และหากลูกต้าขอข้อมูลที่พักใดเป็นพิเศษให้ดึงจาก Airbnb ได้ ด้วย airbnb_mcp_toolset
+- หากต้องดูรายละเอียดที่พักหลายแห่ง ให้เรียก airbnb_listing_details ของทุกแห่งพร้อมกันในรอบเดียว
 - แนะนำตัวเลือกที่เหมาะสมอย่างสุภาพและเข้าใจง่าย  
 - ตอบกลับเป็นภาษาเดียวกับที่ผู้ใช้ใช้ในการสนทนา 
 """
@@ -46,18 +68,36 @@ root_agent = Agent(
     tools=[airbnb_mcp_toolset],
 )
 
+# Port of this replica; start more replicas on other ports for load balancing
+A2A_PORT = int(os.getenv("A2A_PORT", "8001"))
+
 # Build agent card with streaming capability enabled
 async def build_agent_card():
     card_builder = AgentCardBuilder(
         agent=root_agent,
-        rpc_url="http://localhost:8001/",
+        rpc_url=f"http://localhost:{A2A_PORT}/",
         capabilities=AgentCapabilities(streaming=True),
     )
     return await card_builder.build()
 
 # Create A2A app with streaming-enabled agent card
 agent_card = asyncio.get_event_loop().run_until_complete(build_agent_card())
-a2a_app = to_a2a(root_agent, port=8001, agent_card=agent_card)
+a2a_app = to_a2a(root_agent, port=A2A_PORT, agent_card=agent_card)
+
+# ETag on the agent card so cached clients revalidate with a cheap 304
+a2a_app.add_middleware(AgentCardETagMiddleware)
+
+# Pre-spawn the local MCP pool with the server instead of on the first tool call
+if isinstance(airbnb_mcp_server, PooledMCPToolset):
+    a2a_app.add_event_handler("startup", airbnb_mcp_server.warm_up)
+a2a_app.add_event_handler("shutdown", airbnb_mcp_toolset.close)
+
+
+# Prometheus metrics: event conversion, chunk gaps and MCP tool durations
+async def metrics(request: Request) -> Response:
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+a2a_app.add_route("/metrics", metrics, methods=["GET"])
 
 # To Start A2A Contribuiting
 # uvicorn agent:a2a_app --port 8001 --reload --env-file .env
\ No newline at end of file
@@ -0,0 +1,501 @@
+"""
+Session Store Module
+
+Pluggable session backends for the FastAPI SSE gateway.
+
+The default ``InMemorySessionService`` keeps every conversation in the worker's
+heap, so memory grows without bound and sessions vanish when the process
+restarts. ``SqliteSessionService`` persists sessions in a shared SQLite file
+(WAL mode) so several uvicorn workers can serve the same conversations:
+
+- a small pool of aiosqlite connections instead of one connection per call
+- event appends are buffered and written in one transaction per batch
+- idle sessions are evicted by TTL, and the least recently used ones are
+  dropped once ``max_sessions`` is exceeded
+
+Select the backend with ``SESSION_BACKEND`` (``sqlite`` or ``memory``).
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Optional
+
+import aiosqlite
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "sessions.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    create_time REAL NOT NULL,
+    last_update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_update ON sessions (last_update_time);
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, id),
+    FOREIGN KEY (app_name, user_id, session_id)
+        REFERENCES sessions (app_name, user_id, id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_events_session_time
+    ON events (app_name, user_id, session_id, timestamp);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+def _split_state_delta(delta: dict[str, Any]) -> tuple[dict, dict, dict]:
+    """Split a state delta into app, user and session scoped parts (temp keys are dropped)."""
+    app_delta, user_delta, session_delta = {}, {}, {}
+    for key, value in delta.items():
+        if key.startswith(State.APP_PREFIX):
+            app_delta[key.removeprefix(State.APP_PREFIX)] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_delta[key.removeprefix(State.USER_PREFIX)] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_delta[key] = value
+    return app_delta, user_delta, session_delta
+
+
+def _merge_state(app_state: dict, user_state: dict, session_state: dict) -> dict:
+    merged = copy.deepcopy(session_state)
+    for key, value in app_state.items():
+        merged[State.APP_PREFIX + key] = value
+    for key, value in user_state.items():
+        merged[State.USER_PREFIX + key] = value
+    return merged
+
+
+class SqliteConnectionPool:
+    """Fixed-size pool of aiosqlite connections opened in WAL mode."""
+
+    def __init__(self, db_path: str, size: int = 4, busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._connections: list[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+
+    async def open(self) -> None:
+        async with self._open_lock:
+            if self._connections:
+                return
+            for _ in range(self.size):
+                conn = await aiosqlite.connect(self.db_path)
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute("PRAGMA synchronous=NORMAL")
+                await conn.execute("PRAGMA foreign_keys=ON")
+                await conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+                self._connections.append(conn)
+                self._idle.put_nowait(conn)
+            conn = self._connections[0]
+            await conn.executescript(_SCHEMA)
+            await conn.commit()
+
+    async def acquire(self) -> aiosqlite.Connection:
+        if not self._connections:
+            await self.open()
+        return await self._idle.get()
+
+    def release(self, conn: aiosqlite.Connection) -> None:
+        self._idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        for conn in self._connections:
+            await conn.close()
+        self._connections.clear()
+        self._idle = asyncio.Queue()
+
+
+class _PooledConnection:
+    """Async context manager that checks a connection out of the pool."""
+
+    def __init__(self, pool: SqliteConnectionPool):
+        self._pool = pool
+        self._conn: aiosqlite.Connection | None = None
+
+    async def __aenter__(self) -> aiosqlite.Connection:
+        self._conn = await self._pool.acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is not None:
+                await self._conn.rollback()
+        finally:
+            self._pool.release(self._conn)
+
+
+class SqliteSessionService(BaseSessionService):
+    """Session service backed by a shared SQLite database.
+
+    Events are appended to the caller's in-memory session immediately and
+    written to disk in batches (``batch_size`` events or every
+    ``flush_interval`` seconds, whichever comes first). Any read flushes the
+    pending batch first, so a worker always sees its own writes.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        *,
+        pool_size: int = 4,
+        batch_size: int = 32,
+        flush_interval: float = 0.05,
+        session_ttl: float = 24 * 60 * 60,
+        max_sessions: int = 10_000,
+        sweep_interval: float = 60.0,
+    ):
+        self.pool = SqliteConnectionPool(db_path, size=pool_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.sweep_interval = sweep_interval
+
+        self._pending_events: list[tuple] = []
+        self._pending_sessions: dict[tuple[str, str, str], tuple[dict, float]] = {}
+        self._pending_app_states: dict[str, dict] = {}
+        self._pending_user_states: dict[tuple[str, str], dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._sweep_task: asyncio.Task | None = None
+
+    def _connection(self) -> _PooledConnection:
+        if self._sweep_task is None and self.sweep_interval > 0:
+            self._sweep_task = asyncio.create_task(self._sweep_loop())
+        return _PooledConnection(self.pool)
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        app_delta, user_delta, session_state = _split_state_delta(state or {})
+        now = time.time()
+
+        async with self._connection() as conn:
+            await conn.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, create_time, last_update_time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, json.dumps(session_state), now, now),
+            )
+            app_state = await self._merge_scoped_state(conn, "app_states", (app_name,), app_delta)
+            user_state = await self._merge_scoped_state(conn, "user_states", (app_name, user_id), user_delta)
+            await conn.commit()
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=_merge_state(app_state, user_state, session_state),
+            last_update_time=now,
+        )
+
+    async def ensure_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        """Create the session if it is missing and mark it as recently used.
+
+        A single upsert on the primary key replaces the get-then-create round
+        trip and refreshes the session's position for LRU eviction.
+        """
+        now = time.time()
+        async with self._connection() as conn:
+            await conn.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, create_time, last_update_time) "
+                "VALUES (?, ?, ?, '{}', ?, ?) "
+                "ON CONFLICT (app_name, user_id, id) DO UPDATE SET last_update_time = excluded.last_update_time",
+                (app_name, user_id, session_id, now, now),
+            )
+            await conn.commit()
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        await self.flush()
+
+        async with self._connection() as conn:
+            async with conn.execute(
+                "SELECT state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            session_state, last_update_time = json.loads(row[0]), row[1]
+
+            query = "SELECT payload FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            params: list[Any] = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            query += " ORDER BY timestamp DESC, rowid DESC"
+            if config and config.num_recent_events:
+                query += " LIMIT ?"
+                params.append(config.num_recent_events)
+            async with conn.execute(query, params) as cursor:
+                payloads = [r[0] for r in await cursor.fetchall()]
+
+            app_state = await self._load_scoped_state(conn, "app_states", (app_name,))
+            user_state = await self._load_scoped_state(conn, "user_states", (app_name, user_id))
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=_merge_state(app_state, user_state, session_state),
+            events=[Event.model_validate_json(p) for p in reversed(payloads)],
+            last_update_time=last_update_time,
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        await self.flush()
+
+        async with self._connection() as conn:
+            async with conn.execute(
+                "SELECT id, state, last_update_time FROM sessions WHERE app_name = ? AND user_id = ?",
+                (app_name, user_id),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            app_state = await self._load_scoped_state(conn, "app_states", (app_name,))
+            user_state = await self._load_scoped_state(conn, "user_states", (app_name, user_id))
+
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    app_name=app_name,
+                    user_id=user_id,
+                    id=session_id,
+                    state=_merge_state(app_state, user_state, json.loads(state)),
+                    last_update_time=last_update_time,
+                )
+                for session_id, state, last_update_time in rows
+            ]
+        )
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self.flush()
+
+        async with self._connection() as conn:
+            await conn.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            )
+            await conn.commit()
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+
+        # Update the caller's session object right away; persistence is batched.
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+
+        app_delta, user_delta, session_delta = {}, {}, {}
+        if event.actions and event.actions.state_delta:
+            app_delta, user_delta, session_delta = _split_state_delta(event.actions.state_delta)
+
+        key = (session.app_name, session.user_id, session.id)
+        self._pending_events.append(
+            (*key, event.id, event.timestamp, event.model_dump_json(exclude_none=True))
+        )
+        pending_state, _ = self._pending_sessions.get(key, ({}, 0.0))
+        pending_state.update(session_delta)
+        self._pending_sessions[key] = (pending_state, event.timestamp)
+        if app_delta:
+            self._pending_app_states.setdefault(session.app_name, {}).update(app_delta)
+        if user_delta:
+            self._pending_user_states.setdefault(key[:2], {}).update(user_delta)
+
+        if len(self._pending_events) >= self.batch_size:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+        return event
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ Failed to flush session events: {e}")
+
+    async def flush(self) -> None:
+        """Write all buffered events and state changes in one transaction."""
+        async with self._flush_lock:
+            if not self._pending_events and not self._pending_sessions:
+                return
+            events, self._pending_events = self._pending_events, []
+            sessions, self._pending_sessions = self._pending_sessions, {}
+            app_states, self._pending_app_states = self._pending_app_states, {}
+            user_states, self._pending_user_states = self._pending_user_states, {}
+
+            try:
+                await self._write_batch(events, sessions, app_states, user_states)
+            except BaseException:
+                self._restore_pending(events, sessions, app_states, user_states)
+                raise
+
+    def _restore_pending(self, events: list, sessions: dict, app_states: dict, user_states: dict) -> None:
+        """Put a failed batch back in front of whatever was buffered while it was being written."""
+        self._pending_events = events + self._pending_events
+        for key, (delta, last_update_time) in self._pending_sessions.items():
+            old_delta, old_time = sessions.get(key, ({}, 0.0))
+            sessions[key] = ({**old_delta, **delta}, max(old_time, last_update_time))
+        self._pending_sessions = sessions
+        for pending, failed in ((self._pending_app_states, app_states), (self._pending_user_states, user_states)):
+            for key, delta in pending.items():
+                failed[key] = {**failed.get(key, {}), **delta}
+        self._pending_app_states = app_states
+        self._pending_user_states = user_states
+
+    async def _write_batch(self, events: list, sessions: dict, app_states: dict, user_states: dict) -> None:
+        async with self._connection() as conn:
+            for (app_name, user_id, session_id), (delta, last_update_time) in sessions.items():
+                async with conn.execute(
+                    "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (app_name, user_id, session_id),
+                ) as cursor:
+                    row = await cursor.fetchone()
+                state = json.loads(row[0]) if row else {}
+                state.update(delta)
+                await conn.execute(
+                    "INSERT INTO sessions (app_name, user_id, id, state, create_time, last_update_time) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (app_name, user_id, id) DO UPDATE SET "
+                    "state = excluded.state, last_update_time = excluded.last_update_time",
+                    (app_name, user_id, session_id, json.dumps(state), last_update_time, last_update_time),
+                )
+            await conn.executemany(
+                "INSERT OR REPLACE INTO events (app_name, user_id, session_id, id, timestamp, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                events,
+            )
+            for app_name, delta in app_states.items():
+                await self._merge_scoped_state(conn, "app_states", (app_name,), delta)
+            for (app_name, user_id), delta in user_states.items():
+                await self._merge_scoped_state(conn, "user_states", (app_name, user_id), delta)
+            await conn.commit()
+
+    async def _load_scoped_state(self, conn: aiosqlite.Connection, table: str, key: tuple) -> dict:
+        where = " AND ".join(f"{col} = ?" for col in ("app_name", "user_id")[: len(key)])
+        async with conn.execute(f"SELECT state FROM {table} WHERE {where}", key) as cursor:
+            row = await cursor.fetchone()
+        return json.loads(row[0]) if row else {}
+
+    async def _merge_scoped_state(
+        self, conn: aiosqlite.Connection, table: str, key: tuple, delta: dict
+    ) -> dict:
+        state = await self._load_scoped_state(conn, table, key)
+        if not delta:
+            return state
+        state.update(delta)
+        columns = ("app_name", "user_id")[: len(key)]
+        await conn.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}, state) VALUES ({', '.join('?' * len(key))}, ?) "
+            f"ON CONFLICT ({', '.join(columns)}) DO UPDATE SET state = excluded.state",
+            (*key, json.dumps(state)),
+        )
+        return state
+
+    async def evict_idle_sessions(self) -> int:
+        """Drop sessions idle longer than the TTL, then trim to ``max_sessions`` by LRU."""
+        await self.flush()
+        async with self._connection() as conn:
+            cursor = await conn.execute(
+                "DELETE FROM sessions WHERE last_update_time < ?",
+                (time.time() - self.session_ttl,),
+            )
+            evicted = cursor.rowcount
+            cursor = await conn.execute(
+                "DELETE FROM sessions WHERE rowid IN ("
+                "SELECT rowid FROM sessions ORDER BY last_update_time DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            )
+            evicted += cursor.rowcount
+            await conn.commit()
+        if evicted:
+            logger.info(f"🧹 Evicted {evicted} idle sessions")
+        return evicted
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.evict_idle_sessions()
+            except Exception as e:
+                logger.error(f"❌ Session eviction failed: {e}")
+
+    async def close(self) -> None:
+        """Flush pending writes, stop background tasks and close the pool."""
+        for task in (self._flush_task, self._sweep_task):
+            if task and not task.done():
+                task.cancel()
+        self._sweep_task = None
+        await self.flush()
+        await self.pool.close()
+
+
+def create_session_service(backend: str | None = None) -> BaseSessionService:
+    """Build the session service selected by ``SESSION_BACKEND``."""
+    backend = (backend or os.getenv("SESSION_BACKEND", "sqlite")).lower()
+    if backend == "memory":
+        return InMemorySessionService()
+    if backend == "sqlite":
+        return SqliteSessionService(
+            db_path=os.getenv("SESSION_DB_PATH", DEFAULT_DB_PATH),
+            pool_size=int(os.getenv("SESSION_DB_POOL_SIZE", "4")),
+            session_ttl=float(os.getenv("SESSION_TTL_SECONDS", str(24 * 60 * 60))),
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "10000")),
+        )
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+
+
+async def ensure_session(
+    service: BaseSessionService, *, app_name: str, user_id: str, session_id: str
+) -> None:
+    """Make sure a session exists, using the backend's single-lookup path when available."""
+    if isinstance(service, SqliteSessionService):
+        await service.ensure_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        return
+    session = await service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    if not session:
+        await service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
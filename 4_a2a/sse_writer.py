@@ -0,0 +1,134 @@
+"""
+SSE Frame Writer Module
+
+Coalesces token-level agent output into fewer Server-Sent Events frames.
+
+With ``StreamingMode.SSE`` every partial event carries a handful of tokens, and
+writing one ``json.dumps`` + frame per event means per-token serialization and
+a socket write per tiny chunk. ``SSEFrameWriter`` merges consecutive partial
+text from the same author into one frame per time window or byte budget,
+flushes immediately when a non-partial event arrives, and reads the agent
+through a bounded queue so a slow client pauses the agent instead of
+buffering without limit.
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import time
+from typing import Any, AsyncGenerator, AsyncIterator
+
+_END = object()
+
+
+def format_sse(data: dict) -> str:
+    """Serialize one SSE ``data:`` frame."""
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def text_frame(author: str, text: str, partial: bool) -> str:
+    return format_sse({"type": "text", "content": text, "author": author, "partial": partial})
+
+
+class SSEFrameWriter:
+    """Turn an async stream of ADK events into coalesced SSE text frames.
+
+    Args:
+        window_ms: Longest time partial text is held before it is flushed.
+        max_bytes: Flush as soon as the buffered UTF-8 text reaches this size.
+        max_pending: Events read ahead of the client before the agent is paused.
+    """
+
+    def __init__(self, window_ms: float = 25.0, max_bytes: int = 2048, max_pending: int = 64):
+        self.window = window_ms / 1000.0
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+
+    @classmethod
+    def from_env(cls) -> "SSEFrameWriter":
+        return cls(
+            window_ms=float(os.getenv("SSE_COALESCE_WINDOW_MS", "25")),
+            max_bytes=int(os.getenv("SSE_COALESCE_MAX_BYTES", "2048")),
+            max_pending=int(os.getenv("SSE_MAX_PENDING_EVENTS", "64")),
+        )
+
+    async def _produce(self, events: AsyncIterator[Any], queue: asyncio.Queue) -> None:
+        try:
+            async for event in events:
+                if not (event.content and event.content.parts):
+                    continue
+                partial = bool(getattr(event, "partial", False))
+                for part in event.content.parts:
+                    text = getattr(part, "text", None)
+                    if text:
+                        # Blocks while the queue is full: backpressure from a slow client
+                        await queue.put((event.author, text, partial))
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(_END)
+
+    async def stream(self, events: AsyncIterator[Any]) -> AsyncGenerator[str, None]:
+        """Yield SSE frames for ``events``; the caller adds any trailing frames."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        producer = asyncio.create_task(self._produce(events, queue))
+
+        author = None
+        buffer: list[str] = []
+        buffered_bytes = 0
+        deadline = 0.0
+
+        def flush() -> str:
+            nonlocal buffer, buffered_bytes
+            frame = text_frame(author, "".join(buffer), True)
+            buffer, buffered_bytes = [], 0
+            return frame
+
+        try:
+            while True:
+                if queue.empty() and buffer:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        yield flush()
+                        continue
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        yield flush()
+                        continue
+                else:
+                    item = await queue.get()
+
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                item_author, text, partial = item
+                if buffer and item_author != author:
+                    yield flush()
+
+                if not partial:
+                    if buffer:
+                        yield flush()
+                    yield text_frame(item_author, text, False)
+                    continue
+
+                if not buffer:
+                    author = item_author
+                    deadline = time.monotonic() + self.window
+                buffer.append(text)
+                buffered_bytes += len(text.encode("utf-8"))
+                if buffered_bytes >= self.max_bytes or time.monotonic() >= deadline:
+                    yield flush()
+
+            if buffer:
+                yield flush()
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            close = getattr(events, "aclose", None)
+            if close is not None:
+                with contextlib.suppress(Exception):
+                    await close()
@@ -39,7 +39,7 @@ pip install --upgrade pip --quiet
 
 # Install dependencies
 echo "📚 Installing dependencies..."
-pip install fastapi uvicorn google-adk a2a-sdk --quiet
+pip install fastapi uvicorn google-adk a2a-sdk aiosqlite --quiet
 
 echo ""
 echo "✅ Setup complete!"
@@ -0,0 +1,162 @@
+"""
+Stream Resume Module
+
+Resumable SSE streams for the FastAPI gateway.
+
+Each agent turn runs in a background task that is independent of the HTTP
+connection and publishes its frames, with an SSE ``id:``, into a bounded ring
+buffer. A client that drops mid-answer reconnects with ``Last-Event-ID``: the
+frames it missed are replayed from the buffer and it then follows the still
+running turn, so no new ``runner.run_async`` invocation (and no new LLM or
+remote A2A call) is started.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import deque
+from typing import AsyncGenerator, AsyncIterator
+
+from sse_writer import format_sse
+
+logger = logging.getLogger(__name__)
+
+
+class TurnInProgressError(RuntimeError):
+    """Raised when a new turn is started while the session's last turn is still running."""
+
+
+class TurnStream:
+    """Frames of one agent turn, replayable by event id.
+
+    Event ids look like ``<turn_id>-<seq>``. While clients are attached the
+    producer waits (up to ``stall_timeout`` seconds) for the slowest one
+    instead of overwriting frames it has not read yet; a turn with no attached
+    client keeps running and only the last ``buffer_size`` frames stay
+    replayable.
+    """
+
+    def __init__(self, session_id: str, buffer_size: int = 256, stall_timeout: float = 10.0):
+        self.session_id = session_id
+        self.turn_id = uuid.uuid4().hex[:12]
+        self.buffer_size = buffer_size
+        self.stall_timeout = stall_timeout
+        self.done = False
+        self.task: asyncio.Task | None = None
+        self._frames: deque[tuple[int, str]] = deque(maxlen=buffer_size)
+        self._last_seq = 0
+        self._cursors: dict[object, int] = {}
+        self._changed = asyncio.Condition()
+
+    def owns(self, last_event_id: str | None) -> bool:
+        """True when ``last_event_id`` is an event id of this turn."""
+        if not last_event_id:
+            return False
+        turn_id, _, seq = last_event_id.rpartition("-")
+        return turn_id == self.turn_id and seq.isdigit()
+
+    def _seq_after(self, last_event_id: str | None) -> int:
+        """Sequence number the client has already seen (0 for a fresh subscriber)."""
+        if not self.owns(last_event_id):
+            return 0
+        return int(last_event_id.rpartition("-")[2])
+
+    async def publish(self, frame: str) -> None:
+        async with self._changed:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.stall_timeout
+            while self._cursors and min(self._cursors.values()) <= self._last_seq - self.buffer_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    # A stuck client must not stall the turn; it will see a gap instead
+                    break
+            self._last_seq += 1
+            self._frames.append((self._last_seq, frame))
+            self._changed.notify_all()
+
+    async def run(self, frames: AsyncIterator[str]) -> None:
+        """Drain ``frames`` into the buffer until the turn finishes."""
+        try:
+            async for frame in frames:
+                await self.publish(frame)
+        except Exception as e:
+            logger.error(f"❌ Agent turn {self.turn_id} failed: {e}")
+            await self.publish(format_sse({"type": "error", "message": str(e)}))
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    async def subscribe(self, last_event_id: str | None = None) -> AsyncGenerator[str, None]:
+        """Replay frames after ``last_event_id`` and follow the turn until it ends."""
+        seq = self._seq_after(last_event_id)
+        cursor = object()
+        async with self._changed:
+            self._cursors[cursor] = seq
+
+        try:
+            while True:
+                async with self._changed:
+                    while self._last_seq <= seq and not self.done:
+                        await self._changed.wait()
+                    pending = [(s, f) for s, f in self._frames if s > seq]
+                    finished = self.done
+
+                if pending and pending[0][0] > seq + 1:
+                    # Frames between the client's id and the buffer start were overwritten
+                    yield format_sse({"type": "gap", "missed": pending[0][0] - seq - 1})
+                for s, frame in pending:
+                    yield f"id: {self.turn_id}-{s}\n{frame}"
+                    seq = s
+
+                async with self._changed:
+                    self._cursors[cursor] = seq
+                    self._changed.notify_all()
+                if finished and seq >= self._last_seq:
+                    return
+        finally:
+            async with self._changed:
+                self._cursors.pop(cursor, None)
+                self._changed.notify_all()
+
+
+class TurnRegistry:
+    """Latest turn per session, kept for ``retention`` seconds after it finishes."""
+
+    def __init__(self, buffer_size: int = 256, retention: float = 120.0):
+        self.buffer_size = buffer_size
+        self.retention = retention
+        self._turns: dict[str, TurnStream] = {}
+
+    def get(self, session_id: str) -> TurnStream | None:
+        return self._turns.get(session_id)
+
+    def start(self, session_id: str, frames: AsyncIterator[str]) -> TurnStream:
+        """Run ``frames`` as the session's new turn in a background task."""
+        current = self._turns.get(session_id)
+        if current and not current.done:
+            raise TurnInProgressError(f"Session {session_id} already has a running turn")
+
+        turn = TurnStream(session_id, buffer_size=self.buffer_size)
+        self._turns[session_id] = turn
+        turn.task = asyncio.create_task(turn.run(frames))
+        turn.task.add_done_callback(lambda _: self._expire_later(turn))
+        return turn
+
+    def _expire_later(self, turn: TurnStream) -> None:
+        def expire():
+            if self._turns.get(turn.session_id) is turn:
+                del self._turns[turn.session_id]
+
+        asyncio.get_running_loop().call_later(self.retention, expire)
+
+    async def close(self) -> None:
+        """Cancel turns that are still running."""
+        tasks = [t.task for t in self._turns.values() if t.task and not t.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -5,39 +5,130 @@ RAG Agent with Pinecone MCP Tools
 """
 
 from google.adk.agents import Agent
-from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
 import os
 from dotenv import load_dotenv
+from adk_extensions.mcp_gateway import create_mcp_toolset
 
 # Load environment variables
 load_dotenv()
 
-# Validate required environment variables
-PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
-
-if not PINECONE_API_KEY:
-    print("⚠️  Warning: PINECONE_API_KEY not set in .env file")
-    print("Pinecone MCP toolset will not be available.")
-    exit(1)
-
-# ตั้งค่า Pinecone MCP Toolset
-# ใช้ Official Pinecone MCP server
-pinecone_mcp_toolset = MCPToolset(
-    connection_params=StdioConnectionParams(
-        server_params=StdioServerParameters(
-            command="npx",
-            args=[
-                "-y",
-                "@pinecone-database/mcp",  # ✅ ชื่อ package ที่ถูกต้อง
-            ],
-            env={
-                "PINECONE_API_KEY": PINECONE_API_KEY,
-            },
-        ),
-    ),
-)
+# RAG backend: pinecone (Pinecone MCP server) | local (local_index.py ไม่ต้องใช้ network)
+RAG_BACKEND = os.getenv("RAG_BACKEND", "pinecone")
+# Pinecone tool: native (search_pinecone เรียก Pinecone SDK ใน process นี้ ดู pinecone_tool.py)
+#                mcp (search-records ของ Pinecone MCP server ผ่าน npx)
+PINECONE_TOOL = os.getenv("PINECONE_TOOL", "native")
+# Search: dense (search-records / search_pinecone) | hybrid (BM25 + vector + RRF ใน search_knowledge ดู hybrid_search.py)
+RAG_SEARCH = os.getenv("RAG_SEARCH", "dense")
+INDEX_NAME = "test-rag-integrated"
+
+try:
+    from .hybrid_search import BM25Index, HybridRetriever, get_reranker, hybrid_search_tool
+    from .hybrid_search import local_dense_search, pinecone_dense_search
+    from .local_index import LocalVectorIndex, index_embedder, search_records_tool
+    from .multi_search import MULTI_SEARCH_FIELDS, multi_search_tool
+    from .pinecone_tool import get_client, get_index, pinecone_search_tool
+    from .semantic_cache import SemanticQueryCache, with_semantic_cache
+except ImportError:  # รันตรง: python agent.py
+    from hybrid_search import BM25Index, HybridRetriever, get_reranker, hybrid_search_tool
+    from hybrid_search import local_dense_search, pinecone_dense_search
+    from local_index import LocalVectorIndex, index_embedder, search_records_tool
+    from multi_search import MULTI_SEARCH_FIELDS, multi_search_tool
+    from pinecone_tool import get_client, get_index, pinecone_search_tool
+    from semantic_cache import SemanticQueryCache, with_semantic_cache
+
+pc = None
+if RAG_BACKEND == "local":
+    # ค้นใน local vector index (สร้างด้วย: python ingest_data.py --local)
+    # tool ชื่อ search_records รับ argument และตอบรูปแบบเดียวกับ search-records ของ Pinecone
+    vector_index = LocalVectorIndex()
+    if RAG_SEARCH == "hybrid":
+        dense_search = local_dense_search(vector_index, index_embedder(vector_index))
+    else:
+        rag_tools = [search_records_tool(vector_index)]
+else:
+    # Validate required environment variables
+    PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+
+    if not PINECONE_API_KEY:
+        print("⚠️  Warning: PINECONE_API_KEY not set in .env file")
+        print("Pinecone MCP toolset will not be available.")
+        exit(1)
+
+    if RAG_SEARCH == "hybrid":
+        # hybrid เรียก Pinecone search API ตรงจาก process นี้ เพื่อรวมผลกับ BM25 ก่อนส่งให้ model
+        pc = get_client()
+        dense_search = pinecone_dense_search(get_index(INDEX_NAME))
+    elif PINECONE_TOOL == "native":
+        # เรียก Pinecone SDK ใน process นี้ ไม่ต้องเปิด Node MCP server
+        # index/namespace ผูกไว้แล้ว และดึงเฉพาะ content/title/category
+        rag_tools = [pinecone_search_tool(get_index(INDEX_NAME))]
+    else:
+        # ตั้งค่า Pinecone MCP Toolset
+        # ใช้ Official Pinecone MCP server
+        # ใช้ MCP gateway กลางเมื่อตั้งค่า MCP_GATEWAY_URL ไม่เช่นนั้นเก็บ MCP server process ที่พร้อมใช้งานไว้ MCP_POOL_SIZE ตัว
+        pinecone_mcp_toolset = create_mcp_toolset(
+            "pinecone",
+            connection_params=StdioConnectionParams(
+                server_params=StdioServerParameters(
+                    command="npx",
+                    args=[
+                        "-y",
+                        "@pinecone-database/mcp",  # ✅ ชื่อ package ที่ถูกต้อง
+                    ],
+                    env={
+                        "PINECONE_API_KEY": PINECONE_API_KEY,
+                    },
+                ),
+            ),
+        )
+        rag_tools = [pinecone_mcp_toolset]
+
+if RAG_SEARCH == "hybrid":
+    # BM25 สร้างตอนรัน ingest_data.py; RERANKER=cross-encoder|pinecone เพื่อจัดอันดับซ้ำ
+    retriever = HybridRetriever(BM25Index(), dense_search, reranker=get_reranker(pc=pc))
+    rag_tools = [hybrid_search_tool(retriever)]
+
+# search_many: ค้นคำถามย่อยหลายข้อใน call เดียว แล้วรวมเป็น context block เดียว (ดู multi_search.py)
+if RAG_SEARCH == "hybrid":
+    many_search = retriever.search
+elif RAG_BACKEND == "local":
+    many_search = local_dense_search(vector_index, index_embedder(vector_index))
+else:
+    many_search = pinecone_dense_search(get_index(INDEX_NAME), fields=MULTI_SEARCH_FIELDS)
+rag_tools.append(multi_search_tool(many_search))
+
+# Semantic cache หน้า search tool: คำถามซ้ำ/ใกล้เคียงไม่ต้อง embed และค้นใหม่
+# ทิ้งผลเก่าเองเมื่อ ingest_data.py เปลี่ยนข้อมูล (SEMANTIC_CACHE_TTL_SECONDS=0 เพื่อปิด)
+if float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600")) > 0:
+    query_cache = SemanticQueryCache.from_env()
+    rag_tools = [with_semantic_cache(tool, query_cache) for tool in rag_tools]
+
+# ขั้นตอนค้นหาใน prompt ตาม RAG_SEARCH
+dense_search_step = """1. เมื่อได้รับคำถามจากผู้ใช้ ให้ใช้ search-records tool เพื่อค้นหาข้อมูลที่เกี่ยวข้อง
+   - ใช้ index name: "test-rag-integrated"
+   - ใช้ namespace: "" (empty string สำหรับ default namespace)
+   - ค้นหา top 5-10 ผลลัพธ์
+   - ส่ง query เป็น text โดยตรง (ไม่ต้องสร้าง embedding เอง!)
+   - ตัวอย่าง: search_records(name="test-rag-integrated", namespace="", query={"topK": 5, "inputs": {"text": "คำถามของผู้ใช้"}})"""
+
+native_search_step = """1. เมื่อได้รับคำถามจากผู้ใช้ ให้ใช้ search_pinecone tool เพื่อค้นหาข้อมูลที่เกี่ยวข้อง
+   - ส่งคำถามเป็น text ใน query (index และ namespace ตั้งไว้ให้แล้ว)
+   - ใช้ top_k=5
+   - ตัวอย่าง: search_pinecone(query="คำถามของผู้ใช้", top_k=5)"""
+
+hybrid_search_step = """1. เมื่อได้รับคำถามจากผู้ใช้ ให้เรียก search_knowledge หนึ่งครั้งด้วยคำถามของผู้ใช้
+   - tool ค้นทั้งแบบ keyword และแบบความหมาย และเรียงผลที่เกี่ยวข้องที่สุดไว้ก่อนแล้ว
+   - ใช้ top_k=5 (ไม่ต้องค้นซ้ำด้วยคำอื่น เว้นแต่ไม่มีผลที่เกี่ยวข้องเลย)
+   - ตัวอย่าง: search_knowledge(query="คำถามของผู้ใช้", top_k=5)"""
+
+if RAG_SEARCH == "hybrid":
+    search_step = hybrid_search_step
+elif RAG_BACKEND != "local" and PINECONE_TOOL == "native":
+    search_step = native_search_step
+else:
+    search_step = dense_search_step
 
 # Agent instruction
 agent_instruction_prompt = """
@@ -51,12 +142,10 @@ agent_instruction_prompt = """
 - ตอบเป็นภาษาไทยที่เข้าใจง่าย
 
 วิธีการทำงาน:
-1. เมื่อได้รับคำถามจากผู้ใช้ ให้ใช้ search-records tool เพื่อค้นหาข้อมูลที่เกี่ยวข้อง
-   - ใช้ index name: "test-rag-integrated"
-   - ใช้ namespace: "" (empty string สำหรับ default namespace)
-   - ค้นหา top 5-10 ผลลัพธ์
-   - ส่ง query เป็น text โดยตรง (ไม่ต้องสร้าง embedding เอง!)
-   - ตัวอย่าง: search_records(name="test-rag-integrated", namespace="", query={"topK": 5, "inputs": {"text": "คำถามของผู้ใช้"}})
+""" + search_step + """
+   - ถ้าคำตอบต้องใช้ข้อมูลหลายเรื่อง ให้แตกเป็นคำถามย่อยสั้นๆ แล้วเรียก search_many ครั้งเดียวแทนการค้นทีละคำถาม
+   - ตัวอย่าง: search_many(queries=["เทคนิคปิดการขาย", "วิธีรับมือเมื่อลูกค้าบอกว่าแพง"], top_k=5)
+   - search_many ตอบเป็น context เดียว แต่ละช่วงขึ้นต้นด้วย [ลำดับ] ชื่อเอกสาร (category)
    
 2. อ่านและวิเคราะห์ข้อมูลที่ได้จากการค้นหา
 
@@ -95,7 +184,7 @@ rag_agent = Agent(
     name='sales_knowledge_assistant',
     description="Sales Knowledge Assistant with RAG - ตอบคำถามเกี่ยวกับทักษะการขายและเทคนิคการขาย",
     instruction=agent_instruction_prompt,
-    tools=[pinecone_mcp_toolset],
+    tools=rag_tools,
 )
 
 # Alias สำหรับ ADK Web UI (ต้องมี root_agent)
@@ -0,0 +1,108 @@
+"""
+Benchmark: chunking throughput on a multi-MB Thai/English corpus
+
+The corpus is built from sample_data/ (ingest_data.py creates it on first
+run): the sample documents are repeated into documents of ``--doc-kb`` KB
+until the corpus reaches ``--mb`` MB. Every chunker in ``chunking.CHUNKERS``
+is timed against the old ``chunk_text`` (character window + ``rfind(' ')``),
+copied here as the baseline.
+
+Run from 5_pinecone_rag_with_mcp_tools/:
+    python benchmarks/bench_chunking.py --mb 8 --doc-kb 64
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunking import CHUNKERS, estimate_tokens, get_chunker  # noqa: E402
+
+SAMPLE_DATA_DIR = Path(__file__).resolve().parent.parent / "sample_data"
+
+
+def legacy_chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    """chunk_text ก่อนมี chunking.py"""
+    chunks = []
+    start = 0
+    text_length = len(text)
+
+    while start < text_length:
+        end = start + chunk_size
+        chunk = text[start:end]
+
+        if end < text_length:
+            last_space = chunk.rfind(' ')
+            if last_space != -1:
+                chunk = chunk[:last_space]
+                end = start + last_space
+
+        chunks.append(chunk.strip())
+        # กันลูปไม่จบ: ช่องว่างสุดท้ายอยู่ก่อน overlap ทำให้ start ไม่ขยับ
+        start = max(end - overlap, start + 1)
+
+    return [c for c in chunks if c]
+
+
+def build_corpus(total_mb: float, doc_kb: int) -> List[str]:
+    texts = [json.loads(p.read_text(encoding="utf-8"))["content"] for p in sorted(SAMPLE_DATA_DIR.glob("*.json"))]
+    if not texts:
+        sys.exit("❌ ไม่พบ sample_data/*.json - รัน ingest_data.py ก่อน")
+    target = int(total_mb * 1024 * 1024)
+    docs, size, i = [], 0, 0
+    while size < target:
+        parts, doc_size = [], 0
+        while doc_size < doc_kb * 1024:
+            text = texts[i % len(texts)]
+            parts.append(text)
+            doc_size += len(text.encode())
+            i += 1
+        docs.append("\n\n".join(parts))
+        size += doc_size
+    return docs
+
+
+def run(label: str, chunk: Callable[[str], List[str]], docs: List[str], mb: float, rounds: int) -> None:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        chunks = [c for doc in docs for c in chunk(doc)]
+        timings.append(time.perf_counter() - started)
+    elapsed = statistics.median(timings)
+    tokens = [estimate_tokens(c) for c in chunks]
+    print(
+        f"{label:<24} {mb / elapsed:>7.1f} MB/s  {len(chunks) / elapsed:>9.0f} chunks/s  "
+        f"chunks={len(chunks):>6}  tokens/chunk avg={statistics.mean(tokens):>5.0f} max={max(tokens):>4}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=8, help="corpus size in MB")
+    parser.add_argument("--doc-kb", type=int, default=64, help="size of each document in KB")
+    parser.add_argument("--tokens", type=int, default=256, help="max_tokens of the token/sentence chunkers")
+    parser.add_argument("--overlap", type=int, default=32, help="overlap_tokens of the token/sentence chunkers")
+    parser.add_argument("--rounds", type=int, default=3, help="runs per chunker (median is reported)")
+    args = parser.parse_args()
+
+    docs = build_corpus(args.mb, args.doc_kb)
+    mb = sum(len(d.encode()) for d in docs) / 1024 / 1024
+    print(f"corpus: {len(docs)} documents, {mb:.1f} MB\n")
+
+    run("legacy chunk_text", legacy_chunk_text, docs, mb, args.rounds)
+    for name in CHUNKERS:
+        if name == "chars":
+            chunker = get_chunker(name, max_tokens=500, overlap_tokens=50)
+        else:
+            chunker = get_chunker(name, max_tokens=args.tokens, overlap_tokens=args.overlap)
+        run(chunker.config, lambda text, c=chunker: list(c.chunks(text)), docs, mb, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: exact-term recall of dense, BM25 and hybrid (RRF) search
+
+Builds a local vector index (hashing embedder) and a BM25 index over
+``--records`` synthetic chunks made from sample_data/ sentences. ``--queries``
+of the chunks also mention a unique Thai product name; each query asks about
+one of those names in a generic sentence, so only the name points at the
+right chunk. Reports hit@k and latency per retriever. Runs fully offline.
+
+Run from 5_pinecone_rag_with_mcp_tools/:
+    python benchmarks/bench_hybrid.py --records 20000 --queries 200 --top-k 5
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_local_search import percentile, sentences  # noqa: E402
+from hybrid_search import BM25Index, HybridRetriever, local_dense_search  # noqa: E402
+from local_index import HashingEmbedder, LocalVectorIndex  # noqa: E402
+
+THAI_SYLLABLES = ["กร", "ทิพ", "มณี", "วา", "รุ่ง", "ศรี", "ธารา", "พัช", "นภา", "ภู", "ดาว", "สิริ", "ชล", "ปรีดา"]
+
+
+def product_name(rng: random.Random) -> str:
+    return "แพ็กเกจ" + "".join(rng.sample(THAI_SYLLABLES, 3)) + str(rng.randint(10, 99))
+
+
+def corpus(count: int, queries: int, pool: list[str], rng: random.Random):
+    """(records, [(query, expected _id)])"""
+    records, probes = [], []
+    targets = set(rng.sample(range(count), queries))
+    for i in range(count):
+        text = " ".join(rng.sample(pool, k=min(4, len(pool))))
+        if i in targets:
+            name = product_name(rng)
+            text = f"{text} {name} เหมาะกับลูกค้าองค์กรที่ต้องการส่วนลดระยะยาว"
+            probes.append((f"ลูกค้าถามเรื่อง{name} ควรตอบอย่างไร", f"syn_{i}"))
+        records.append({"_id": f"syn_{i}", "content": text, "category": "synthetic"})
+    return records, probes
+
+
+async def run(label: str, search, probes, top_k: int) -> None:
+    hits, latencies = 0, []
+    for query, expected in probes:
+        started = time.perf_counter()
+        results = await search(query, top_k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += expected in [hit["_id"] for hit in results]
+    print(f"{label:<8} hit@{top_k}={hits / len(probes):.3f}  "
+          f"p50={statistics.median(latencies):>6.2f}ms  p95={percentile(latencies, 0.95):>6.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000, help="synthetic chunks")
+    parser.add_argument("--queries", type=int, default=200, help="exact-term queries")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    records, probes = corpus(args.records, args.queries, sentences(), random.Random(0))
+    embedder = HashingEmbedder()
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        vector_index = LocalVectorIndex.build(Path(tmp) / "vectors", records, embedder)
+        bm25 = BM25Index.build(Path(tmp) / "bm25", records)
+        print(f"built indexes for {len(records):,} chunks in {time.perf_counter() - started:.1f}s "
+              f"({bm25.meta['terms']:,} BM25 terms, {bm25.meta['tokenizer']})\n")
+
+        dense = local_dense_search(vector_index, embedder)
+        hybrid = HybridRetriever(bm25, dense)
+        await run("dense", lambda q, k: dense(q, k, None), probes, args.top_k)
+        await run("bm25", lambda q, k: asyncio.to_thread(bm25.search, q, k), probes, args.top_k)
+        await run("hybrid", lambda q, k: hybrid.search(q, k), probes, args.top_k)
+        vector_index.close()
+        bm25.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Benchmark: local vector index (local_index.py) search latency and IVF recall
+
+Builds two indexes from ``--records`` synthetic chunks (sentences of
+sample_data/ shuffled into new chunks) with the hashing embedder: a flat one
+(nlist=1, scores every vector) and an IVF one. Reports build time, search
+latency (p50/p95, embedding + search) and the recall@k of IVF against flat.
+Runs fully offline.
+
+Run from 5_pinecone_rag_with_mcp_tools/:
+    python benchmarks/bench_local_search.py --records 50000 --queries 200 --nprobe 8
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_index import HashingEmbedder, LocalVectorIndex, default_nlist  # noqa: E402
+
+SAMPLE_DATA_DIR = Path(__file__).resolve().parent.parent / "sample_data"
+
+
+def sentences() -> list[str]:
+    found = []
+    for path in sorted(SAMPLE_DATA_DIR.glob("*.json")):
+        content = json.loads(path.read_text(encoding="utf-8"))["content"]
+        found.extend(s.strip() for s in re.split(r"\n+|(?<=[.!?])\s+", content) if len(s.strip()) > 10)
+    if not found:
+        sys.exit("❌ ไม่พบ sample_data/*.json - รัน ingest_data.py ก่อน")
+    return found
+
+
+def synthetic_records(count: int, pool: list[str], rng: random.Random):
+    for i in range(count):
+        yield {"_id": f"syn_{i}", "content": " ".join(rng.sample(pool, k=min(4, len(pool)))), "chunk_index": i}
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=50000, help="synthetic chunks in the index")
+    parser.add_argument("--queries", type=int, default=200, help="queries to time")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (default ~sqrt(records))")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF lists searched per query")
+    args = parser.parse_args()
+
+    pool = sentences()
+    embedder = HashingEmbedder()
+    nlist = args.nlist or max(2, default_nlist(args.records))
+    rng = random.Random(0)
+    queries = [" ".join(rng.sample(pool, k=2)) for _ in range(args.queries)]
+    query_vectors = embedder.embed(queries, kind="query")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        indexes = {}
+        for label, lists in (("flat", 1), (f"ivf nlist={nlist}", nlist)):
+            started = time.perf_counter()
+            records = synthetic_records(args.records, pool, random.Random(1))
+            indexes[label] = LocalVectorIndex.build(Path(tmp) / label.split()[0], records, embedder, nlist=lists)
+            print(f"build {label:<16} {time.perf_counter() - started:>6.1f}s  "
+                  f"({args.records:,} vectors, dim {embedder.dim})")
+        print()
+
+        exact = [[row for row, _ in indexes["flat"].search(q, args.top_k)] for q in query_vectors]
+        for label, index in indexes.items():
+            latencies, recalls = [], []
+            for text, truth in zip(queries, exact):
+                started = time.perf_counter()
+                vector = embedder.embed([text], kind="query")[0]
+                rows = [row for row, _ in index.search(vector, args.top_k, nprobe=args.nprobe)]
+                latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(len(set(rows) & set(truth)) / len(truth))
+            print(f"{label:<18} p50={statistics.median(latencies):>6.2f}ms  p95={percentile(latencies, 0.95):>6.2f}ms  "
+                  f"recall@{args.top_k}={statistics.mean(recalls):.3f}")
+        for index in indexes.values():
+            index.close()
+
+
+if __name__ == "__main__":
+    main()
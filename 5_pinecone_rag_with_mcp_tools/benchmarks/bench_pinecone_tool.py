@@ -0,0 +1,121 @@
+"""
+Benchmark: in-process Pinecone tool (pinecone_tool.py) vs the Pinecone MCP server path
+
+Both paths search the same stub Pinecone search API (``stub_pinecone.py http``,
+``--delay-ms`` per search). The MCP path spawns ``stub_pinecone.py mcp`` over
+stdio like ``npx @pinecone-database/mcp`` and calls ``search-records``
+through ADK's ``MCPToolset``; the native path calls ``search_pinecone``, which
+uses the Pinecone SDK with a shared client. Reports startup time, per-call
+latency (p50/p95), response size, and ``--batch`` questions asked one at a
+time vs in one ``queries`` call. Runs fully offline.
+
+Run from 5_pinecone_rag_with_mcp_tools/:
+    python benchmarks/bench_pinecone_tool.py --queries 100 --delay-ms 20 --batch 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams  # noqa: E402
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset  # noqa: E402
+from mcp import StdioServerParameters  # noqa: E402
+from pinecone import Pinecone  # noqa: E402
+
+from bench_local_search import percentile  # noqa: E402
+from pinecone_tool import pinecone_search_tool  # noqa: E402
+from stub_pinecone import serve_http  # noqa: E402
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_pinecone.py")
+QUESTIONS = ["ทักษะการขายที่สำคัญมีอะไรบ้าง", "วิธีรับมือเมื่อลูกค้าบอกว่าแพงไป", "เทคนิคปิดการขาย", "การฟังอย่างตั้งใจคืออะไร"]
+
+
+def mcp_args(text: str, top_k: int) -> dict:
+    return {"name": "test-rag-integrated", "namespace": "", "query": {"topK": top_k, "inputs": {"text": text}}}
+
+
+def response_size(result) -> int:
+    if isinstance(result, list):
+        return sum(response_size(r) for r in result)
+    if hasattr(result, "content"):  # MCP CallToolResult
+        return sum(len(part.text.encode()) for part in result.content)
+    return len(json.dumps(result, ensure_ascii=False).encode())
+
+
+async def timed(label: str, call, count: int) -> float:
+    latencies, size = [], 0
+    for i in range(count):
+        started = time.perf_counter()
+        result = await call(QUESTIONS[i % len(QUESTIONS)] + f" {i}")
+        latencies.append((time.perf_counter() - started) * 1000)
+        size = response_size(result)
+    print(f"{label:<26} p50={statistics.median(latencies):>7.2f}ms  p95={percentile(latencies, 0.95):>7.2f}ms  "
+          f"response={size:,} bytes")
+    return statistics.median(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100, help="timed calls per path")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--delay-ms", type=int, default=20, help="stub search API latency per search")
+    parser.add_argument("--batch", type=int, default=4, help="questions in one batch call")
+    args = parser.parse_args()
+
+    server = serve_http(delay=args.delay_ms / 1000)
+    host = f"http://127.0.0.1:{server.server_port}"
+    toolset = MCPToolset(connection_params=StdioConnectionParams(
+        server_params=StdioServerParameters(
+            command=sys.executable,
+            args=[STUB_SERVER, "mcp"],
+            env={**os.environ, "STUB_PINECONE_HOST": host},
+        ),
+    ))
+
+    async def mcp_call(text):
+        return await mcp_tool.run_async(args=mcp_args(text, args.top_k), tool_context=None)
+
+    async def native_call(text):
+        return await native_tool.run_async(args={"query": text, "top_k": args.top_k}, tool_context=None)
+
+    async def mcp_sequential(text):
+        return [await mcp_call(f"{text} {j}") for j in range(args.batch)]
+
+    async def native_batch(text):
+        queries = [f"{text} {j}" for j in range(args.batch)]
+        return await native_tool.run_async(args={"queries": queries, "top_k": args.top_k}, tool_context=None)
+
+    try:
+        started = time.perf_counter()
+        mcp_tool = {tool.name: tool for tool in await toolset.get_tools()}["search-records"]
+        await mcp_call("warm up")
+        mcp_startup = time.perf_counter() - started
+
+        started = time.perf_counter()
+        native_tool = pinecone_search_tool(Pinecone(api_key="stub").Index(host=host))
+        await native_call("warm up")
+        native_startup = time.perf_counter() - started
+        print(f"startup + first call: mcp {mcp_startup * 1000:.0f}ms, native {native_startup * 1000:.0f}ms "
+              f"(stub search {args.delay_ms}ms)\n")
+
+        mcp_p50 = await timed("mcp search-records", mcp_call, args.queries)
+        native_p50 = await timed("native search_pinecone", native_call, args.queries)
+        print(f"overhead over the stub search: mcp {mcp_p50 - args.delay_ms:.2f}ms, "
+              f"native {native_p50 - args.delay_ms:.2f}ms\n")
+
+        count = max(1, args.queries // args.batch)
+        await timed(f"mcp {args.batch} calls", mcp_sequential, count)
+        await timed(f"native batch of {args.batch}", native_batch, count)
+    finally:
+        await toolset.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Stub Pinecone search API and stub Pinecone MCP server for the benchmarks.
+
+``http``: serves ``POST /records/namespaces/{namespace}/search`` like a Pinecone
+index host. Every search sleeps ``STUB_PINECONE_DELAY_MS`` milliseconds (network
+round trip + embedding) and returns ``top_k`` synthetic hits with the fields the
+ingest writes (content, title, category, doc_key, chunk_index, ...), or only the
+requested ``fields``.
+
+``mcp``: a stdio MCP server with the ``search-records`` tool of
+``@pinecone-database/mcp`` that forwards every call to ``STUB_PINECONE_HOST``.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DELAY = float(os.getenv("STUB_PINECONE_DELAY_MS", "20")) / 1000
+CONTENT = "การฟังอย่างตั้งใจช่วยให้นักขายเข้าใจความต้องการที่แท้จริงของลูกค้า " * 6
+
+
+def search_response(body: dict) -> dict:
+    query = body["query"]
+    text = query["inputs"]["text"]
+    fields = body.get("fields")
+    hits = []
+    for i in range(query["top_k"]):
+        record = {
+            "content": f"{text} {CONTENT}",
+            "title": "ทักษะการขายที่สำคัญ",
+            "category": "sales_skills",
+            "doc_key": "sales_skills_1",
+            "chunk_index": i,
+            "total_chunks": query["top_k"],
+            "content_hash": "0" * 64,
+            "chunker": "sentences:256:32",
+        }
+        if fields:
+            record = {k: v for k, v in record.items() if k in fields}
+        hits.append({"_id": f"sales_skills_1_chunk_{i}", "_score": 1.0 - i / 100, "fields": record})
+    return {"result": {"hits": hits}, "usage": {"read_units": 1, "embed_total_tokens": 12}}
+
+
+class SearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers กับ body ถูกเขียนแยกกัน; ไม่ปิด Nagle แล้ว keep-alive client จะรอ delayed ACK ~40ms
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delay)
+        payload = json.dumps(search_response(body), ensure_ascii=False).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_http(port: int = 0, delay: float = DELAY) -> ThreadingHTTPServer:
+    """Starts the stub search API in a background thread; the URL is ``http://127.0.0.1:{server.server_port}``"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), SearchHandler)
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_mcp() -> None:
+    from mcp.server.fastmcp import FastMCP
+
+    host = os.environ["STUB_PINECONE_HOST"]
+    mcp = FastMCP("stub-pinecone", log_level="WARNING")
+
+    def post(namespace: str, body: dict) -> str:
+        request = urllib.request.Request(
+            f"{host}/records/namespaces/{namespace}/search",
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as response:
+            return response.read().decode()
+
+    @mcp.tool(name="search-records")
+    def search_records(name: str, namespace: str, query: dict, rerank: dict | None = None) -> str:
+        body = {"query": {"top_k": query.get("topK", 10), "inputs": query["inputs"], "filter": query.get("filter")}}
+        return post(namespace or "__default__", body)
+
+    mcp.run("stdio")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["mcp"]:
+        serve_mcp()
+    else:
+        server = serve_http(int(sys.argv[2]) if len(sys.argv) > 2 else 8081)
+        print(f"stub Pinecone search API on http://127.0.0.1:{server.server_port}")
+        threading.Event().wait()
@@ -0,0 +1,250 @@
+"""
+Chunking Engine
+- แบ่งข้อความเป็น chunk ในรอบเดียว (linear pass) แบบ generator ไม่ slice ข้อความซ้ำ
+- ไม่ตัดกลางคำภาษาไทย: ใช้ pythainlp ตัดคำถ้าติดตั้งไว้ ถ้าไม่มีจะใช้ทั้งช่วงข้อความไทย
+  ระหว่างช่องว่างเป็นหนึ่งหน่วย (และตัดที่ขอบพยางค์เฉพาะช่วงที่ยาวเกินทั้ง chunk)
+- เลือก chunker ได้ด้วย ``get_chunker(name)``:
+    - ``chars``: ตามจำนวนตัวอักษร (แบบเดิม) ตัดที่ขอบคำ
+    - ``tokens``: ตามงบ token
+    - ``sentences``: รวมทีละประโยค/ย่อหน้าจนเต็มงบ token
+
+ข้อความถูกแยกเป็นหน่วย (คำ ช่องว่าง จุดจบประโยค ย่อหน้า) ด้วย regex ครั้งเดียว
+ช่องว่างหลายตัวถูกย่อเหลือหนึ่งตัว
+แต่ละ chunk ต่อหน่วยด้วย ``"".join`` ครั้งเดียว overlap ใช้หน่วยท้ายของ chunk ก่อนหน้า
+"""
+
+import re
+from typing import Callable, Iterator, List, Optional, Tuple
+
+try:
+    from pythainlp.tokenize import word_tokenize as _thai_word_tokenize
+except ImportError:  # optional: pip install pythainlp
+    _thai_word_tokenize = None
+
+THAI_RUN = re.compile(r"[฀-๿]+")
+# หน่วยของข้อความ: ย่อหน้า | ช่องว่าง | ข้อความไทย | คำอื่น ๆ
+_UNIT = re.compile(r"(?P<para>\n[ \t]*\n\s*)|(?P<space>\s+)|(?P<thai>[฀-๿]+)|(?P<word>[^\s฀-๿]+)")
+_SENTENCE_END = (".", "!", "?", ":", ";")
+_CLOSING = "\"')]”’»"
+
+# สระ/วรรณยุกต์ที่ต้องอยู่กับพยัญชนะตัวหน้า และสระที่ต้องอยู่กับพยัญชนะตัวถัดไป
+_THAI_COMBINING = set("ัิีึืฺุู็่้๊๋์ํ๎")
+_THAI_LEADING = set("เแโใไ")
+
+Unit = Tuple[str, str, int]  # (text, kind, tokens)
+
+
+def estimate_tokens(text: str) -> int:
+    """ประมาณจำนวน token ของ multilingual-e5 / XLM-R: ~4 ตัวอักษรละตินหรือ ~2.5 ตัวอักษรไทยต่อ token"""
+    # ตัวอักษรไทยใช้ 3 bytes ใน UTF-8: นับจากความยาว bytes แทนการวนทีละตัว
+    non_ascii = (len(text.encode()) - len(text)) // 2
+    ascii_chars = len(text) - non_ascii
+    return (ascii_chars + 3) // 4 + (non_ascii * 2 + 4) // 5
+
+
+def _thai_clusters(text: str) -> Iterator[str]:
+    """แบ่งข้อความไทยที่ขอบพยางค์ (ไม่แยกสระ/วรรณยุกต์ออกจากพยัญชนะ)"""
+    start = 0
+    for i in range(1, len(text)):
+        if text[i] not in _THAI_COMBINING and text[i - 1] not in _THAI_LEADING:
+            yield text[start:i]
+            start = i
+    yield text[start:]
+
+
+class Chunker:
+    """Base class: แยกข้อความเป็นหน่วยแล้วให้ subclass รวมเป็น chunk"""
+
+    name = ""
+    # เพิ่มเมื่อผลการแบ่งของ chunker เปลี่ยน เพื่อให้ ingest chunk เอกสารเดิมใหม่
+    version = 1
+    # ช่องว่าง/ย่อหน้าไม่นับเป็น token (tokenizer ไม่สร้าง token ให้) แต่นับเป็นตัวอักษร
+    count_separators = False
+
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 32,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+        self.count = token_counter
+
+    @property
+    def config(self) -> str:
+        """ใช้ใน manifest: เปลี่ยนค่านี้ = ทุกเอกสารถูก chunk ใหม่"""
+        config = f"{self.name}:{self.max_tokens}:{self.overlap_tokens}:{'pythainlp' if _thai_word_tokenize else 'runs'}"
+        return config if self.version == 1 else f"{config}:v{self.version}"
+
+    def units(self, text: str) -> Iterator[Unit]:
+        for match in _UNIT.finditer(text):
+            kind = match.lastgroup
+            piece = match.group()
+            if kind == "thai":
+                words = _thai_word_tokenize(piece, engine="newmm") if _thai_word_tokenize else [piece]
+                for word in words:
+                    yield from self._fit(word, "word")
+            elif kind == "word":
+                is_end = piece.rstrip(_CLOSING).endswith(_SENTENCE_END)
+                yield from self._fit(piece, "end" if is_end else "word")
+            else:
+                # ช่องว่าง/ย่อหน้าเยื้องถูกย่อเหลือตัวเดียว ไม่ส่ง whitespace ไปให้ embed
+                separator = "\n\n" if kind == "para" else ("\n" if "\n" in piece else " ")
+                yield separator, kind, self.count(separator) if self.count_separators else 0
+
+    def _fit(self, piece: str, kind: str) -> Iterator[Unit]:
+        """หน่วยที่ใหญ่กว่าทั้ง chunk ถูกตัดที่ขอบพยางค์/ตัวอักษรเป็นชิ้นละ ~1/8 chunk
+        เพื่อให้เติม chunk ปัจจุบันจนเต็มและมี overlap ได้"""
+        tokens = self.count(piece)
+        if tokens <= self.max_tokens:
+            yield piece, kind, tokens
+            return
+        limit = max(1, self.max_tokens // 8)
+        parts = _thai_clusters(piece) if THAI_RUN.fullmatch(piece) else iter(piece)
+        buf: List[str] = []
+        buf_tokens = 0
+        for part in parts:
+            part_tokens = self.count(part)
+            if buf and buf_tokens + part_tokens > limit:
+                yield "".join(buf), "word", buf_tokens
+                buf, buf_tokens = [], 0
+            buf.append(part)
+            buf_tokens += part_tokens
+        if buf:
+            yield "".join(buf), kind, buf_tokens
+
+    def chunks(self, text: str) -> Iterator[str]:
+        raise NotImplementedError
+
+    def _pack(self, units: Iterator[Unit], state: list) -> Iterator[str]:
+        """เติมหน่วยลง chunk ปัจจุบัน ``state = [units, tokens, fresh]`` และ yield chunk ที่เต็ม"""
+        current, tokens, fresh = state
+        for unit in units:
+            if current and unit[2] and tokens + unit[2] > self.max_tokens:
+                if fresh:
+                    chunk = self._emit(current)
+                    if chunk:
+                        yield chunk
+                    current, tokens = self._overlap(current)
+                if tokens + unit[2] > self.max_tokens:
+                    # overlap ไม่พอที่ให้หน่วยนี้: ไม่ส่ง chunk ที่มีแต่ overlap ซ้ำ
+                    current, tokens = [], 0
+                fresh = 0
+            current.append(unit)
+            tokens += unit[2]
+            fresh += unit[2]
+        state[:] = [current, tokens, fresh]
+
+    def _emit(self, units: List[Unit]) -> Optional[str]:
+        chunk = "".join(u[0] for u in units).strip()
+        return chunk or None
+
+    def _overlap(self, units: List[Unit]) -> Tuple[List[Unit], int]:
+        """หน่วยท้าย chunk ที่ใช้ขึ้นต้น chunk ถัดไป (ไม่เกิน overlap_tokens)"""
+        carry: List[Unit] = []
+        tokens = 0
+        for unit in reversed(units):
+            if tokens + unit[2] > self.overlap_tokens:
+                break
+            carry.append(unit)
+            tokens += unit[2]
+        carry.reverse()
+        # ไม่ขึ้นต้น chunk ด้วยช่องว่างหรือเศษท้ายประโยค
+        while carry and carry[0][1] in ("space", "para", "end"):
+            tokens -= carry.pop(0)[2]
+        return carry, tokens
+
+
+class TokenChunker(Chunker):
+    """รวมหน่วยจนเต็มงบ ``max_tokens`` แล้วขึ้น chunk ใหม่ โดยซ้อนท้าย ``overlap_tokens``"""
+
+    name = "tokens"
+
+    def chunks(self, text: str) -> Iterator[str]:
+        state: list = [[], 0, 0]
+        yield from self._pack(self.units(text), state)
+        if state[2]:
+            chunk = self._emit(state[0])
+            if chunk:
+                yield chunk
+
+
+class SentenceChunker(Chunker):
+    """รวมทีละประโยคจนเต็มงบ token; ขึ้น chunk ใหม่ที่ย่อหน้าถ้า chunk เต็มเกินครึ่งแล้ว
+
+    ภาษาไทยไม่มีเครื่องหมายจบประโยค จึงถือช่องว่างหลังข้อความไทยเป็นขอบประโยค
+    ประโยคที่ยาวเกินงบถูกแบ่งตามงบ token แบบ ``TokenChunker``
+    """
+
+    name = "sentences"
+    # v2: เก็บตัวคั่นย่อหน้าที่อยู่ภายใน chunk
+    version = 2
+
+    def sentences(self, text: str) -> Iterator[Tuple[List[Unit], bool]]:
+        """(หน่วยของประโยค, เริ่มย่อหน้าใหม่หรือไม่); ประโยคแรกของย่อหน้าขึ้นต้นด้วยหน่วย ``para``"""
+        sentence: List[Unit] = []
+        new_paragraph = False
+        previous_thai = False
+        for unit in self.units(text):
+            text_, kind, _ = unit
+            if kind == "para":
+                if sentence:
+                    yield sentence, new_paragraph
+                # เก็บตัวคั่นย่อหน้าไว้ ไม่เช่นนั้นย่อหน้าใน chunk เดียวกันจะติดกันเป็นคำเดียว
+                sentence, new_paragraph, previous_thai = [unit], True, False
+                continue
+            sentence.append(unit)
+            if kind == "end" or (kind == "space" and previous_thai):
+                yield sentence, new_paragraph
+                sentence, new_paragraph = [], False
+            if kind != "space":
+                previous_thai = bool(THAI_RUN.match(text_[-1:]))
+        if sentence:
+            yield sentence, new_paragraph
+
+    def chunks(self, text: str) -> Iterator[str]:
+        state: list = [[], 0, 0]
+        for sentence, new_paragraph in self.sentences(text):
+            current, tokens, fresh = state
+            sentence_tokens = sum(u[2] for u in sentence)
+            if sentence_tokens > self.max_tokens:
+                # ประโยคยาวเกินงบ: ต่อท้าย chunk ปัจจุบันแล้วแบ่งตามงบ token
+                yield from self._pack(iter(sentence), state)
+                continue
+            full = tokens + sentence_tokens > self.max_tokens
+            paragraph_break = new_paragraph and tokens * 2 >= self.max_tokens
+            if fresh and (full or paragraph_break):
+                chunk = self._emit(current)
+                if chunk:
+                    yield chunk
+                current, tokens = self._overlap(current)
+                if tokens + sentence_tokens > self.max_tokens:
+                    current, tokens = [], 0
+                fresh = 0
+            current.extend(sentence)
+            state[:] = [current, tokens + sentence_tokens, fresh + sentence_tokens]
+        if state[2]:
+            chunk = self._emit(state[0])
+            if chunk:
+                yield chunk
+
+
+class CharChunker(TokenChunker):
+    """แบ่งตามจำนวนตัวอักษร (``max_tokens`` = ตัวอักษร) ตัดที่ขอบคำ; overlap เป็นตัวอักษร"""
+
+    name = "chars"
+    count_separators = True
+
+    def __init__(self, max_tokens: int = 500, overlap_tokens: int = 50, token_counter=None):
+        super().__init__(max_tokens, overlap_tokens, token_counter=len)
+
+
+CHUNKERS = {
+    "chars": CharChunker,
+    "tokens": TokenChunker,
+    "sentences": SentenceChunker,
+}
+
+
+def get_chunker(name: str = "sentences", **kwargs) -> Chunker:
+    try:
+        return CHUNKERS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown chunker {name!r}; choose from {', '.join(CHUNKERS)}")
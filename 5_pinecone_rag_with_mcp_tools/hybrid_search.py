@@ -0,0 +1,345 @@
+"""
+Hybrid Search (BM25 + Vector)
+- BM25 inverted index บนดิสก์ สร้างตอนรัน ``ingest_data.py`` (``.bm25_index/``)
+- ค้นด้วย BM25 และ vector search พร้อมกัน แล้วรวมอันดับด้วย Reciprocal Rank Fusion
+  (RRF: score = sum(1 / (k + rank))) คำเฉพาะภาษาไทยที่ vector หาไม่เจอจึงยังติดผล
+- Reranker แบบ optional (``RERANKER``): ``cross-encoder`` (sentence-transformers)
+  หรือ ``pinecone`` (hosted ``bge-reranker-v2-m3``) จัดอันดับ candidate ที่รวมแล้วอีกรอบ
+- ``hybrid_search_tool``: ADK tool ที่ค้นครั้งเดียวได้ top-k ที่จัดอันดับแล้ว
+
+Vector search มาจาก local index (``RAG_BACKEND=local``) หรือ Pinecone search API
+ภาษาไทยตัดคำด้วย pythainlp ถ้าติดตั้งไว้ ไม่เช่นนั้นใช้ character bigram
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from google.adk.tools.function_tool import FunctionTool
+
+try:
+    from .chunking import THAI_RUN, _thai_word_tokenize
+    from .local_index import RecordFile, RecordWriter, matches_filter
+except ImportError:  # รันตรงจากโฟลเดอร์นี้ (ingest_data.py, benchmarks)
+    from chunking import THAI_RUN, _thai_word_tokenize
+    from local_index import RecordFile, RecordWriter, matches_filter
+
+logger = logging.getLogger(__name__)
+
+BM25_INDEX_DIR = Path(os.getenv("BM25_INDEX_DIR", Path(__file__).parent / ".bm25_index"))
+RRF_K = 60
+
+_TOKEN = re.compile(r"[฀-๿]+|[^\W_]+")
+
+Hit = Dict[str, Any]  # {"_id", "_score", "fields"}
+DenseSearch = Callable[[str, int, Optional[Dict[str, Any]]], Awaitable[List[Hit]]]
+
+
+def tokenizer_config() -> str:
+    return "pythainlp" if _thai_word_tokenize else "bigrams"
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """คำภาษาอังกฤษ/ตัวเลข และคำไทย (pythainlp) หรือ bigram ของตัวอักษรไทย"""
+    for match in _TOKEN.finditer(text.lower()):
+        token = match.group()
+        if not THAI_RUN.fullmatch(token):
+            yield token
+        elif _thai_word_tokenize:
+            yield from (w for w in _thai_word_tokenize(token, engine="newmm") if w.strip())
+        elif len(token) == 1:
+            yield token
+        else:
+            yield from (token[i:i + 2] for i in range(len(token) - 1))
+
+
+# -- BM25 ----------------------------------------------------------------------
+
+
+class BM25Index:
+    """BM25 (Okapi) บน inverted index แบบ CSR: postings ของแต่ละคำเรียงติดกันใน array เดียว
+
+    ไฟล์ใน ``BM25_INDEX_DIR``: meta.json, vocab.json (คำ -> term id), postings_offsets.npy,
+    postings_docs.npy, postings_tf.npy, doc_len.npy และ records.jsonl (``RecordWriter``)
+    """
+
+    def __init__(self, path: Path = BM25_INDEX_DIR, k1: float = 1.2, b: float = 0.75):
+        self.path = Path(path)
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"ไม่พบ BM25 index ที่ {self.path} - รัน: python ingest_data.py")
+        self.meta = json.loads(meta_path.read_text())
+        if self.meta["tokenizer"] != tokenizer_config():
+            raise ValueError(
+                f"BM25 index ตัดคำด้วย {self.meta['tokenizer']} แต่ตอนนี้ใช้ {tokenizer_config()} "
+                "- รัน python ingest_data.py ใหม่"
+            )
+        self.k1 = k1
+        self.b = b
+        self.count = self.meta["count"]
+        self.avg_len = self.meta["avg_len"] or 1.0
+        self.vocab: Dict[str, int] = json.loads((self.path / "vocab.json").read_text(encoding="utf-8"))
+        self.offsets = np.load(self.path / "postings_offsets.npy")
+        self.docs = np.load(self.path / "postings_docs.npy", mmap_mode="r")
+        self.tf = np.load(self.path / "postings_tf.npy", mmap_mode="r")
+        self.doc_len = np.load(self.path / "doc_len.npy")
+        self.records = RecordFile(self.path)
+
+    @classmethod
+    def build(cls, path: Path, records: Iterable[Dict[str, Any]], text_field: str = "content") -> "BM25Index":
+        """สร้าง index จาก records (เขียนที่ไดเรกทอรีชั่วคราวแล้วสลับ)"""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        vocab: Dict[str, int] = {}
+        postings: Dict[int, List[tuple]] = defaultdict(list)
+        doc_len: List[int] = []
+        writer = RecordWriter(tmp)
+        for record in records:
+            row = writer.write(record)
+            counts = Counter(tokenize(record.get(text_field, "")))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[vocab.setdefault(term, len(vocab))].append((row, tf))
+        writer.close()
+
+        lengths = np.fromiter((len(postings[t]) for t in range(len(vocab))), dtype=np.int64, count=len(vocab))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        docs = np.empty(int(offsets[-1]), dtype=np.int32)
+        tfs = np.empty(int(offsets[-1]), dtype=np.float32)
+        for term, items in postings.items():
+            start = offsets[term]
+            docs[start:start + len(items)] = [row for row, _ in items]
+            tfs[start:start + len(items)] = [tf for _, tf in items]
+
+        np.save(tmp / "postings_offsets.npy", offsets)
+        np.save(tmp / "postings_docs.npy", docs)
+        np.save(tmp / "postings_tf.npy", tfs)
+        np.save(tmp / "doc_len.npy", np.asarray(doc_len, dtype=np.float32))
+        (tmp / "vocab.json").write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+        (tmp / "meta.json").write_text(json.dumps({
+            "count": len(doc_len),
+            "avg_len": float(np.mean(doc_len)) if doc_len else 0.0,
+            "terms": len(vocab),
+            "tokenizer": tokenizer_config(),
+            "text_field": text_field,
+        }, indent=2))
+
+        shutil.rmtree(path, ignore_errors=True)
+        tmp.rename(path)
+        return cls(path)
+
+    def search(self, text: str, top_k: int = 10, filter: Optional[Dict[str, Any]] = None) -> List[Hit]:
+        if not self.count:
+            return []
+        scores = np.zeros(self.count, dtype=np.float32)
+        for term in set(tokenize(text)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs, tf = self.docs[start:end], self.tf[start:end]
+            idf = math.log(1 + (self.count - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[docs] / self.avg_len)
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        candidates = np.flatnonzero(scores)
+        if filter:
+            candidates = candidates[np.argsort(-scores[candidates])]
+        else:
+            k = min(top_k, len(candidates))
+            if not k:
+                return []
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            candidates = candidates[np.argsort(-scores[candidates])]
+
+        hits = []
+        for row in candidates:
+            record = self.records[int(row)]
+            if filter and not matches_filter(record, filter):
+                continue
+            hits.append({"_id": record.pop("_id", str(row)), "_score": float(scores[row]), "fields": record})
+            if len(hits) == top_k:
+                break
+        return hits
+
+    def close(self) -> None:
+        self.records.close()
+
+
+# -- dense search sources ----------------------------------------------------------
+
+
+def local_dense_search(index, embedder) -> DenseSearch:
+    """Vector search จาก ``LocalVectorIndex``"""
+
+    def search_sync(text: str, top_k: int, filter: Optional[Dict[str, Any]]) -> List[Hit]:
+        vector = embedder.embed([text], kind="query")[0]
+        hits = []
+        for row, score in index.search(vector, top_k=top_k, filter=filter):
+            record = index.record(row)
+            hits.append({"_id": record.pop("_id", str(row)), "_score": score, "fields": record})
+        return hits
+
+    async def search(text: str, top_k: int, filter: Optional[Dict[str, Any]]) -> List[Hit]:
+        # embed (e5 ใช้เวลาหลาย ms) และ IVF search ใน thread เหมือน BM25 ไม่บล็อก event loop
+        # HybridRetriever.search และ search_many จึงค้นหลายทางพร้อมกันได้จริง
+        return await asyncio.to_thread(search_sync, text, top_k, filter)
+
+    return search
+
+
+def pinecone_dense_search(index, namespace: str = "", fields: Optional[Iterable[str]] = None) -> DenseSearch:
+    """Vector search จาก Pinecone index ที่มี integrated embedding (Pinecone SDK ``index.search``)
+
+    ``fields``: ดึงเฉพาะ field เหล่านี้ (ทุก field ถ้าไม่ระบุ)
+    """
+    fields = list(fields) if fields else None
+
+    async def search(text: str, top_k: int, filter: Optional[Dict[str, Any]]) -> List[Hit]:
+        response = await asyncio.to_thread(
+            index.search,
+            # search API เรียก default namespace ว่า "__default__"
+            namespace=namespace or "__default__",
+            top_k=top_k,
+            inputs={"text": text},
+            filter=filter,
+            fields=fields,
+        )
+        return [{"_id": hit.id, "_score": hit.score, "fields": dict(hit.fields or {})} for hit in response.result.hits]
+
+    return search
+
+
+# -- rerankers -------------------------------------------------------------------
+
+
+class CrossEncoderReranker:
+    """Cross-encoder ขนาดเล็กแบบ multilingual ผ่าน sentence-transformers (``pip install sentence-transformers``)"""
+
+    def __init__(self, model_name: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            raise ImportError("RERANKER=cross-encoder ต้องติดตั้ง sentence-transformers: pip install sentence-transformers")
+        self.model = CrossEncoder(model_name)
+
+    async def rerank(self, query: str, hits: List[Hit], text_field: str = "content") -> List[float]:
+        pairs = [(query, hit["fields"].get(text_field, "")) for hit in hits]
+        return [float(s) for s in await asyncio.to_thread(self.model.predict, pairs)]
+
+
+class PineconeReranker:
+    """Pinecone hosted reranker (``pc.inference.rerank``)"""
+
+    def __init__(self, pc, model: str = "bge-reranker-v2-m3"):
+        self.pc = pc
+        self.model = model
+
+    async def rerank(self, query: str, hits: List[Hit], text_field: str = "content") -> List[float]:
+        documents = [{"id": hit["_id"], "text": hit["fields"].get(text_field, "")} for hit in hits]
+        result = await asyncio.to_thread(
+            self.pc.inference.rerank, model=self.model, query=query, documents=documents, top_n=len(documents),
+        )
+        scores = [0.0] * len(hits)
+        for row in result.data:
+            scores[row.index] = float(row.score)
+        return scores
+
+
+def get_reranker(name: Optional[str] = None, pc=None):
+    name = name if name is not None else os.getenv("RERANKER", "")
+    if name in ("", "none"):
+        return None
+    if name == "cross-encoder":
+        model = os.getenv("RERANKER_MODEL")
+        return CrossEncoderReranker(model) if model else CrossEncoderReranker()
+    if name == "pinecone":
+        if pc is None:
+            from pinecone import Pinecone
+            pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        return PineconeReranker(pc, os.getenv("RERANKER_MODEL", "bge-reranker-v2-m3"))
+    raise ValueError(f"Unknown reranker {name!r}; choose from none, cross-encoder, pinecone")
+
+
+# -- hybrid retriever ---------------------------------------------------------------
+
+
+def reciprocal_rank_fusion(rankings: List[List[Hit]], k: int = RRF_K) -> List[Hit]:
+    """รวมหลายอันดับเป็นอันดับเดียว: score = sum(1 / (k + rank)) ต่อ _id"""
+    fused: Dict[str, Hit] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            entry = fused.setdefault(hit["_id"], {"_id": hit["_id"], "_score": 0.0, "fields": {}})
+            entry["_score"] += 1.0 / (k + rank)
+            entry["fields"] = entry["fields"] or hit["fields"]
+    return sorted(fused.values(), key=lambda hit: hit["_score"], reverse=True)
+
+
+class HybridRetriever:
+    """BM25 + vector search -> RRF -> (optional) reranker -> top-k"""
+
+    def __init__(self, bm25: BM25Index, dense: DenseSearch, reranker=None,
+                 candidates: int = 30, rrf_k: int = RRF_K):
+        self.bm25 = bm25
+        self.dense = dense
+        self.reranker = reranker
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    async def search(self, text: str, top_k: int = 5, filter: Optional[Dict[str, Any]] = None) -> List[Hit]:
+        started = time.perf_counter()
+        lexical, dense = await asyncio.gather(
+            asyncio.to_thread(self.bm25.search, text, self.candidates, filter),
+            self.dense(text, self.candidates, filter),
+        )
+        hits = reciprocal_rank_fusion([lexical, dense], k=self.rrf_k)
+        if self.reranker is not None and hits:
+            pool = hits[:self.candidates]
+            scores = await self.reranker.rerank(text, pool)
+            for hit, score in zip(pool, scores):
+                hit["_score"] = score
+            hits = sorted(pool, key=lambda hit: hit["_score"], reverse=True)
+        logger.info(
+            f"🔀 hybrid search: bm25={len(lexical)} dense={len(dense)} -> {min(top_k, len(hits))} hits "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return hits[:top_k]
+
+
+def hybrid_search_tool(retriever: HybridRetriever) -> FunctionTool:
+    """``search_knowledge``: ค้นครั้งเดียวได้ผลที่รวม BM25 + vector และจัดอันดับแล้ว"""
+
+    async def search_knowledge(query: str, top_k: int = 5, category: str = "") -> dict:
+        """Search the sales knowledge base with keyword (BM25) and semantic search combined.
+
+        The results are already fused and ranked, so one call per question is enough.
+
+        Args:
+            query: The user's question or the key terms to look up, in the user's language.
+            top_k: Number of results to return (default 5).
+            category: Optional category to restrict the search to (e.g. "sales_skills").
+
+        Returns:
+            {"result": {"hits": [{"_id", "_score", "fields": {"content", "title", "category", ...}}]}}
+        """
+        if not query.strip():
+            return {"error": "query is required"}
+        filter = {"category": {"$eq": category}} if category else None
+        hits = await retriever.search(query, top_k=max(1, min(int(top_k), 20)), filter=filter)
+        for hit in hits:
+            hit["_score"] = round(hit["_score"], 6)
+        return {"result": {"hits": hits}}
+
+    return FunctionTool(search_knowledge)
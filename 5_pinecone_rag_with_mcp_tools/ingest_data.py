@@ -1,31 +1,71 @@
 #!/usr/bin/env python3
 """
 Ingest Data to Pinecone Index with Integrated Embedding
-- อ่านข้อมูลจาก sample_data/
-- แบ่ง chunk
+- อ่านข้อมูลจาก sample_data/ ทีละไฟล์ (ไม่โหลดทั้งหมดเข้า memory)
+- แบ่ง chunk ตามประโยค/งบ token (chunking.py)
 - Upsert เข้า Pinecone (Pinecone จะสร้าง embedding ให้อัตโนมัติ)
 - ไม่ต้องเรียก OpenAI API เอง!
+
+Pipeline: document reader -> chunker -> batches of 96 records -> bounded
+asyncio queue -> N concurrent upsert workers. Throttling (429) and server
+errors are retried with jittered exponential backoff.
+
+Re-ingestion is incremental: a SQLite manifest (``ingest_manifest.py``) keeps
+the content hash of every document and chunk. Unchanged documents are not
+even chunked, only new or changed chunks are upserted, and ids that no longer
+exist (removed documents, documents that got shorter) are deleted from the
+index. Record ids come from the file name, not from the file order. A chunk
+is written to the manifest once Pinecone acknowledged its batch, and a
+document's hash only once its chunks are upserted and its orphan ids deleted,
+so a rerun after a failure continues where the last run stopped.
+
+    python3 ingest_data.py --workers 4
+    python3 ingest_data.py --fresh        # upsert every chunk again
+    python3 ingest_data.py --local        # build the local vector index (local_index.py)
+
+Every run also rebuilds the BM25 index used by hybrid search (hybrid_search.py).
 """
 
 import os
 import json
+import time
+import random
+import asyncio
+import argparse
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterator
 from dotenv import load_dotenv
 from pinecone import Pinecone
 
+from chunking import get_chunker
+from ingest_manifest import IngestManifest, bump_index_stamp, content_hash, record_hash, record_id
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
 INDEX_NAME = "test-rag-integrated"
 NAMESPACE = ""  # Empty string for default namespace (not "__default__")
-CHUNK_SIZE = 500  # ขนาด chunk (characters)
-CHUNK_OVERLAP = 50  # overlap ระหว่าง chunk
+# Chunking: sentences (default) | tokens | chars ดู chunking.py
+CHUNKER = get_chunker(
+    os.getenv("CHUNKER", "sentences"),
+    max_tokens=int(os.getenv("CHUNK_TOKENS", "256")),  # multilingual-e5-large รับได้ ~507 tokens
+    overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", "32")),
+)
+SAMPLE_DATA_DIR = Path(__file__).parent / "sample_data"
+MANIFEST_PATH = Path(__file__).parent / ".ingest_manifest.db"
+# เปลี่ยนค่า chunking = ทุกเอกสารถือว่าเปลี่ยน
+CHUNKER_CONFIG = CHUNKER.config
+# Best Practice: สำหรับ integrated embedding ใช้ batch_size = 96 (ตาม Pinecone docs)
+BATCH_SIZE = 96
+DELETE_BATCH_SIZE = 1000
+UPSERT_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "6"))
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
 
-def load_sample_data() -> List[Dict[str, str]]:
-    """โหลดข้อมูล sample จาก sample_data/"""
-    sample_data_dir = Path(__file__).parent / "sample_data"
+def ensure_sample_data() -> None:
+    """สร้างข้อมูล sample ใน sample_data/ ถ้ายังไม่มีโฟลเดอร์"""
+    sample_data_dir = SAMPLE_DATA_DIR
     
     if not sample_data_dir.exists():
         print(f"⚠️  ไม่พบโฟลเดอร์ {sample_data_dir}")
@@ -100,42 +140,191 @@ def load_sample_data() -> List[Dict[str, str]]:
                 json.dump(doc, f, ensure_ascii=False, indent=2)
         
         print(f"✅ สร้างข้อมูล sample {len(sample_docs)} ไฟล์")
+
+def source_files() -> List[Path]:
+    """ไฟล์ JSON ทั้งหมด เรียงตามชื่อ"""
+    ensure_sample_data()
+    return sorted(SAMPLE_DATA_DIR.glob("*.json"))
+
+def chunk_text(text: str) -> List[str]:
+    """แบ่งข้อความเป็น chunks ด้วย CHUNKER (รอบเดียว ไม่ตัดกลางคำไทย)"""
+    return list(CHUNKER.chunks(text))
+
+def make_record(doc_key: str, doc: Dict, chunk_idx: int, chunk: str, total_chunks: int) -> Dict:
+    # Record format สำหรับ integrated embedding
+    # ต้องมี field "content" ตาม field_map ที่กำหนดไว้
+    return {
+        "_id": record_id(doc_key, chunk_idx),
+        "content": chunk,  # field นี้จะถูก embed อัตโนมัติ
+        "title": doc["title"],
+        "category": doc["category"],
+        "chunk_index": chunk_idx,
+        "total_chunks": total_chunks
+    }
+
+def iter_records(files: List[Path]) -> Iterator[Dict]:
+    """ทุก record ของทุกเอกสาร (สำหรับสร้าง local index)"""
+    for file_path in files:
+        doc = json.loads(file_path.read_bytes())
+        chunks = chunk_text(doc['content'])
+        for chunk_idx, chunk in enumerate(chunks):
+            yield make_record(file_path.stem, doc, chunk_idx, chunk, len(chunks))
+
+class SyncPlan:
+    """สิ่งที่ต้องทำในรอบนี้: chunk ที่รอ upsert ต่อเอกสาร และ id ที่ต้องลบ"""
+
+    def __init__(self, manifest: IngestManifest):
+        self.manifest = manifest
+        self.pending: Dict[str, int] = {}
+        self.doc_hashes: Dict[str, str] = {}
+        self.produced: set = set()
+        # doc_key -> id ที่ต้องลบ (chunk ท้ายเอกสารที่หายไป หรือทั้งเอกสารที่ถูกลบ)
+        self.orphans: Dict[str, set] = {}
+        self.unchanged_docs = 0
+        self.unchanged_chunks = 0
+
+    def _maybe_complete(self, doc_key: str) -> None:
+        # เขียน hash ของเอกสารเมื่อทุก chunk ถูก upsert และ chunk เก่าที่เกินมาถูกลบแล้วเท่านั้น
+        # ไม่เช่นนั้นถ้าลบไม่สำเร็จ รอบหน้าจะเห็นเอกสารว่าไม่เปลี่ยนและไม่ลบ orphan อีกเลย
+        if doc_key in self.produced and self.pending[doc_key] == 0 and not self.orphans.get(doc_key):
+            self.manifest.record_document(doc_key, self.doc_hashes.pop(doc_key))
+            del self.pending[doc_key]
+            self.produced.discard(doc_key)
+
+    def ack(self, rows: List[tuple]) -> None:
+        self.manifest.record_chunks(rows)
+        for _, doc_key, _ in rows:
+            self.pending[doc_key] -= 1
+        for doc_key in {row[1] for row in rows}:
+            self._maybe_complete(doc_key)
+
+    def orphan_ids(self) -> List[str]:
+        return [orphan for ids in self.orphans.values() for orphan in sorted(ids)]
+
+    def ack_deleted(self, ids: List[str]) -> None:
+        self.manifest.forget_chunks(ids)
+        deleted = set(ids)
+        for doc_key in list(self.orphans):
+            self.orphans[doc_key] -= deleted
+            if not self.orphans[doc_key]:
+                del self.orphans[doc_key]
+                self._maybe_complete(doc_key)
+
+def iter_changes(files: List[Path], plan: SyncPlan, fresh: bool = False) -> Iterator[tuple]:
+    """อ่านเอกสารทีละไฟล์แบบ lazy และ yield (id, doc_key, hash, record) เฉพาะ chunk ที่ใหม่หรือเปลี่ยน"""
+    manifest = plan.manifest
+    for file_path in files:
+        doc_key = file_path.stem
+        raw = file_path.read_bytes()
+        doc_hash = content_hash(raw + CHUNKER_CONFIG.encode())
+        if not fresh and manifest.document_hash(doc_key) == doc_hash:
+            plan.unchanged_docs += 1
+            continue
+
+        doc = json.loads(raw)
+        print(f"📄 Processing: {doc['title']}")
         
-        # Return ข้อมูลที่เพิ่งสร้างทันที (Best Practice)
-        return sample_docs
-    
-    # โหลดข้อมูลทั้งหมดจากไฟล์ที่มีอยู่
-    documents = []
-    for file_path in sample_data_dir.glob("*.json"):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            documents.append(json.load(f))
-    
-    print(f"📂 โหลดจากไฟล์: {len(documents)} เอกสาร")
-    return documents
-
-def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
-    """แบ่งข้อความเป็น chunks แบบง่าย"""
-    chunks = []
-    start = 0
-    text_length = len(text)
-    
-    while start < text_length:
-        end = start + chunk_size
-        chunk = text[start:end]
+        # Chunk the content
+        chunks = chunk_text(doc['content'])
+        known = manifest.chunk_hashes(doc_key)
+        plan.pending[doc_key] = 0
+        plan.doc_hashes[doc_key] = doc_hash
+        changed = 0
         
-        # ถ้าไม่ใช่ chunk สุดท้าย ให้ตัดที่ตำแหน่งเว้นวรรคใกล้ที่สุด
-        if end < text_length:
-            last_space = chunk.rfind(' ')
-            if last_space != -1:
-                chunk = chunk[:last_space]
-                end = start + last_space
+        # เตรียม records สำหรับ upsert_records
+        # ไม่ต้องสร้าง embedding เอง!
+        for chunk_idx, chunk in enumerate(chunks):
+            record = make_record(doc_key, doc, chunk_idx, chunk, len(chunks))
+            chunk_hash = record_hash(record)
+            previous_hash = known.pop(record["_id"], None)
+            if not fresh and previous_hash == chunk_hash:
+                plan.unchanged_chunks += 1
+                continue
+            plan.pending[doc_key] += 1
+            changed += 1
+            yield record["_id"], doc_key, chunk_hash, record
         
-        chunks.append(chunk.strip())
-        start = end - overlap  # overlap เพื่อรักษา context
+        # id ที่เหลือใน manifest คือ chunk ท้ายเอกสารที่หายไป
+        if known:
+            plan.orphans[doc_key] = set(known)
+        plan.produced.add(doc_key)
+        plan._maybe_complete(doc_key)
+        print(f"   - Chunks: {len(chunks)} (เปลี่ยน {changed}, ลบ {len(known)})")
     
-    return [c for c in chunks if c]  # กรองช่องว่าง
+    # เอกสารที่ถูกลบออกจาก sample_data/
+    current = {file_path.stem for file_path in files}
+    for doc_key in manifest.document_keys() - current:
+        print(f"🗑️  เอกสาร {doc_key} ถูกลบ")
+        plan.orphans[doc_key] = set(manifest.chunk_hashes(doc_key))
+
+def iter_batches(items: Iterator, batch_size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def call_with_retry(label: str, fn, *args, **kwargs):
+    """เรียก Pinecone; retry แบบ jittered exponential backoff เมื่อโดน throttle หรือ server error"""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            # Pinecone client เป็น sync จึงรันใน thread เพื่อให้หลาย batch ทำงานพร้อมกันได้
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        except Exception as e:
+            status = getattr(e, "status", None)
+            if status not in RETRYABLE_STATUS or attempt == MAX_RETRIES:
+                print(f"   ❌ Error {label}: {str(e)}")
+                raise
+            delay = random.uniform(0, min(30.0, 0.5 * 2 ** attempt))
+            print(f"   ⏳ {label} ถูก throttle ({status}) retry ใน {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+async def run_pipeline(index, files: List[Path], plan: SyncPlan, workers: int, batch_size: int,
+                       fresh: bool = False) -> Dict:
+    """reader -> chunker -> bounded queue -> upsert workers, แล้วลบ orphan ids"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    totals = {"records": 0, "batches": 0, "deleted": 0}
 
-def ingest_documents():
+    async def produce():
+        for batch_no, batch in enumerate(iter_batches(iter_changes(files, plan, fresh), batch_size)):
+            await queue.put((batch_no, batch))
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def upsert_worker():
+        while (item := await queue.get()) is not None:
+            batch_no, batch = item
+            # Note: namespace เป็น parameter แรก (positional), records เป็น parameter ที่สอง
+            await call_with_retry(f"upserting batch {batch_no + 1}", index.upsert_records,
+                                  NAMESPACE, [record for *_, record in batch])
+            plan.ack([(record_id, doc_key, chunk_hash) for record_id, doc_key, chunk_hash, _ in batch])
+            totals["records"] += len(batch)
+            totals["batches"] += 1
+            print(f"   - Upserted batch {batch_no + 1} ({len(batch)} records)")
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(upsert_worker()) for _ in range(workers)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # A batch that gave up stops the run; acknowledged chunks stay in the manifest
+        for task in tasks:
+            task.cancel()
+
+    # ลบหลัง upsert เสร็จ เพื่อไม่ให้มีช่วงที่ค้นหาไม่เจอเอกสาร
+    orphans = plan.orphan_ids()
+    for i in range(0, len(orphans), DELETE_BATCH_SIZE):
+        ids = orphans[i:i + DELETE_BATCH_SIZE]
+        await call_with_retry("deleting orphans", index.delete, ids=ids, namespace=NAMESPACE)
+        plan.ack_deleted(ids)
+        totals["deleted"] += len(ids)
+    for doc_key in plan.manifest.document_keys() - {file_path.stem for file_path in files}:
+        plan.manifest.forget_document(doc_key)
+    return totals
+
+def ingest_documents(workers: int = UPSERT_WORKERS, batch_size: int = BATCH_SIZE, fresh: bool = False):
     """Main ingestion function with Integrated Embedding"""
     print("=" * 80)
     print("📦 Data Ingestion Process (Integrated Embedding)")
@@ -146,75 +335,41 @@ def ingest_documents():
     pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
     index = pc.Index(INDEX_NAME)
     
-    # Load documents
-    print("\n📂 กำลังโหลดข้อมูล...")
-    documents = load_sample_data()
-    print(f"✅ โหลดข้อมูล {len(documents)} เอกสาร")
+    # Find documents
+    print("\n📂 กำลังค้นหาไฟล์ข้อมูล...")
+    files = source_files()
+    print(f"✅ พบ {len(files)} เอกสาร")
     
     # Check if we have documents
-    if not documents:
+    if not files:
         print("\n❌ ไม่พบข้อมูลที่จะ ingest!")
         print("💡 กรุณาตรวจสอบว่ามีไฟล์ JSON ใน sample_data/ หรือไม่")
         return
     
+    manifest = IngestManifest(MANIFEST_PATH)
+    plan = SyncPlan(manifest)
+    
     # Process and upsert
-    print("\n🔄 กำลัง process และ upsert ข้อมูล...")
+    print(f"\n🔄 กำลัง process และ upsert เฉพาะส่วนที่เปลี่ยน ({workers} workers, batch {batch_size})...")
     print("💡 Pinecone จะสร้าง embedding ให้อัตโนมัติ!\n")
     
-    all_records = []
-    
-    for doc_idx, doc in enumerate(documents):
-        print(f"📄 Processing: {doc['title']}")
-        
-        # Chunk the content
-        chunks = chunk_text(doc['content'])
-        print(f"   - Chunks: {len(chunks)}")
-        
-        # เตรียม records สำหรับ upsert_records
-        # ไม่ต้องสร้าง embedding เอง!
-        for chunk_idx, chunk in enumerate(chunks):
-            record_id = f"doc_{doc_idx}_chunk_{chunk_idx}"
-            
-            # Record format สำหรับ integrated embedding
-            # ต้องมี field "content" ตาม field_map ที่กำหนดไว้
-            record = {
-                "_id": record_id,
-                "content": chunk,  # field นี้จะถูก embed อัตโนมัติ
-                "title": doc["title"],
-                "category": doc["category"],
-                "chunk_index": chunk_idx,
-                "total_chunks": len(chunks)
-            }
-            
-            all_records.append(record)
-        
-        print(f"   ✅ เตรียม {len(chunks)} records")
-    
-    # Check if we have records to upsert
-    if not all_records:
-        print("\n❌ ไม่มี records ที่จะ upsert!")
-        print("💡 ตรวจสอบว่าข้อมูลมี content หรือไม่")
-        return
-    
-    # Upsert to Pinecone using upsert_records (for integrated embedding)
-    print(f"\n⬆️  กำลัง upsert {len(all_records)} records เข้า Pinecone...")
-    print("⚡ Pinecone กำลังสร้าง embeddings อัตโนมัติ...\n")
-    
-    # Upsert in batches
-    # Note: namespace เป็น parameter แรก (positional), records เป็น parameter ที่สอง
-    # Best Practice: สำหรับ integrated embedding ใช้ batch_size = 96 (ตาม Pinecone docs)
-    batch_size = 96
-    for i in range(0, len(all_records), batch_size):
-        batch = all_records[i:i+batch_size]
-        try:
-            index.upsert_records(NAMESPACE, batch)
-            print(f"   - Upserted batch {i//batch_size + 1} ({len(batch)} records)")
-        except Exception as e:
-            print(f"   ❌ Error upserting batch {i//batch_size + 1}: {str(e)}")
-            raise
+    start = time.perf_counter()
+    try:
+        totals = asyncio.run(run_pipeline(index, files, plan, workers, batch_size, fresh))
+    finally:
+        manifest.close()
+    elapsed = time.perf_counter() - start
     
-    print("\n✅ Upsert สำเร็จ!")
+    print("\n✅ Sync สำเร็จ!")
+    print(f"⚡ upsert {totals['records']:,} records ใน {totals['batches']} batches, {elapsed:.1f}s "
+          f"({totals['records'] / elapsed:,.0f} records/sec)")
+    print(f"⏩ ไม่เปลี่ยน: {plan.unchanged_docs} เอกสาร, {plan.unchanged_chunks:,} chunks")
+    print(f"🗑️  ลบ orphan ids: {totals['deleted']:,}")
+    if totals['records'] or totals['deleted']:
+        # ผลค้นหาที่ cache ไว้ของ namespace นี้ใช้ไม่ได้แล้ว
+        bump_index_stamp(NAMESPACE)
     print("🎉 ข้อมูลถูก embed และ index โดย Pinecone แล้ว!")
+    build_bm25(files)
     
     # Show index stats
     print("\n📊 สถิติ Index:")
@@ -226,10 +381,51 @@ def ingest_documents():
             ns_name = ns if ns else "(default)"
             print(f"   - Namespace '{ns_name}': {info.vector_count:,} vectors")
 
+def build_bm25(files: List[Path]) -> None:
+    """สร้าง BM25 index (hybrid_search.py) ใหม่จากทุกเอกสาร สำหรับ hybrid search"""
+    from hybrid_search import BM25_INDEX_DIR, BM25Index
+
+    start = time.perf_counter()
+    bm25 = BM25Index.build(BM25_INDEX_DIR, iter_records(files))
+    print(f"🔤 BM25 index: {bm25.count:,} chunks, {bm25.meta['terms']:,} terms "
+          f"({bm25.meta['tokenizer']}) ใน {time.perf_counter() - start:.1f}s")
+    bm25.close()
+
+def ingest_local(nlist: int = 0):
+    """สร้าง local vector index (local_index.py) จากทุกเอกสาร ไม่ต้องใช้ Pinecone"""
+    from local_index import LOCAL_INDEX_DIR, LocalVectorIndex, get_embedder
+
+    print("=" * 80)
+    print("🚀 Build Local Vector Index")
+    print("=" * 80)
+    files = source_files()
+    embedder = get_embedder()
+    print(f"\n📂 พบ {len(files)} เอกสาร, embedder: {embedder.config}")
+
+    start = time.perf_counter()
+    index = LocalVectorIndex.build(LOCAL_INDEX_DIR, iter_records(files), embedder, nlist=nlist or None)
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ สร้าง index {index.count:,} vectors (dim {index.dim}, {index.nlist} IVF lists) "
+          f"ใน {elapsed:.1f}s ที่ {index.path}")
+    index.close()
+    build_bm25(files)
+    bump_index_stamp(NAMESPACE)
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Ingest sample_data/ into Pinecone")
+    parser.add_argument("--workers", type=int, default=UPSERT_WORKERS, help="concurrent upsert workers")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="records per upsert")
+    parser.add_argument("--fresh", action="store_true", help="upsert every chunk, even unchanged ones")
+    parser.add_argument("--local", action="store_true", help="build the local vector index instead of upserting to Pinecone")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists of the local index (default ~sqrt(vectors))")
+    args = parser.parse_args()
+
     try:
-        ingest_documents()
+        if args.local:
+            ingest_local(nlist=args.nlist)
+        else:
+            ingest_documents(workers=args.workers, batch_size=args.batch_size, fresh=args.fresh)
         
         print("\n" + "=" * 80)
         print("✅ Data ingestion completed successfully!")
@@ -239,6 +435,7 @@ def main():
         
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
+        print("💡 รันคำสั่งเดิมอีกครั้งเพื่อทำต่อจากส่วนที่ยังไม่สำเร็จ")
         import traceback
         traceback.print_exc()
 
@@ -0,0 +1,115 @@
+"""
+Ingest Manifest (SQLite)
+- จำ content hash ของทุกเอกสารและทุก chunk ที่ upsert เข้า Pinecone แล้ว
+- ingest รอบถัดไป upsert เฉพาะ chunk ที่ใหม่หรือเปลี่ยน และลบ id ที่ไม่มีแล้ว (orphan)
+- id ของ record ผูกกับชื่อไฟล์ ไม่ขึ้นกับลำดับของ glob
+
+แถวของ chunk ถูกเขียนหลัง Pinecone ตอบรับ batch นั้นแล้วเท่านั้น และแถวของเอกสาร
+ถูกเขียนเมื่อทุก chunk ของเอกสารนั้นสำเร็จ ถ้ารันไม่จบ รอบถัดไปจึงทำต่อจากจุดที่ค้างได้เอง
+
+``.index_stamp`` เก็บ version ของแต่ละ namespace ซึ่งเปลี่ยนทุกครั้งที่ ingest แก้ข้อมูลใน index
+ให้ cache ของผลค้นหา (semantic_cache.py) รู้ว่าต้องทิ้งผลเก่า
+"""
+
+import hashlib
+import json
+import sqlite3
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def record_hash(record: Dict) -> str:
+    """Hash ของ record ทั้งก้อน (content + metadata) เพื่อรู้ว่าต้อง upsert ใหม่หรือไม่"""
+    return content_hash(json.dumps(record, sort_keys=True, ensure_ascii=False).encode())
+
+
+def record_id(doc_key: str, chunk_idx: int) -> str:
+    return f"doc_{doc_key}_chunk_{chunk_idx}"
+
+
+INDEX_STAMP_PATH = Path(__file__).parent / ".index_stamp"
+
+
+def read_index_stamps(path: Path = INDEX_STAMP_PATH) -> Dict[str, str]:
+    """namespace -> version ล่าสุด"""
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def bump_index_stamp(namespace: str, path: Path = INDEX_STAMP_PATH) -> str:
+    """บันทึกว่า namespace นี้เปลี่ยน (เขียนไฟล์ใหม่แล้วสลับ ผู้อ่านไม่เห็นไฟล์ครึ่งๆ)"""
+    stamps = read_index_stamps(path)
+    stamps[namespace] = uuid.uuid4().hex
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(stamps))
+    tmp.replace(path)
+    return stamps[namespace]
+
+
+class IngestManifest:
+    """Manifest ของ content hash ต่อเอกสารและต่อ chunk"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                doc_key TEXT NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_by_doc ON chunks (doc_key);
+        """)
+
+    def document_hash(self, doc_key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT content_hash FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+        return row[0] if row else None
+
+    def document_keys(self) -> Set[str]:
+        keys = {row[0] for row in self.conn.execute("SELECT doc_key FROM documents")}
+        return keys | {row[0] for row in self.conn.execute("SELECT DISTINCT doc_key FROM chunks")}
+
+    def chunk_hashes(self, doc_key: str) -> Dict[str, str]:
+        rows = self.conn.execute("SELECT id, content_hash FROM chunks WHERE doc_key = ?", (doc_key,))
+        return dict(rows.fetchall())
+
+    def record_chunks(self, rows: Iterable[Tuple[str, str, str]]) -> None:
+        """บันทึก (id, doc_key, content_hash) ของ chunk ที่ upsert สำเร็จ"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO chunks (id, doc_key, content_hash) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET doc_key = excluded.doc_key, content_hash = excluded.content_hash",
+                rows,
+            )
+
+    def record_document(self, doc_key: str, doc_hash: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO documents (doc_key, content_hash) VALUES (?, ?) "
+                "ON CONFLICT(doc_key) DO UPDATE SET content_hash = excluded.content_hash",
+                (doc_key, doc_hash),
+            )
+
+    def forget_chunks(self, ids: List[str]) -> None:
+        with self.conn:
+            self.conn.executemany("DELETE FROM chunks WHERE id = ?", ((i,) for i in ids))
+
+    def forget_document(self, doc_key: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+            self.conn.execute("DELETE FROM chunks WHERE doc_key = ?", (doc_key,))
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,424 @@
+"""
+Local Vector Index
+- เก็บ embedding ของทุก chunk เป็น NumPy matrix บนดิสก์ (``np.memmap``) ไม่ต้องโหลดทั้งหมดเข้า memory
+- ค้นหาด้วย IVF: k-means แบ่ง vector เป็น ``nlist`` กลุ่ม แต่ละกลุ่มเรียงติดกันในไฟล์
+  query จะคำนวณ score เฉพาะ ``nprobe`` กลุ่มที่ centroid ใกล้ที่สุด
+- Embedder แบบ pluggable (``LOCAL_EMBEDDER``):
+    - ``hashing``: char n-gram feature hashing ไม่ต้องมี model หรือ network (default)
+    - ``e5``: ``intfloat/multilingual-e5-small`` ผ่าน sentence-transformers (optional)
+- ``search_records_tool``: ADK tool ที่รับ argument และตอบรูปแบบเดียวกับ
+  ``search-records`` ของ Pinecone MCP จึงใช้ prompt เดิมได้
+
+ไฟล์ใน ``LOCAL_INDEX_DIR``:
+
+    meta.json        dim, จำนวน vector, nlist, config ของ embedder
+    vectors.f32      float32 [count, dim] normalized เรียงตามกลุ่ม IVF
+    centroids.npy    float32 [nlist, dim]
+    offsets.npy      int64 [nlist + 1] ช่วงของแต่ละกลุ่มใน vectors.f32
+    order.npy        int64 [count] แถวใน vectors.f32 -> ลำดับของ record
+    records.jsonl    record (fields) ตามลำดับที่ ingest
+    record_offsets.npy  int64 [count + 1] byte offset ของแต่ละบรรทัดใน records.jsonl
+"""
+
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from google.adk.tools.function_tool import FunctionTool
+
+logger = logging.getLogger(__name__)
+
+LOCAL_INDEX_DIR = Path(os.getenv("LOCAL_INDEX_DIR", Path(__file__).parent / ".local_index"))
+
+
+# -- embedders -----------------------------------------------------------
+
+
+class HashingEmbedder:
+    """Embedding จาก char n-gram hashing: ทำงานได้ทันทีทุกภาษา (รวมภาษาไทยที่ไม่มีช่องว่าง)
+
+    ใช้ FNV-1a บน code point ของ n-gram แบบ vectorized ด้วย NumPy ผลลัพธ์เหมือนเดิมทุกครั้ง
+    (ไม่ใช้ ``hash()`` ของ Python ที่สุ่ม seed ต่อ process)
+    """
+
+    name = "hashing"
+    # วัดความเหมือนของตัวอักษร ไม่ใช่ความหมาย (semantic_cache.py ใช้แค่ exact match)
+    semantic = False
+
+    def __init__(self, dim: int = 512, ngrams: Tuple[int, ...] = (2, 3)):
+        self.dim = dim
+        self.ngrams = ngrams
+
+    @property
+    def config(self) -> str:
+        return f"{self.name}:{self.dim}:{','.join(map(str, self.ngrams))}"
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        normalized = " ".join(text.lower().split())
+        codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        vector = np.zeros(self.dim, dtype=np.float64)
+        for n in self.ngrams:
+            count = len(codes) - n + 1
+            if count <= 0:
+                continue
+            h = np.full(count, 14695981039346656037, dtype=np.uint64)
+            for k in range(n):
+                h = (h ^ codes[k:k + count]) * np.uint64(1099511628211)
+            signs = 1.0 - 2.0 * (h >> np.uint64(63)).astype(np.float64)
+            vector += np.bincount((h % np.uint64(self.dim)).astype(np.int64), weights=signs, minlength=self.dim)
+        return vector
+
+    def embed(self, texts: List[str], kind: str = "passage") -> np.ndarray:
+        vectors = np.stack([self._embed_one(t) for t in texts]) if texts else np.zeros((0, self.dim))
+        return _normalize(vectors.astype(np.float32))
+
+
+class SentenceTransformerEmbedder:
+    """multilingual-e5 แบบ local ผ่าน sentence-transformers (``pip install sentence-transformers``)"""
+
+    name = "e5"
+    semantic = True
+
+    def __init__(self, model_name: str = "intfloat/multilingual-e5-small"):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("LOCAL_EMBEDDER=e5 ต้องติดตั้ง sentence-transformers: pip install sentence-transformers")
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    @property
+    def config(self) -> str:
+        return f"{self.name}:{self.model_name}"
+
+    def embed(self, texts: List[str], kind: str = "passage") -> np.ndarray:
+        # e5 ต้องมี prefix "query: " / "passage: "
+        prefixed = [f"{kind}: {t}" for t in texts]
+        return self.model.encode(prefixed, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+    "e5": SentenceTransformerEmbedder,
+}
+
+
+def get_embedder(name: Optional[str] = None):
+    name = name or os.getenv("LOCAL_EMBEDDER", "hashing")
+    if name not in EMBEDDERS:
+        raise ValueError(f"Unknown embedder {name!r}; choose from {', '.join(EMBEDDERS)}")
+    if name == "e5" and os.getenv("LOCAL_EMBEDDER_MODEL"):
+        return SentenceTransformerEmbedder(os.environ["LOCAL_EMBEDDER_MODEL"])
+    return EMBEDDERS[name]()
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+# -- record storage ----------------------------------------------------------
+
+
+class RecordWriter:
+    """เขียน record ต่อท้าย ``records.jsonl`` และเก็บ byte offset ของแต่ละบรรทัด"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._file = open(self.directory / "records.jsonl", "wb")
+        self._offsets = [0]
+
+    def write(self, record: Dict[str, Any]) -> int:
+        """เขียน record แล้วคืนลำดับแถว"""
+        self._file.write(json.dumps(record, ensure_ascii=False).encode() + b"\n")
+        self._offsets.append(self._file.tell())
+        return len(self._offsets) - 2
+
+    def close(self) -> None:
+        self._file.close()
+        np.save(self.directory / "record_offsets.npy", np.asarray(self._offsets, dtype=np.int64))
+
+
+class RecordFile:
+    """อ่าน record ทีละแถวจาก ``records.jsonl`` ผ่าน mmap (ไม่โหลดทั้งไฟล์เข้า memory)"""
+
+    def __init__(self, directory: Path):
+        directory = Path(directory)
+        self.offsets = np.load(directory / "record_offsets.npy")
+        self._file = open(directory / "records.jsonl", "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if len(self) else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        return json.loads(self._data[self.offsets[row]:self.offsets[row + 1]])
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+
+# -- IVF training ----------------------------------------------------------
+
+
+def _kmeans(sample: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means (cosine) บน sample ของ vector"""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        # กลุ่มว่าง: สุ่ม vector ใหม่เป็น centroid
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids.astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[i:i + batch_size] @ centroids.T, axis=1)
+        for i in range(0, len(vectors), batch_size)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+def default_nlist(count: int) -> int:
+    """ไม่ถึง ~4k vectors ค้นทั้งหมด (flat) เร็วพออยู่แล้ว; มากกว่านั้นใช้ ~sqrt(count) กลุ่ม"""
+    return 1 if count < 4096 else int(np.sqrt(count))
+
+
+# -- index -----------------------------------------------------------------
+
+
+class LocalVectorIndex:
+    """IVF index บน memory-mapped embedding matrix"""
+
+    def __init__(self, path: Path = LOCAL_INDEX_DIR, nprobe: Optional[int] = None):
+        self.path = Path(path)
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            raise FileNotFoundError(f"ไม่พบ local index ที่ {self.path} - รัน: python ingest_data.py --local")
+        self.meta = json.loads(meta_path.read_text())
+        self.dim = self.meta["dim"]
+        self.count = self.meta["count"]
+        self.nlist = self.meta["nlist"]
+        self.nprobe = min(self.nlist, nprobe or int(os.getenv("LOCAL_INDEX_NPROBE", "8")))
+        self.vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r", shape=(self.count, self.dim)) \
+            if self.count else np.zeros((0, self.dim), dtype=np.float32)
+        self.centroids = np.load(self.path / "centroids.npy")
+        self.offsets = np.load(self.path / "offsets.npy")
+        self.order = np.load(self.path / "order.npy", mmap_mode="r")
+        self.records = RecordFile(self.path)
+
+    @property
+    def embedder_config(self) -> str:
+        return self.meta["embedder"]
+
+    @classmethod
+    def build(cls, path: Path, records: Iterable[Dict[str, Any]], embedder, text_field: str = "content",
+              nlist: Optional[int] = None, batch_size: int = 256) -> "LocalVectorIndex":
+        """Embed records แบบ streaming แล้วสร้าง IVF index ใน ``path`` (เขียนที่ไดเรกทอรีชั่วคราวแล้วสลับ)"""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        # 1) embed ทีละ batch: vector ต่อท้ายไฟล์ดิบ, record ต่อท้าย records.jsonl
+        count = 0
+        writer = RecordWriter(tmp)
+        with open(tmp / "raw.f32", "wb") as raw:
+            for batch in _batches(records, batch_size):
+                vectors = embedder.embed([r[text_field] for r in batch], kind="passage")
+                raw.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                for r in batch:
+                    writer.write(r)
+                count += len(batch)
+        writer.close()
+        dim = embedder.dim
+
+        # 2) train IVF และเรียง vector ตามกลุ่ม
+        raw_vectors = np.memmap(tmp / "raw.f32", dtype=np.float32, mode="r", shape=(count, dim)) \
+            if count else np.zeros((0, dim), dtype=np.float32)
+        nlist = max(1, min(nlist or default_nlist(count), count or 1))
+        if nlist > 1:
+            rng = np.random.default_rng(0)
+            sample_rows = np.sort(rng.choice(count, min(count, nlist * 64), replace=False))
+            centroids = _kmeans(np.asarray(raw_vectors[sample_rows]), nlist)
+            assign = _assign(raw_vectors, centroids)
+        else:
+            centroids = _normalize(np.asarray(raw_vectors).mean(axis=0, keepdims=True)) if count \
+                else np.zeros((1, dim), dtype=np.float32)
+            assign = np.zeros(count, dtype=np.int64)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+
+        if count:
+            vectors = np.memmap(tmp / "vectors.f32", dtype=np.float32, mode="w+", shape=(count, dim))
+            for start in range(0, count, 65536):
+                rows = order[start:start + 65536]
+                vectors[start:start + len(rows)] = raw_vectors[rows]
+            vectors.flush()
+            del vectors
+        else:
+            (tmp / "vectors.f32").touch()
+        del raw_vectors
+        (tmp / "raw.f32").unlink()
+
+        np.save(tmp / "centroids.npy", centroids.astype(np.float32))
+        np.save(tmp / "offsets.npy", offsets)
+        np.save(tmp / "order.npy", order.astype(np.int64))
+        (tmp / "meta.json").write_text(json.dumps({
+            "dim": dim,
+            "count": count,
+            "nlist": nlist,
+            "embedder": embedder.config,
+            "text_field": text_field,
+            "metric": "cosine",
+        }, indent=2))
+
+        shutil.rmtree(path, ignore_errors=True)
+        tmp.rename(path)
+        return cls(path)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        return self.records[row]
+
+    def search(self, query: np.ndarray, top_k: int = 5, nprobe: Optional[int] = None,
+               filter: Optional[Dict[str, Any]] = None) -> List[Tuple[int, float]]:
+        """(record row, cosine score) ของ ``top_k`` vector ที่ใกล้ ``query`` ที่สุด"""
+        if not self.count:
+            return []
+        nprobe = min(self.nlist, nprobe or self.nprobe)
+        if self.nlist == 1:
+            lists = [0]
+        else:
+            lists = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+        positions = np.concatenate([np.arange(self.offsets[l], self.offsets[l + 1]) for l in lists])
+        scores = np.concatenate([self.vectors[self.offsets[l]:self.offsets[l + 1]] @ query for l in lists])
+
+        if filter:
+            hits = []
+            for i in np.argsort(-scores):
+                row = int(self.order[positions[i]])
+                if matches_filter(self.record(row), filter):
+                    hits.append((row, float(scores[i])))
+                    if len(hits) == top_k:
+                        break
+            return hits
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(self.order[positions[i]]), float(scores[i])) for i in best]
+
+    def close(self) -> None:
+        self.records.close()
+
+
+def _batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# -- metadata filter ---------------------------------------------------------
+
+
+def matches_filter(fields: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    """Subset ของ Pinecone metadata filter: $eq $ne $in $nin $gt $gte $lt $lte $exists $and $or"""
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(fields, f) for f in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_filter(fields, f) for f in condition):
+                return False
+            continue
+        value = fields.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$ne" and value == expected:
+                return False
+            if op == "$in" and value not in expected:
+                return False
+            if op == "$nin" and value in expected:
+                return False
+            if op == "$exists" and (key in fields) != bool(expected):
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if not isinstance(value, (int, float)):
+                    return False
+                if (op == "$gt" and not value > expected) or (op == "$gte" and not value >= expected) \
+                        or (op == "$lt" and not value < expected) or (op == "$lte" and not value <= expected):
+                    return False
+    return True
+
+
+# -- ADK tool -------------------------------------------------------------------
+
+
+def index_embedder(index: LocalVectorIndex, embedder=None):
+    """Embedder ที่ตรงกับตอนสร้าง index (ไม่ตรง = vector เทียบกันไม่ได้)"""
+    embedder = embedder or get_embedder(index.embedder_config.split(":", 1)[0])
+    if embedder.config != index.embedder_config:
+        raise ValueError(
+            f"Local index ถูกสร้างด้วย embedder {index.embedder_config} แต่ตั้งค่าไว้เป็น {embedder.config} "
+            "- รัน python ingest_data.py --local ใหม่"
+        )
+    return embedder
+
+
+def search_records_tool(index: LocalVectorIndex, embedder=None) -> FunctionTool:
+    """``search_records`` ที่ค้นใน local index แทน Pinecone MCP ``search-records``"""
+    embedder = index_embedder(index, embedder)
+
+    def search_records(name: str, namespace: str, query: dict, fields: Optional[list[str]] = None) -> dict:
+        """Search the sales knowledge base by text (same arguments and result as Pinecone search-records).
+
+        Args:
+            name: Index name (the local index serves every name).
+            namespace: Namespace ("" for the default namespace).
+            query: {"topK": 5, "inputs": {"text": "question"}, "filter": {...optional metadata filter}}.
+            fields: Record fields to return; all fields when empty.
+
+        Returns:
+            {"result": {"hits": [{"_id", "_score", "fields"}]}, "usage": {...}}
+        """
+        text = (query.get("inputs") or {}).get("text", "")
+        if not text:
+            return {"error": "query.inputs.text is required"}
+        top_k = int(query.get("topK") or query.get("top_k") or 5)
+        started = time.perf_counter()
+        vector = embedder.embed([text], kind="query")[0]
+        results = index.search(vector, top_k=top_k, filter=query.get("filter"))
+        hits = []
+        for row, score in results:
+            record = index.record(row)
+            record_id = record.pop("_id", str(row))
+            if fields:
+                record = {k: v for k, v in record.items() if k in fields}
+            hits.append({"_id": record_id, "_score": round(score, 6), "fields": record})
+        elapsed = time.perf_counter() - started
+        logger.info(f"🔎 local search: {len(hits)} hits in {elapsed * 1000:.1f}ms")
+        return {"result": {"hits": hits}, "usage": {"readUnits": 0, "embedTotalTokens": 0}}
+
+    return FunctionTool(search_records)
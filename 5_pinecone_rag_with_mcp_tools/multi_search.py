@@ -0,0 +1,215 @@
+"""
+Multi-query Search
+- ``search_many``: รับคำถามย่อยหลายข้อใน call เดียวแล้วค้นพร้อมกัน แทนการเรียก search tool
+  ทีละคำถาม (ทุก call คือ model → tool → model อีกหนึ่งรอบ)
+- รวมผล: ตัด chunk ซ้ำด้วย ``_id`` แล้วต่อ chunk ที่อยู่ติดกันในเอกสารเดียวกัน
+  (``chunk_index``/``total_chunks``) เป็นข้อความช่วงเดียว โดยตัดส่วน overlap ที่ซ้ำออก
+- คืน context block เดียว: ผลที่ดีที่สุดของทุกคำถามย่อยก่อน แล้วตามด้วยผลที่เหลือตามคะแนน
+  ไม่เกิน ``SEARCH_MANY_MAX_TOKENS`` token (ประมาณด้วย ``estimate_tokens``)
+
+ใช้ search function รูปแบบ ``DenseSearch`` ของ hybrid_search.py ได้ทุกแบบ
+(local index, Pinecone search API หรือ ``HybridRetriever.search``)
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from google.adk.tools.function_tool import FunctionTool
+
+try:
+    from .chunking import estimate_tokens
+    from .hybrid_search import DenseSearch, Hit
+except ImportError:  # รันตรงจากโฟลเดอร์นี้
+    from chunking import estimate_tokens
+    from hybrid_search import DenseSearch, Hit
+
+logger = logging.getLogger(__name__)
+
+# field ที่ search_many ต้องใช้ (ส่งให้ pinecone_dense_search)
+MULTI_SEARCH_FIELDS = ("content", "title", "category", "chunk_index", "total_chunks")
+MAX_QUERIES = 10
+
+_RECORD_ID = re.compile(r"^(.*)_chunk_(\d+)$")
+# overlap ระหว่าง chunk ติดกันยาวไม่เกินนี้ (CHUNK_OVERLAP_TOKENS ≈ 32 token)
+_MAX_OVERLAP_CHARS = 2000
+_MIN_OVERLAP_CHARS = 6
+
+
+@dataclass(eq=False)
+class Passage:
+    """chunk ที่อยู่ติดกันของเอกสารเดียว ต่อเป็นข้อความช่วงเดียว"""
+
+    doc: str
+    title: str
+    category: str
+    first: int
+    last: int
+    total: Optional[int]
+    text: str
+    ids: List[str]
+    score: float
+    queries: List[int] = field(default_factory=list)
+
+    def header(self, ref: int) -> str:
+        parts = [f"[{ref}] {self.title} ({self.category})"]
+        if self.first >= 0:
+            span = f"chunk {self.first + 1}" if self.first == self.last else f"chunks {self.first + 1}-{self.last + 1}"
+            parts.append(f"{span} of {self.total}" if self.total else span)
+        parts.append("| queries " + ",".join(str(q + 1) for q in self.queries))
+        return " ".join(parts)
+
+
+def _position(hit: Hit) -> Tuple[str, Optional[int]]:
+    """(เอกสาร, ลำดับ chunk) จาก ``chunk_index`` หรือ ``_id`` แบบ ``doc_<key>_chunk_<n>``"""
+    fields = hit["fields"]
+    match = _RECORD_ID.match(hit["_id"])
+    doc = match.group(1) if match else fields.get("title") or hit["_id"]
+    index = fields.get("chunk_index")
+    if index is None and match:
+        index = match.group(2)
+    return doc, int(index) if index is not None else None
+
+
+def join_adjacent(previous: str, following: str) -> str:
+    """ต่อ chunk ที่ติดกันโดยไม่ซ้ำส่วน overlap (ท้าย ``previous`` = ต้น ``following``)"""
+    tail = previous[-_MAX_OVERLAP_CHARS:]
+    probe = following[:_MIN_OVERLAP_CHARS]
+    start = tail.find(probe) if len(probe) == _MIN_OVERLAP_CHARS else -1
+    while start != -1:
+        overlap = len(tail) - start
+        if following.startswith(tail[start:]):
+            return previous + following[overlap:]
+        start = tail.find(probe, start + 1)
+    return previous + "\n" + following
+
+
+def merge_hits(results: List[List[Hit]]) -> List[Passage]:
+    """ผลของทุกคำถาม -> passage ที่ไม่ซ้ำกัน (chunk ติดกันของเอกสารเดียวรวมเป็นหนึ่ง)"""
+    chunks: Dict[str, dict] = {}
+    for query_index, hits in enumerate(results):
+        for hit in hits:
+            chunk = chunks.get(hit["_id"])
+            if chunk is None:
+                doc, index = _position(hit)
+                chunk = chunks[hit["_id"]] = {"hit": hit, "doc": doc, "index": index, "score": hit["_score"], "queries": []}
+            chunk["score"] = max(chunk["score"], hit["_score"])
+            if query_index not in chunk["queries"]:
+                chunk["queries"].append(query_index)
+
+    by_doc: Dict[str, List[dict]] = {}
+    for chunk in chunks.values():
+        by_doc.setdefault(chunk["doc"], []).append(chunk)
+
+    passages: List[Passage] = []
+    for doc, doc_chunks in by_doc.items():
+        doc_chunks.sort(key=lambda c: (c["index"] is None, c["index"] or 0))
+        current: Optional[Passage] = None
+        for chunk in doc_chunks:
+            fields = chunk["hit"]["fields"]
+            adjacent = current is not None and chunk["index"] is not None and chunk["index"] == current.last + 1
+            if adjacent:
+                current.text = join_adjacent(current.text, fields.get("content", ""))
+                current.last = chunk["index"]
+                current.ids.append(chunk["hit"]["_id"])
+                current.score = max(current.score, chunk["score"])
+                current.queries = sorted(set(current.queries) | set(chunk["queries"]))
+                continue
+            index = chunk["index"] if chunk["index"] is not None else -1
+            current = Passage(
+                doc=doc,
+                title=fields.get("title", ""),
+                category=fields.get("category", ""),
+                first=index,
+                last=index,
+                total=int(fields["total_chunks"]) if fields.get("total_chunks") is not None else None,
+                text=fields.get("content", ""),
+                ids=[chunk["hit"]["_id"]],
+                score=chunk["score"],
+                queries=sorted(chunk["queries"]),
+            )
+            passages.append(current)
+    return passages
+
+
+def rank_passages(passages: List[Passage], queries: int) -> List[Passage]:
+    """passage ที่ดีที่สุดของแต่ละคำถามก่อน (ทุกคำถามย่อยมีคำตอบใน context) แล้วตามด้วยที่เหลือตามคะแนน"""
+    by_score = sorted(passages, key=lambda p: (p.score, len(p.queries)), reverse=True)
+    ranked: List[Passage] = []
+    for query_index in range(queries):
+        best = next((p for p in by_score if query_index in p.queries), None)
+        if best is not None and best not in ranked:
+            ranked.append(best)
+    return ranked + [p for p in by_score if p not in ranked]
+
+
+def build_context(passages: List[Passage], max_tokens: int) -> Tuple[str, List[Passage], int]:
+    """(context block, passage ที่ใส่, จำนวน passage ที่ไม่พอ budget)"""
+    blocks, used, kept = [], 0, []
+    for passage in passages:
+        block = passage.header(len(kept) + 1) + "\n" + passage.text
+        tokens = estimate_tokens(block)
+        if used + tokens > max_tokens:
+            if kept:
+                continue
+            # passage แรกยาวเกิน budget: ตัดท้ายให้พอดี
+            block = block[:max(1, len(block) * max_tokens // tokens)]
+            tokens = estimate_tokens(block)
+        blocks.append(block)
+        kept.append(passage)
+        used += tokens
+    return "\n\n".join(blocks), kept, len(passages) - len(kept)
+
+
+def multi_search_tool(search: DenseSearch, max_tokens: Optional[int] = None) -> FunctionTool:
+    """``search_many``: ค้นหลายคำถามพร้อมกันแล้วคืน context block เดียวที่ไม่ซ้ำและไม่เกิน budget"""
+    max_tokens = max_tokens or int(os.getenv("SEARCH_MANY_MAX_TOKENS", "2000"))
+
+    async def search_many(queries: list[str], top_k: int = 5, category: str = "") -> dict:
+        """Search the sales knowledge base for several sub-questions in one call.
+
+        Use this when answering needs information on more than one topic: split the
+        question into short sub-questions and pass them all at once. The results are
+        merged into one context block without duplicates; neighbouring passages of
+        the same document are joined.
+
+        Args:
+            queries: Sub-questions to search, in the user's language (up to 10).
+            top_k: Number of chunks to retrieve per sub-question (default 5).
+            category: Optional category to restrict the search to (e.g. "sales_skills").
+
+        Returns:
+            {"context": "[1] title (category) chunks ... | queries 1,2\\ntext ...",
+             "sources": [{"ref", "title", "category", "ids"}], "queries": [{"query", "hits"}], "omitted": n}
+        """
+        texts = list(dict.fromkeys(q.strip() for q in queries or [] if q and q.strip()))
+        if not texts:
+            return {"error": "queries is required"}
+        if len(texts) > MAX_QUERIES:
+            return {"error": f"at most {MAX_QUERIES} queries per call"}
+
+        top_k = max(1, min(int(top_k), 20))
+        filter = {"category": {"$eq": category}} if category else None
+        started = time.perf_counter()
+        results = await asyncio.gather(*(search(text, top_k, filter) for text in texts))
+        passages = rank_passages(merge_hits(results), len(texts))
+        context, kept, omitted = build_context(passages, max_tokens)
+        logger.info(
+            f"🧩 search_many: {len(texts)} queries, {sum(map(len, results))} hits -> {len(kept)} passages "
+            f"(~{estimate_tokens(context)} tokens) in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return {
+            "context": context,
+            "sources": [
+                {"ref": ref, "title": p.title, "category": p.category, "ids": p.ids}
+                for ref, p in enumerate(kept, 1)
+            ],
+            "queries": [{"query": text, "hits": len(hits)} for text, hits in zip(texts, results)],
+            "omitted": omitted,
+        }
+
+    return FunctionTool(search_many)
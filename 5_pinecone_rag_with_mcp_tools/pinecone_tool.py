@@ -0,0 +1,119 @@
+"""
+Pinecone Search Tool (in-process)
+- ADK tool ที่เรียก Pinecone Python SDK (``Index.search_records``) ตรงจาก process ของ agent
+  แทน Pinecone MCP server (``npx @pinecone-database/mcp``) ที่ต้องเปิด Node subprocess
+  และส่งทุกคำถามผ่าน JSON-RPC ทาง stdio
+- Pinecone client และ Index ใช้ร่วมกันทั้ง process (``get_index``): connection pool เดียว
+  และ keep-alive ไม่ต้อง TLS handshake ใหม่ทุกครั้ง
+- index/namespace ผูกไว้ตอนสร้าง tool model ส่งแค่คำถาม (และ category ถ้ามี)
+- ดึงเฉพาะ field ``content/title/category`` ไม่ส่ง metadata อื่นกลับมาเปลือง token
+- batch: ส่งหลายคำถามใน call เดียว (``queries``) ค้นพร้อมกันแล้วคืนผลแยกตามคำถาม
+
+ตั้ง ``PINECONE_INDEX_HOST`` เพื่อข้ามการเรียก describe index ตอนเริ่ม
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from google.adk.tools.function_tool import FunctionTool
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "test-rag-integrated"
+SEARCH_FIELDS = ("content", "title", "category")
+MAX_TOP_K = 20
+MAX_BATCH_QUERIES = 10
+
+
+@functools.lru_cache(maxsize=None)
+def get_client():
+    """Pinecone client ตัวเดียวของ process (``PINECONE_POOL_SIZE`` = จำนวน connection สูงสุด)"""
+    from pinecone import Pinecone
+
+    return Pinecone(
+        api_key=os.getenv("PINECONE_API_KEY"),
+        connection_pool_maxsize=int(os.getenv("PINECONE_POOL_SIZE", "0")),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_index(name: str = INDEX_NAME, host: str = ""):
+    """Index ที่ใช้ร่วมกัน; ถ้าไม่ระบุ host จะถาม host จาก Pinecone หนึ่งครั้ง"""
+    host = host or os.getenv("PINECONE_INDEX_HOST", "")
+    return get_client().Index(host=host) if host else get_client().Index(name)
+
+
+def _hits(response) -> List[Dict[str, Any]]:
+    return [
+        {"_id": hit.id, "_score": round(hit.score, 6), "fields": dict(hit.fields or {})}
+        for hit in response.result.hits
+    ]
+
+
+def _usage(responses: Sequence[Any]) -> Dict[str, int]:
+    return {
+        "readUnits": sum(r.usage.read_units or 0 for r in responses),
+        "embedTotalTokens": sum(r.usage.embed_total_tokens or 0 for r in responses),
+    }
+
+
+def pinecone_search_tool(index, namespace: str = "", fields: Sequence[str] = SEARCH_FIELDS) -> FunctionTool:
+    """``search_pinecone``: ค้น Pinecone index ที่มี integrated embedding ผ่าน SDK ใน process นี้"""
+    # search API เรียก default namespace ว่า "__default__"
+    namespace = namespace or "__default__"
+    fields = list(fields)
+
+    def search_one(text: str, top_k: int, filter: Optional[Dict[str, Any]]):
+        return index.search_records(
+            namespace=namespace, top_k=top_k, inputs={"text": text}, filter=filter, fields=fields,
+        )
+
+    async def search_pinecone(query: str = "", queries: Optional[list[str]] = None, top_k: int = 5,
+                              category: str = "") -> dict:
+        """Search the sales knowledge base (Pinecone) by text.
+
+        Pass one question in ``query``, or several different questions at once in
+        ``queries`` (they are searched concurrently) instead of calling the tool
+        several times.
+
+        Args:
+            query: The user's question or the key terms to look up, in the user's language ("" when using queries).
+            queries: Several questions to search in one call (up to 10); use instead of query.
+            top_k: Number of results per question (default 5, max 20).
+            category: Optional category to restrict the search to (e.g. "sales_skills").
+
+        Returns:
+            query: {"result": {"hits": [{"_id", "_score", "fields": {"content", "title", "category"}}]}, "usage": {...}}
+            queries: {"results": [{"query", "hits": [...]}], "usage": {...}}
+        """
+        texts = list(dict.fromkeys(q.strip() for q in (queries or []) if q and q.strip()))
+        if not texts and not query.strip():
+            return {"error": "query or queries is required"}
+        if len(texts) > MAX_BATCH_QUERIES:
+            return {"error": f"at most {MAX_BATCH_QUERIES} queries per call"}
+
+        top_k = max(1, min(int(top_k), MAX_TOP_K))
+        filter = {"category": {"$eq": category}} if category else None
+        started = time.perf_counter()
+        try:
+            responses = await asyncio.gather(*(
+                asyncio.to_thread(search_one, text, top_k, filter) for text in (texts or [query.strip()])
+            ))
+        except Exception as e:
+            logger.warning(f"⚠️ pinecone search failed: {e}")
+            return {"error": str(e)}
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"🔎 pinecone search: {len(responses)} queries in {elapsed * 1000:.1f}ms")
+        if not texts:
+            return {"result": {"hits": _hits(responses[0])}, "usage": _usage(responses)}
+        return {
+            "results": [{"query": text, "hits": _hits(r)} for text, r in zip(texts, responses)],
+            "usage": _usage(responses),
+        }
+
+    return FunctionTool(search_pinecone)
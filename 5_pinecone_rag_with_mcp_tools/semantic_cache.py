@@ -0,0 +1,299 @@
+"""
+Semantic Query Cache
+- Cache ผลของ search tool (``search-records`` ผ่าน MCP, ``search_pinecone`` ของ pinecone_tool.py,
+  ``search_records`` ของ local index และ ``search_knowledge`` ของ hybrid search) ไม่ต้อง embed และค้นใหม่ทุกครั้งที่ถามซ้ำ
+- ขั้นตอน lookup:
+    1. normalize คำถาม (NFKC, ตัวพิมพ์เล็ก, ตัดเครื่องหมาย, ช่องว่างระหว่างคำไทย
+       และคำลงท้าย ครับ/ค่ะ/นะ)
+    2. exact match ใน LRU
+    3. nearest neighbour บน embedding ของคำถามที่ cache ไว้ ถ้า cosine >= threshold
+       และตัวเลข คำภาษาอังกฤษ และคำปฏิเสธตรงกันทุกตัว (เฉพาะ embedder ที่วัดความหมาย)
+- entry หมดอายุตาม TTL และถูกทิ้งเมื่อ ``ingest_data.py`` เปลี่ยนข้อมูลใน namespace นั้น
+  (``.index_stamp`` ดู ingest_manifest.py)
+- argument อื่นนอกจากข้อความ (topK, filter, namespace, category) ต้องตรงกันทุกตัว
+
+Embedder ของคำถามเลือกด้วย ``SEMANTIC_CACHE_EMBEDDER`` (ค่าเดียวกับ ``LOCAL_EMBEDDER``)
+``hashing`` วัดความเหมือนของตัวอักษร คำถามที่ต่างกันแค่คำสำคัญคำเดียว ("plan 1" / "plan 2")
+ได้ cosine สูงกว่า threshold จึงใช้แค่ exact match หลัง normalize
+ใช้ ``e5`` ถ้าต้องการให้คำถามที่ความหมายเดียวกันแต่ใช้คำต่างกัน hit ด้วย
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+from adk_extensions.metrics import REGISTRY
+
+try:
+    from .ingest_manifest import INDEX_STAMP_PATH, read_index_stamps
+    from .local_index import get_embedder
+except ImportError:  # รันตรงจากโฟลเดอร์นี้
+    from ingest_manifest import INDEX_STAMP_PATH, read_index_stamps
+    from local_index import get_embedder
+
+logger = logging.getLogger(__name__)
+
+# tool name -> path ของข้อความคำถามใน args
+QUERY_PATHS: Dict[str, Tuple[str, ...]] = {
+    "search-records": ("query", "inputs", "text"),
+    "search_records": ("query", "inputs", "text"),
+    "search_knowledge": ("query",),
+    "search_pinecone": ("query",),  # batch (queries) ไม่ผ่าน cache
+}
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "rag_query_cache_lookups_total",
+    "RAG search tool calls by semantic cache outcome (exact, semantic, miss).",
+    labelnames=("tool", "result"),
+)
+
+_PUNCTUATION = re.compile(r"[^\w\s฀-๿]+")
+_POLITE_ENDING = re.compile(r"(\s*(ครับ|คับ|ค่ะ|คะ|จ้ะ|จ้า|นะ|หน่อย))+$")
+# ช่องว่างระหว่างคำไทยเป็นแค่การเว้นวรรคตามใจผู้พิมพ์
+_THAI_SPACE = re.compile(r"(?<=[฀-๿])\s+(?=[฀-๿])")
+# คำที่เปลี่ยนคำตอบได้ทั้งที่ embedding แทบไม่ต่าง: ตัวเลข คำภาษาอังกฤษ (ชื่อแพ็กเกจ รุ่น) และคำปฏิเสธ
+_KEY_TERM = re.compile(r"\d+|[a-z]+|ไม่|ห้าม|ยกเว้น")
+
+
+def normalize_query(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    text = _THAI_SPACE.sub("", " ".join(text.split()))
+    return _POLITE_ENDING.sub("", text).strip()
+
+
+def key_terms(query: str) -> Tuple[str, ...]:
+    """คำใน query ที่ต้องตรงกันก่อนใช้ผลของคำถามที่ใกล้เคียง (query ที่ normalize แล้ว)"""
+    return tuple(_KEY_TERM.findall(query))
+
+
+def _is_error(result: Any) -> bool:
+    if isinstance(result, dict):
+        return bool(result.get("isError") or result.get("error"))
+    return bool(getattr(result, "isError", False))
+
+
+@dataclass
+class _Entry:
+    scope: str
+    namespace: str
+    stamp: str
+    terms: Tuple[str, ...]
+    vector: Optional[np.ndarray]
+    expires_at: float
+    result: Any
+
+
+class SemanticQueryCache:
+    """Exact LRU + nearest-neighbour cache ของผลค้นหา"""
+
+    def __init__(self, ttl: float = 3600, threshold: float = 0.95, max_entries: int = 1024,
+                 embedder=None, stamp_path=INDEX_STAMP_PATH):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.embedder = embedder or get_embedder(os.getenv("SEMANTIC_CACHE_EMBEDDER") or None)
+        # nearest neighbour เฉพาะ embedder ที่วัดความหมาย; hashing ใช้แค่ exact match
+        self.semantic = getattr(self.embedder, "semantic", False)
+        self.stamp_path = stamp_path
+        # (scope, normalized query) -> entry
+        self._entries: OrderedDict[Tuple[str, str], _Entry] = OrderedDict()
+        self._stamps: Dict[str, str] = {}
+        self._stamp_mtime: Optional[int] = None
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        _caches.append(self)
+
+    @classmethod
+    def from_env(cls) -> "SemanticQueryCache":
+        return cls(
+            ttl=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600")),
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024")),
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.exact_hits + self.semantic_hits + self.misses
+        return (self.exact_hits + self.semantic_hits) / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+    def _stamp(self, namespace: str) -> str:
+        """version ปัจจุบันของ namespace (อ่านไฟล์ใหม่เฉพาะเมื่อ mtime เปลี่ยน)"""
+        try:
+            mtime = os.stat(self.stamp_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._stamp_mtime:
+            self._stamp_mtime = mtime
+            self._stamps = read_index_stamps(self.stamp_path)
+        return self._stamps.get(namespace, "")
+
+    def _valid(self, entry: _Entry, now: float) -> bool:
+        return entry.expires_at > now and entry.stamp == self._stamp(entry.namespace)
+
+    async def get(self, scope: str, namespace: str, query: str) -> Tuple[str, Any, Optional[np.ndarray]]:
+        """(``"exact"``/``"semantic"``/``"miss"``, result, embedding ของคำถามหรือ None)"""
+        now = time.monotonic()
+        key = (scope, query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self._valid(entry, now):
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return "exact", entry.result, entry.vector
+            del self._entries[key]
+        if not self.semantic:
+            self.misses += 1
+            return "miss", None, None
+
+        # e5 ใช้เวลาหลาย ms ต่อคำถาม: ไม่ embed บน event loop
+        vector = (await asyncio.to_thread(self.embedder.embed, [query], kind="query"))[0]
+        terms = key_terms(query)
+        candidates = [(k, e) for k, e in self._entries.items() if e.scope == scope and e.terms == terms]
+        if candidates:
+            scores = np.stack([e.vector for _, e in candidates]) @ vector
+            for i in np.argsort(-scores):
+                if scores[i] < self.threshold:
+                    break
+                best_key, best = candidates[i]
+                if self._valid(best, now):
+                    self._entries.move_to_end(best_key)
+                    self.semantic_hits += 1
+                    return "semantic", best.result, vector
+                del self._entries[best_key]
+        self.misses += 1
+        return "miss", None, vector
+
+    def put(self, scope: str, namespace: str, query: str, vector: Optional[np.ndarray], result: Any) -> None:
+        self._entries[(scope, query)] = _Entry(
+            scope=scope,
+            namespace=namespace,
+            stamp=self._stamp(namespace),
+            terms=key_terms(query),
+            vector=vector,
+            expires_at=time.monotonic() + self.ttl,
+            result=result,
+        )
+        self._entries.move_to_end((scope, query))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _overall_hit_rate() -> float:
+    # รวมทุก cache ในโปรเซส (เช่น agent หลายตัว) เป็นอัตราเดียว
+    hits = sum(cache.exact_hits + cache.semantic_hits for cache in _caches)
+    total = hits + sum(cache.misses for cache in _caches)
+    return hits / total if total else 0.0
+
+
+_caches: list = []
+
+REGISTRY.gauge(
+    "rag_query_cache_hit_rate",
+    "Share of RAG search calls served from the semantic cache.",
+    fn=_overall_hit_rate,
+)
+
+
+def _query_text(args: dict, path: Tuple[str, ...]) -> Optional[str]:
+    value: Any = args
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value if isinstance(value, str) else None
+
+
+def _scope(tool_name: str, args: dict, path: Tuple[str, ...]) -> str:
+    """tool + argument อื่นนอกจากข้อความคำถาม"""
+    rest = copy.deepcopy(args)
+    node = rest
+    for key in path[:-1]:
+        node = node[key]
+    node.pop(path[-1], None)
+    return tool_name + ":" + json.dumps(rest, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class SemanticCachedTool(BaseTool):
+    """Search tool ที่ตอบจาก ``SemanticQueryCache`` ก่อนถ้าเคยถามคำถามเดียวกัน/ใกล้เคียง"""
+
+    def __init__(self, tool: BaseTool, cache: SemanticQueryCache, query_path: Tuple[str, ...]):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self._tool = tool
+        self._cache = cache
+        self._query_path = query_path
+
+    def _get_declaration(self):
+        return self._tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context) -> Any:
+        text = _query_text(args, self._query_path)
+        if not text or not normalize_query(text):
+            return await self._tool.run_async(args=args, tool_context=tool_context)
+
+        query = normalize_query(text)
+        scope = _scope(self.name, args, self._query_path)
+        namespace = args.get("namespace") or ""
+        outcome, result, vector = await self._cache.get(scope, namespace, query)
+        CACHE_LOOKUPS.inc(tool=self.name, result=outcome)
+        if outcome != "miss":
+            logger.info(f"🎯 query cache {outcome} hit: {text[:60]!r} (hit rate {self._cache.hit_rate:.0%})")
+            return result
+
+        result = await self._tool.run_async(args=args, tool_context=tool_context)
+        if not _is_error(result):
+            self._cache.put(scope, namespace, query, vector, result)
+        return result
+
+
+class SemanticCachingToolset(BaseToolset):
+    """Wraps a toolset (เช่น Pinecone MCP); search tool ใน ``QUERY_PATHS`` ถูก cache"""
+
+    def __init__(self, toolset: BaseToolset, cache: SemanticQueryCache):
+        super().__init__(tool_filter=toolset.tool_filter)
+        self.toolset = toolset
+        self.cache = cache
+
+    async def get_tools(self, readonly_context=None) -> list[BaseTool]:
+        tools = await self.toolset.get_tools(readonly_context)
+        return [
+            SemanticCachedTool(tool, self.cache, QUERY_PATHS[tool.name]) if tool.name in QUERY_PATHS else tool
+            for tool in tools
+        ]
+
+    async def close(self) -> None:
+        await self.toolset.close()
+
+
+def with_semantic_cache(tool: Union[BaseTool, BaseToolset], cache: SemanticQueryCache) -> Union[BaseTool, BaseToolset]:
+    """ครอบ search tool หรือ toolset ด้วย cache; tool อื่นคืนค่าเดิม"""
+    if isinstance(tool, BaseToolset):
+        return SemanticCachingToolset(tool, cache)
+    if tool.name in QUERY_PATHS:
+        return SemanticCachedTool(tool, cache, QUERY_PATHS[tool.name])
+    return tool
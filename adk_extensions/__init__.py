@@ -0,0 +1,6 @@
+"""
+Shared runtime extensions for the ADK examples in this repository.
+
+Modules are imported individually (e.g. ``from adk_extensions.metrics import REGISTRY``)
+so each example only pulls in the dependencies it uses.
+"""
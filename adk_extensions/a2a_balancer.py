@@ -0,0 +1,263 @@
+"""
+A2A Balancer Module
+
+Spreads one ``RemoteA2aAgent`` over several replicas of the same A2A server.
+
+``LoadBalancingTransport`` sits inside the pooled A2A httpx client. Any
+request addressed to one of the pool's endpoints is sent to the replica with
+the fewest outstanding requests, except that every message of an A2A
+conversation (``contextId``) goes to the replica that served its first
+message, because each replica keeps its conversations in its own session
+store. The first message of a conversation has no ``contextId`` yet, so the
+transport assigns one before sending it; the server adopts it and the
+``RemoteA2aAgent`` sends it back on every later turn.
+
+Replicas are health-checked by fetching their agent card. A replica that
+fails ``failure_threshold`` requests or checks in a row is ejected for
+``ejection_time`` seconds, doubling on every repeat ejection.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+import httpx
+
+from adk_extensions.agent_card import AGENT_CARD_PATHS
+from adk_extensions.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STREAM_METHODS = ("message/send", "message/stream")
+CARD_PATH = AGENT_CARD_PATHS[0]
+
+REPLICA_REQUESTS = REGISTRY.counter(
+    "a2a_replica_requests_total",
+    "A2A requests sent to each remote agent replica.",
+    labelnames=("endpoint", "status"),
+)
+REPLICA_EJECTIONS = REGISTRY.counter(
+    "a2a_replica_ejections_total",
+    "Times a remote agent replica was ejected as an outlier.",
+    labelnames=("endpoint",),
+)
+
+
+class Replica:
+    """One A2A endpoint with its load and health state."""
+
+    def __init__(self, url: str):
+        self.url = httpx.URL(url.rstrip("/") + "/")
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    @property
+    def origin(self) -> tuple:
+        return (self.url.scheme, self.url.host, self.url.port)
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.ejected_until
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response body that releases its replica when the (streamed) response ends."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close:
+                self._on_close()
+                self._on_close = None
+
+
+class LoadBalancingTransport(httpx.AsyncBaseTransport):
+    """Least-outstanding-requests balancing with context affinity and outlier ejection."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        endpoints: list[str],
+        health_interval: float = 10.0,
+        failure_threshold: int = 3,
+        ejection_time: float = 30.0,
+        max_ejection_time: float = 300.0,
+        max_contexts: int = 10000,
+    ):
+        if not endpoints:
+            raise ValueError("LoadBalancingTransport needs at least one endpoint")
+        self._transport = transport
+        self.replicas = [Replica(url) for url in endpoints]
+        self._by_origin = {replica.origin: replica for replica in self.replicas}
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.max_contexts = max_contexts
+        # contextId -> replica that holds the conversation (LRU)
+        self._affinity: OrderedDict[str, Replica] = OrderedDict()
+        self._health_task: asyncio.Task | None = None
+
+        REGISTRY.gauge(
+            "a2a_replica_outstanding",
+            "In-flight A2A requests per remote agent replica.",
+            labelnames=("endpoint",),
+            fn=lambda: {(str(r.url),): r.outstanding for r in self.replicas},
+        )
+        REGISTRY.gauge(
+            "a2a_replica_available",
+            "1 while a remote agent replica is in rotation, 0 while ejected.",
+            labelnames=("endpoint",),
+            fn=lambda: {(str(r.url),): int(r.available) for r in self.replicas},
+        )
+
+    # -- selection -----------------------------------------------------
+
+    def _least_outstanding(self, exclude: Replica | None = None) -> Replica:
+        candidates = [r for r in self.replicas if r.available and r is not exclude]
+        if not candidates:
+            # Everything is ejected: still try the one that comes back first
+            candidates = sorted(self.replicas, key=lambda r: r.ejected_until)[:1]
+        return min(candidates, key=lambda r: (r.outstanding, r.consecutive_failures))
+
+    def _pick(self, context_id: str | None) -> Replica:
+        if context_id is None:
+            return self._least_outstanding()
+
+        replica = self._affinity.get(context_id)
+        if replica is not None and replica.available:
+            self._affinity.move_to_end(context_id)
+            return replica
+        if replica is not None:
+            logger.warning(f"⚠️ Replica {replica.url} is ejected; moving context {context_id} to another replica")
+        replica = self._least_outstanding(exclude=replica)
+        self._affinity[context_id] = replica
+        if len(self._affinity) > self.max_contexts:
+            self._affinity.popitem(last=False)
+        return replica
+
+    @staticmethod
+    def _prepare_body(body: bytes) -> tuple[bytes, str | None]:
+        """Return the (possibly rewritten) JSON-RPC body and its message contextId."""
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return body, None
+        if not isinstance(payload, dict) or payload.get("method") not in STREAM_METHODS:
+            return body, None
+
+        message = payload.get("params", {}).get("message", {})
+        context_id = message.get("contextId")
+        if context_id is None:
+            # First turn: pin the conversation id now so the reply's replica is known
+            context_id = message["contextId"] = str(uuid.uuid4())
+            body = json.dumps(payload).encode()
+        return body, context_id
+
+    # -- health --------------------------------------------------------
+
+    def _record_success(self, replica: Replica) -> None:
+        replica.consecutive_failures = 0
+        if replica.available:
+            replica.ejections = 0
+
+    def _record_failure(self, replica: Replica) -> None:
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self.failure_threshold and replica.available:
+            duration = min(self.ejection_time * 2 ** replica.ejections, self.max_ejection_time)
+            replica.ejections += 1
+            replica.ejected_until = time.monotonic() + duration
+            REPLICA_EJECTIONS.inc(endpoint=str(replica.url))
+            logger.warning(f"⚠️ Ejected A2A replica {replica.url} for {duration:.0f}s")
+
+    async def _check(self, replica: Replica) -> None:
+        request = httpx.Request("GET", replica.url.join(CARD_PATH.lstrip("/")))
+        try:
+            response = await asyncio.wait_for(self._transport.handle_async_request(request), self.health_interval)
+            await response.aclose()
+            healthy = response.status_code in (200, 304)
+        except (httpx.HTTPError, asyncio.TimeoutError):
+            healthy = False
+
+        if healthy:
+            # An ejected replica stays out until its ejection time is served
+            if replica.available:
+                self._record_success(replica)
+        else:
+            self._record_failure(replica)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+            await asyncio.sleep(self.health_interval)
+
+    # -- transport -----------------------------------------------------
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        original = self._by_origin.get((request.url.scheme, request.url.host, request.url.port))
+        if original is None:
+            return await self._transport.handle_async_request(request)
+        if self._health_task is None and len(self.replicas) > 1:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+        body = await request.aread()
+        context_id = None
+        if request.method == "POST":
+            body, context_id = self._prepare_body(body)
+        replica = self._pick(context_id)
+
+        url = request.url.copy_with(scheme=replica.url.scheme, host=replica.url.host, port=replica.url.port)
+        headers = [(k, v) for k, v in request.headers.raw if k.lower() not in (b"host", b"content-length")]
+        routed = httpx.Request(request.method, url, headers=headers, content=body, extensions=request.extensions)
+
+        replica.outstanding += 1
+        try:
+            response = await self._transport.handle_async_request(routed)
+        except httpx.TransportError:
+            replica.outstanding -= 1
+            self._record_failure(replica)
+            REPLICA_REQUESTS.inc(endpoint=str(replica.url), status="error")
+            raise
+
+        if response.status_code >= 500:
+            self._record_failure(replica)
+        else:
+            self._record_success(replica)
+        REPLICA_REQUESTS.inc(endpoint=str(replica.url), status=str(response.status_code))
+
+        def release():
+            replica.outstanding -= 1
+
+        response.stream = _TrackedStream(response.stream, release)
+        return response
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "endpoint": str(r.url),
+                "outstanding": r.outstanding,
+                "available": r.available,
+                "consecutive_failures": r.consecutive_failures,
+                "ejections": r.ejections,
+            }
+            for r in self.replicas
+        ]
+
+    async def aclose(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+        await self._transport.aclose()
@@ -0,0 +1,165 @@
+"""
+A2A Transport Module
+
+Pooled, keep-alive HTTP client for the ``RemoteA2aAgent`` A2A client factory.
+
+Every delegation to the travel agent reuses a pooled connection instead of
+opening a new one, and agent-card fetches are answered from a small cache:
+a cached card is served as-is for ``card_ttl`` seconds and then revalidated
+with ``If-None-Match`` / ``If-Modified-Since``, so an unchanged card costs a
+``304`` instead of a full download.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from adk_extensions.a2a_balancer import LoadBalancingTransport
+from adk_extensions.agent_card import AGENT_CARD_PATHS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CachedCard:
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class AgentCardCachingTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport and caches agent-card GETs with ETag revalidation."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, card_ttl: float = 60.0):
+        self._transport = transport
+        self.card_ttl = card_ttl
+        self._cards: dict[str, _CachedCard] = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def _is_card_request(request: httpx.Request) -> bool:
+        return request.method == "GET" and request.url.path.endswith(AGENT_CARD_PATHS)
+
+    @staticmethod
+    def _replay(cached: _CachedCard, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            cached.status_code,
+            headers=cached.headers,
+            content=cached.content,
+            request=request,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._is_card_request(request):
+            return await self._transport.handle_async_request(request)
+
+        key = str(request.url)
+        cached = self._cards.get(key)
+        if cached and time.monotonic() - cached.fetched_at < self.card_ttl:
+            self.hits += 1
+            return self._replay(cached, request)
+
+        if cached and cached.etag:
+            request.headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            request.headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self._transport.handle_async_request(request)
+        if cached and response.status_code == 304:
+            await response.aclose()
+            cached.fetched_at = time.monotonic()
+            self.revalidated += 1
+            return self._replay(cached, request)
+
+        self.misses += 1
+        if response.status_code != 200:
+            return response
+
+        content = await response.aread()
+        # The body is already decoded; drop headers that describe the wire encoding
+        headers = [
+            (k, v)
+            for k, v in response.headers.raw
+            if k.lower() not in (b"content-encoding", b"content-length", b"transfer-encoding")
+        ]
+        self._cards[key] = _CachedCard(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.monotonic(),
+        )
+        return self._replay(self._cards[key], request)
+
+    def invalidate(self, url: str | None = None) -> None:
+        """Forget one cached card (by URL) or all of them."""
+        if url is None:
+            self._cards.clear()
+        else:
+            self._cards.pop(url, None)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_a2a_httpx_client(
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+    connect_timeout: float = 5.0,
+    read_timeout: float = 600.0,
+    card_ttl: float = 60.0,
+    endpoints: list[str] | None = None,
+) -> httpx.AsyncClient:
+    """Build the shared pooled client for ``ClientConfig(httpx_client=...)``.
+
+    With more than one ``endpoints`` the requests addressed to any of them are
+    balanced across all of them (see ``a2a_balancer``).
+
+    ``http2`` is negotiated through TLS ALPN, so it only takes effect for
+    ``https://`` agent URLs; plain ``http://`` stays on keep-alive HTTP/1.1.
+    ``read_timeout`` bounds the gap between streamed chunks, not the whole turn.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+    if endpoints and len(endpoints) > 1:
+        transport = LoadBalancingTransport(transport, endpoints)
+        logger.info(f"⚖️ Balancing A2A requests over {len(endpoints)} replicas: {', '.join(endpoints)}")
+    logger.info(
+        f"🔌 A2A client pool: max_connections={max_connections}, "
+        f"keepalive={max_keepalive_connections}/{keepalive_expiry:.0f}s, http2={http2}"
+    )
+    return httpx.AsyncClient(
+        transport=AgentCardCachingTransport(transport, card_ttl=card_ttl),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+    )
+
+
+def create_a2a_httpx_client_from_env(endpoints: list[str] | None = None) -> httpx.AsyncClient:
+    """``create_a2a_httpx_client`` configured from ``A2A_HTTP_*`` environment variables."""
+    return create_a2a_httpx_client(
+        max_connections=int(os.getenv("A2A_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("A2A_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("A2A_HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")),
+        http2=os.getenv("A2A_HTTP2", "false").lower() == "true",
+        connect_timeout=float(os.getenv("A2A_HTTP_CONNECT_TIMEOUT_SECONDS", "5")),
+        read_timeout=float(os.getenv("A2A_HTTP_READ_TIMEOUT_SECONDS", "600")),
+        card_ttl=float(os.getenv("A2A_AGENT_CARD_TTL_SECONDS", "60")),
+        endpoints=endpoints,
+    )
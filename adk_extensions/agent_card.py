@@ -0,0 +1,61 @@
+"""
+Agent Card Module
+
+ASGI middleware that adds an ``ETag`` to the A2A agent-card response and
+answers ``If-None-Match`` revalidations with ``304 Not Modified``, so clients
+that cache the card only re-download it when it actually changed.
+"""
+
+import hashlib
+
+AGENT_CARD_PATHS = ("/.well-known/agent-card.json", "/.well-known/agent.json")
+
+
+class AgentCardETagMiddleware:
+    """Install with ``a2a_app.add_middleware(AgentCardETagMiddleware)``."""
+
+    def __init__(self, app, paths: tuple[str, ...] = AGENT_CARD_PATHS, max_age: int = 60):
+        self.app = app
+        self.paths = paths
+        self.max_age = max_age
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].endswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        # The card is small: buffer it to hash it
+        start = None
+        body = bytearray()
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if start is None:
+            return
+        if start["status"] != 200:
+            await send(start)
+            await send({"type": "http.response.body", "body": bytes(body)})
+            return
+
+        etag = '"' + hashlib.blake2b(bytes(body), digest_size=16).hexdigest() + '"'
+        cache_control = f"max-age={self.max_age}".encode()
+        if_none_match = next((v.decode() for k, v in scope["headers"] if k == b"if-none-match"), "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", cache_control)],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers = [(k, v) for k, v in start["headers"] if k.lower() not in (b"etag", b"cache-control")]
+        headers += [(b"etag", etag.encode()), (b"cache-control", cache_control)]
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": bytes(body)})
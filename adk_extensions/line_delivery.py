@@ -0,0 +1,305 @@
+"""
+LINE Delivery Queue Module
+
+Sends LINE messages from a background queue instead of inside the agent turn.
+
+``LineDeliveryQueue.enqueue`` returns as soon as the message is queued. A
+worker task collects everything queued within ``batch_window_ms`` and sends it
+to the Messaging API with as few requests as possible:
+
+- messages for the same user are combined, up to 5 per push,
+- the same batch going to several users becomes one multicast
+  (up to 500 recipients),
+- each endpoint is paced by a token bucket below LINE's rate limits,
+- 429 and 5xx answers and network errors are retried with jittered
+  exponential backoff, using the same ``X-Line-Retry-Key`` so that LINE
+  never delivers a batch twice.
+
+``LineDeliveryToolset`` exposes the queue to the agent as ``push_text_message``
+and ``push_flex_message``, the same tool names as the LINE Bot MCP server, so
+prompts and ``repair_flex_before_tool`` keep working.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import httpx
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+
+from adk_extensions.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LINE_API_URL = "https://api.line.me/v2/bot/message"
+MAX_MESSAGES_PER_REQUEST = 5
+MAX_MULTICAST_RECIPIENTS = 500
+# Tools of the LINE Bot MCP server that the queue replaces
+PUSH_TOOL_NAMES = ("push_text_message", "push_flex_message")
+
+DELIVERY_REQUESTS = REGISTRY.counter(
+    "line_delivery_requests_total",
+    "LINE Messaging API requests sent by the delivery queue.",
+    labelnames=("endpoint", "status"),
+)
+DELIVERY_SECONDS = REGISTRY.histogram(
+    "line_delivery_seconds",
+    "Time from enqueue to the LINE API accepting the message.",
+    labelnames=("endpoint",),
+)
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class _Delivery:
+    to: str
+    messages: list[dict]
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class LineDeliveryQueue:
+    """Background, batched and rate-limited sender for LINE push/multicast."""
+
+    def __init__(
+        self,
+        channel_access_token: str,
+        batch_window_ms: float = 50,
+        push_rate: float = 1000,
+        multicast_rate: float = 100,
+        max_retries: int = 5,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.channel_access_token = channel_access_token
+        self.batch_window = batch_window_ms / 1000
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._buckets = {
+            "push": TokenBucket(push_rate, burst=max(1, int(push_rate // 10))),
+            "multicast": TokenBucket(multicast_rate, burst=max(1, int(multicast_rate // 10))),
+        }
+        self._queue: asyncio.Queue[_Delivery] | None = None
+        self._worker: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+        _queues.append(self)
+
+    @classmethod
+    def from_env(cls) -> "LineDeliveryQueue":
+        return cls(
+            channel_access_token=os.getenv("CHANNEL_ACCESS_TOKEN", ""),
+            batch_window_ms=float(os.getenv("LINE_DELIVERY_BATCH_WINDOW_MS", "50")),
+            push_rate=float(os.getenv("LINE_PUSH_RATE_PER_SECOND", "1000")),
+            multicast_rate=float(os.getenv("LINE_MULTICAST_RATE_PER_SECOND", "100")),
+            max_retries=int(os.getenv("LINE_DELIVERY_MAX_RETRIES", "5")),
+        )
+
+    def enqueue(self, to: str | list[str], messages: list[dict]) -> int:
+        """Queue ``messages`` for one or more user ids; returns the number of recipients."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        recipients = [to] if isinstance(to, str) else list(to)
+        for user_id in recipients:
+            self._queue.put_nowait(_Delivery(user_id, list(messages)))
+        return len(recipients)
+
+    # -- batching ------------------------------------------------------
+
+    @staticmethod
+    def plan(deliveries: list[_Delivery]) -> list[list[tuple[str, list[str], list[dict], float]]]:
+        """Group queued deliveries into waves of ``(endpoint, recipients, messages, oldest queued_at)``.
+
+        Wave ``n`` holds every user's ``n``-th batch of up to 5 messages, so a
+        user's messages arrive in order while different users are sent in parallel.
+        """
+        per_user: dict[str, list[_Delivery]] = {}
+        for delivery in deliveries:
+            per_user.setdefault(delivery.to, []).append(delivery)
+
+        # (wave, messages) -> [messages, recipients, oldest queued_at]
+        batches: dict[tuple[int, str], list] = {}
+        for user_id, items in per_user.items():
+            messages = [m for item in items for m in item.messages]
+            queued_at = min(item.queued_at for item in items)
+            for wave, i in enumerate(range(0, len(messages), MAX_MESSAGES_PER_REQUEST)):
+                batch = messages[i:i + MAX_MESSAGES_PER_REQUEST]
+                key = (wave, json.dumps(batch, sort_keys=True, ensure_ascii=False))
+                entry = batches.setdefault(key, [batch, [], queued_at])
+                entry[1].append(user_id)
+                entry[2] = min(entry[2], queued_at)
+
+        waves: list[list] = []
+        for (wave, _), (batch, users, queued_at) in batches.items():
+            while len(waves) <= wave:
+                waves.append([])
+            if len(users) == 1:
+                waves[wave].append(("push", users, batch, queued_at))
+                continue
+            # Same batch for several users -> one multicast instead of one push each
+            for i in range(0, len(users), MAX_MULTICAST_RECIPIENTS):
+                waves[wave].append(("multicast", users[i:i + MAX_MULTICAST_RECIPIENTS], batch, queued_at))
+        return waves
+
+    async def _run(self) -> None:
+        while True:
+            deliveries = [await self._queue.get()]
+            # Let messages from the same turn (or other sessions) join this batch
+            await asyncio.sleep(self.batch_window)
+            while not self._queue.empty():
+                deliveries.append(self._queue.get_nowait())
+            try:
+                for wave in self.plan(deliveries):
+                    results = await asyncio.gather(
+                        *(self._send(*request) for request in wave), return_exceptions=True
+                    )
+                    for (endpoint, recipients, messages, _), result in zip(wave, results):
+                        if isinstance(result, Exception):
+                            logger.error(
+                                f"❌ LINE {endpoint} of {len(messages)} message(s) to {len(recipients)} "
+                                f"recipient(s) dropped: {result!r}"
+                            )
+            except Exception as e:
+                # Keep the worker alive: one bad batch must not stall the queue
+                logger.error(f"❌ LINE delivery batch of {len(deliveries)} dropped: {e!r}")
+            finally:
+                for _ in deliveries:
+                    self._queue.task_done()
+
+    # -- sending -------------------------------------------------------
+
+    async def _send(self, endpoint: str, recipients: list[str], messages: list[dict], queued_at: float) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=LINE_API_URL,
+                headers={"Authorization": f"Bearer {self.channel_access_token}"},
+                timeout=httpx.Timeout(10.0),
+            )
+        payload = {"to": recipients[0] if endpoint == "push" else recipients, "messages": messages}
+        # Same key on every retry: LINE answers 409 instead of sending twice
+        headers = {"X-Line-Retry-Key": str(uuid.uuid4())}
+
+        for attempt in range(self.max_retries + 1):
+            await self._buckets[endpoint].acquire()
+            try:
+                response = await self._client.post(f"/{endpoint}", json=payload, headers=headers)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status, response = None, None
+                logger.warning(f"⚠️ LINE {endpoint} failed: {e}")
+            DELIVERY_REQUESTS.inc(endpoint=endpoint, status=str(status or "error"))
+
+            if status is not None and (status < 400 or status == 409):
+                DELIVERY_SECONDS.observe(time.monotonic() - queued_at, endpoint=endpoint)
+                logger.info(f"📨 LINE {endpoint}: {len(messages)} message(s) to {len(recipients)} recipient(s)")
+                return
+            if status is not None and status != 429 and status < 500:
+                logger.error(f"❌ LINE {endpoint} rejected ({status}): {response.text[:300]}")
+                return
+            if attempt < self.max_retries:
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+                await asyncio.sleep(random.uniform(backoff / 2, backoff))
+        logger.error(f"❌ LINE {endpoint} gave up after {self.max_retries + 1} attempts")
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def close(self) -> None:
+        """Send what is still queued, then stop."""
+        if self._worker is not None and not self._worker.done():
+            await self._queue.join()
+            self._worker.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+        if self in _queues:
+            _queues.remove(self)
+
+
+_queues: list[LineDeliveryQueue] = []
+
+REGISTRY.gauge(
+    "line_delivery_queue_depth",
+    "LINE messages waiting in the delivery queues.",
+    fn=lambda: sum(queue.depth for queue in _queues),
+)
+
+
+class LineDeliveryToolset(BaseToolset):
+    """``push_text_message`` / ``push_flex_message`` tools that return once the message is queued."""
+
+    def __init__(self, queue: LineDeliveryQueue, default_user_id: Optional[str] = None):
+        super().__init__()
+        self.queue = queue
+        self.default_user_id = default_user_id or os.getenv("DESTINATION_USER_ID", "")
+        self._tools = [FunctionTool(self._push_text_message()), FunctionTool(self._push_flex_message())]
+
+    def _enqueue(self, user_id: str, messages: list[dict]) -> dict:
+        recipient = user_id or self.default_user_id
+        if not recipient:
+            return {"error": "user_id is required (no DESTINATION_USER_ID is configured)"}
+        self.queue.enqueue(recipient, messages)
+        return {"status": "queued"}
+
+    def _push_text_message(self):
+        def push_text_message(text: str, user_id: str = "") -> dict:
+            """Send a text message to a LINE user. Returns once the message is queued for delivery.
+
+            Args:
+                text: Message text (max 5000 characters).
+                user_id: LINE user id; empty sends to the default destination user.
+            """
+            return self._enqueue(user_id, [{"type": "text", "text": text[:5000]}])
+
+        return push_text_message
+
+    def _push_flex_message(self):
+        def push_flex_message(message: dict, user_id: str = "") -> dict:
+            """Send a Flex Message to a LINE user. Returns once the message is queued for delivery.
+
+            Args:
+                message: Flex Message object with "altText" and "contents" (bubble or carousel).
+                user_id: LINE user id; empty sends to the default destination user.
+            """
+            return self._enqueue(user_id, [{**message, "type": "flex"}])
+
+        return push_flex_message
+
+    async def get_tools(self, readonly_context=None) -> list[BaseTool]:
+        return self._tools
+
+    async def close(self) -> None:
+        await self.queue.close()
+
+
+def without_push_tools(tool: BaseTool, readonly_context: Any = None) -> bool:
+    """``tool_filter`` for the LINE Bot MCP toolset when the queue sends the pushes."""
+    return tool.name not in PUSH_TOOL_NAMES
@@ -0,0 +1,316 @@
+"""
+LINE Flex Message Module
+
+Builds and checks LINE Flex Messages in Python instead of having the model
+write the layout JSON freehand.
+
+- ``build_listing_carousel`` turns structured listing results into a carousel
+  that follows the Flex spec (altText, at most 12 bubbles, wrapped text,
+  https images and buttons, size limits).
+- ``repair_flex_message`` validates any Flex Message and fixes what it can:
+  cuts altText and the carousel, drops empty text and non-https images,
+  trims button labels and drops bubbles until the JSON fits LINE's size limits.
+  What cannot be fixed is reported as an error, so the model gets an answer
+  without a failed LINE API round trip.
+- ``repair_flex_before_tool`` runs that check as a ``before_tool_callback``
+  on the LINE Bot MCP ``push_flex_message`` / ``broadcast_flex_message`` calls.
+- ``listing_carousel_tool`` is a tool that takes the listings, builds the
+  carousel and pushes it through the LINE Bot MCP toolset, so the model only
+  writes the listing fields.
+"""
+
+import json
+import logging
+from typing import Any, Optional
+
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+
+logger = logging.getLogger(__name__)
+
+FLEX_TOOL_NAMES = ("push_flex_message", "broadcast_flex_message")
+
+MAX_ALT_TEXT_CHARS = 400
+MAX_CAROUSEL_BUBBLES = 12
+MAX_BUBBLE_BYTES = 30 * 1024
+MAX_CAROUSEL_BYTES = 50 * 1024
+MAX_BUTTON_LABEL_CHARS = 40
+MAX_URI_CHARS = 1000
+MAX_TEXT_CHARS = 500
+URI_SCHEMES = ("https://", "http://", "line://", "tel:")
+
+
+class FlexMessageError(ValueError):
+    """A Flex Message that cannot be repaired."""
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _first_text(component: Any) -> str:
+    """First text in a Flex container, used as a fallback altText."""
+    if isinstance(component, dict):
+        if component.get("type") == "text" and component.get("text"):
+            return component["text"]
+        for key in ("header", "hero", "body", "footer", "contents"):
+            found = _first_text(component.get(key))
+            if found:
+                return found
+    elif isinstance(component, list):
+        for item in component:
+            found = _first_text(item)
+            if found:
+                return found
+    return ""
+
+
+# -- builder -----------------------------------------------------------
+
+
+def _text(text: str, **style) -> dict:
+    return {"type": "text", "text": _truncate(text, MAX_TEXT_CHARS), "wrap": True, **style}
+
+
+def _listing_bubble(listing: dict) -> dict:
+    body = [_text(listing.get("name") or "Airbnb", weight="bold", size="lg")]
+    if listing.get("rating"):
+        body.append(_text(f"⭐ {listing['rating']}", size="sm", color="#666666"))
+    if listing.get("location"):
+        body.append(_text(f"📍 {listing['location']}", size="sm", color="#666666"))
+    if listing.get("price"):
+        body.append(_text(str(listing["price"]), size="md", weight="bold", color="#FF385C"))
+
+    bubble: dict[str, Any] = {
+        "type": "bubble",
+        "body": {"type": "box", "layout": "vertical", "spacing": "sm", "contents": body},
+    }
+    image_url = listing.get("image_url") or ""
+    if image_url.startswith("https://") and len(image_url) <= MAX_URI_CHARS:
+        bubble["hero"] = {
+            "type": "image", "url": image_url, "size": "full", "aspectRatio": "20:13", "aspectMode": "cover",
+        }
+    url = listing.get("url") or ""
+    if url.startswith("https://") and len(url) <= MAX_URI_CHARS:
+        bubble["footer"] = {
+            "type": "box",
+            "layout": "vertical",
+            "contents": [{
+                "type": "button",
+                "style": "primary",
+                "color": "#FF385C",
+                "action": {"type": "uri", "label": "ดูที่พัก", "uri": url},
+            }],
+        }
+    return bubble
+
+
+def build_listing_carousel(listings: list[dict], alt_text: str) -> dict:
+    """Flex carousel message with one bubble per listing (at most 12).
+
+    Each listing may have ``name``, ``price``, ``rating``, ``location``, ``url``
+    and ``image_url``.
+    """
+    if not listings:
+        raise FlexMessageError("No listings to show")
+    bubbles = [_listing_bubble(listing) for listing in listings[:MAX_CAROUSEL_BUBBLES]]
+    message = {
+        "type": "flex",
+        "altText": alt_text or _first_text(bubbles),
+        "contents": {"type": "carousel", "contents": bubbles},
+    }
+    message, _ = repair_flex_message(message)
+    return message
+
+
+# -- validation and repair --------------------------------------------
+
+
+def _repair_component(component: Any, path: str, fixes: list[str]) -> Optional[dict]:
+    """Repaired copy of a component, or None to drop it."""
+    if not isinstance(component, dict) or "type" not in component:
+        fixes.append(f"{path}: dropped component without a type")
+        return None
+    component = dict(component)
+    kind = component["type"]
+
+    if kind == "text":
+        text = component.get("text")
+        if not isinstance(text, str) or not text.strip():
+            fixes.append(f"{path}: dropped empty text")
+            return None
+        if len(text) > MAX_TEXT_CHARS:
+            component["text"] = _truncate(text, MAX_TEXT_CHARS)
+            fixes.append(f"{path}: shortened text")
+        if not component.get("wrap"):
+            component["wrap"] = True
+            fixes.append(f"{path}: set wrap")
+    elif kind == "image":
+        url = component.get("url") or ""
+        if not url.startswith("https://") or len(url) > MAX_URI_CHARS:
+            fixes.append(f"{path}: dropped image without an https url")
+            return None
+    elif kind == "button":
+        action = component.get("action")
+        if not isinstance(action, dict):
+            fixes.append(f"{path}: dropped button without an action")
+            return None
+        action = component["action"] = dict(action)
+        if action.get("type") == "uri":
+            uri = action.get("uri") or ""
+            if not uri.startswith(URI_SCHEMES) or len(uri) > MAX_URI_CHARS:
+                fixes.append(f"{path}: dropped button with an invalid uri")
+                return None
+        label = action.get("label")
+        if not label:
+            action["label"] = "เปิด"
+            fixes.append(f"{path}: added button label")
+        elif len(label) > MAX_BUTTON_LABEL_CHARS:
+            action["label"] = _truncate(label, MAX_BUTTON_LABEL_CHARS)
+            fixes.append(f"{path}: shortened button label")
+    elif kind == "box":
+        if component.get("layout") not in ("vertical", "horizontal", "baseline"):
+            component["layout"] = "vertical"
+            fixes.append(f"{path}: set box layout")
+        contents = component.get("contents") or []
+        component["contents"] = [
+            repaired
+            for i, child in enumerate(contents)
+            if (repaired := _repair_component(child, f"{path}.contents[{i}]", fixes)) is not None
+        ]
+    return component
+
+
+def _repair_bubble(bubble: Any, path: str, fixes: list[str]) -> Optional[dict]:
+    if not isinstance(bubble, dict):
+        fixes.append(f"{path}: dropped bubble that is not an object")
+        return None
+    bubble = dict(bubble)
+    if bubble.get("type") != "bubble":
+        bubble["type"] = "bubble"
+        fixes.append(f"{path}: set type bubble")
+    for block in ("header", "hero", "body", "footer"):
+        if block in bubble:
+            repaired = _repair_component(bubble[block], f"{path}.{block}", fixes)
+            if repaired is None or (repaired.get("type") == "box" and not repaired["contents"]):
+                bubble.pop(block)
+            else:
+                bubble[block] = repaired
+    if not any(block in bubble for block in ("header", "hero", "body", "footer")):
+        fixes.append(f"{path}: dropped empty bubble")
+        return None
+    if _json_size(bubble) > MAX_BUBBLE_BYTES:
+        fixes.append(f"{path}: dropped bubble over {MAX_BUBBLE_BYTES // 1024}KB")
+        return None
+    return bubble
+
+
+def repair_flex_message(message: Any) -> tuple[dict, list[str]]:
+    """Return a spec-valid copy of ``message`` and the fixes applied.
+
+    Raises ``FlexMessageError`` when nothing sendable is left.
+    """
+    if not isinstance(message, dict):
+        raise FlexMessageError("Flex message must be a JSON object")
+    fixes: list[str] = []
+    message = dict(message)
+    if message.get("type") != "flex":
+        message["type"] = "flex"
+        fixes.append("set type flex")
+
+    contents = message.get("contents")
+    if isinstance(contents, str):
+        try:
+            contents = json.loads(contents)
+            fixes.append("parsed contents from a JSON string")
+        except ValueError:
+            raise FlexMessageError("contents is not valid JSON")
+    if not isinstance(contents, dict):
+        raise FlexMessageError("contents must be a bubble or carousel object")
+
+    if contents.get("type") == "carousel":
+        bubbles = contents.get("contents") or []
+        if len(bubbles) > MAX_CAROUSEL_BUBBLES:
+            fixes.append(f"cut carousel from {len(bubbles)} to {MAX_CAROUSEL_BUBBLES} bubbles")
+            bubbles = bubbles[:MAX_CAROUSEL_BUBBLES]
+        bubbles = [
+            repaired
+            for i, bubble in enumerate(bubbles)
+            if (repaired := _repair_bubble(bubble, f"contents[{i}]", fixes)) is not None
+        ]
+        while len(bubbles) > 1 and _json_size(bubbles) > MAX_CAROUSEL_BYTES:
+            bubbles.pop()
+            fixes.append(f"dropped last bubble to fit {MAX_CAROUSEL_BYTES // 1024}KB")
+        if not bubbles:
+            raise FlexMessageError("carousel has no valid bubbles")
+        contents = {**contents, "contents": bubbles}
+    else:
+        contents = _repair_bubble(contents, "contents", fixes)
+        if contents is None:
+            raise FlexMessageError("bubble has no valid content")
+    message["contents"] = contents
+
+    alt_text = message.get("altText")
+    if not isinstance(alt_text, str) or not alt_text.strip():
+        message["altText"] = _truncate(_first_text(contents) or "Flex Message", MAX_ALT_TEXT_CHARS)
+        fixes.append("added altText")
+    elif len(alt_text) > MAX_ALT_TEXT_CHARS:
+        message["altText"] = _truncate(alt_text, MAX_ALT_TEXT_CHARS)
+        fixes.append("shortened altText")
+    return message, fixes
+
+
+async def repair_flex_before_tool(tool, args: dict, tool_context) -> Optional[dict]:
+    """``before_tool_callback``: repair Flex Messages before the LINE Bot MCP tools send them."""
+    if tool.name not in FLEX_TOOL_NAMES or "message" not in args:
+        return None
+    try:
+        args["message"], fixes = repair_flex_message(args["message"])
+    except FlexMessageError as e:
+        logger.warning(f"⚠️ Blocked invalid Flex Message for {tool.name}: {e}")
+        return {"error": f"Invalid Flex Message, not sent: {e}"}
+    if fixes:
+        logger.info(f"🔧 Repaired Flex Message for {tool.name}: {'; '.join(fixes)}")
+    return None
+
+
+# -- tool --------------------------------------------------------------
+
+
+def listing_carousel_tool(line_toolset: BaseToolset) -> FunctionTool:
+    """Tool that pushes a listing carousel through ``line_toolset``'s ``push_flex_message``."""
+    push_tool = None
+
+    async def push_listing_carousel(listings: list[dict], alt_text: str, tool_context: ToolContext) -> dict:
+        """Send Airbnb listings to the user's LINE as a Flex carousel.
+
+        Args:
+            listings: Up to 12 listings. Each is an object with "name", "price",
+                "rating", "location", "url" (https listing link) and optionally
+                "image_url" (https photo).
+            alt_text: Short notification text shown in the chat list (max 400 chars).
+
+        Returns:
+            The number of bubbles sent, or an error.
+        """
+        nonlocal push_tool
+        try:
+            message = build_listing_carousel(listings, alt_text)
+        except FlexMessageError as e:
+            return {"error": str(e)}
+        if push_tool is None:
+            tools = {tool.name: tool for tool in await line_toolset.get_tools()}
+            if "push_flex_message" not in tools:
+                return {"error": "LINE toolset has no push_flex_message tool"}
+            push_tool = tools["push_flex_message"]
+        result = await push_tool.run_async(args={"message": message}, tool_context=tool_context)
+        if getattr(result, "isError", False):
+            return {"error": " ".join(getattr(item, "text", "") for item in result.content)}
+        return {"status": "sent", "bubbles": len(message["contents"]["contents"])}
+
+    return FunctionTool(push_listing_carousel)
@@ -0,0 +1,165 @@
+"""
+MCP Tool Result Cache Module
+
+Caches results of read-only MCP tools such as ``airbnb_search``.
+
+``CachingToolset`` wraps any toolset (``MCPToolset``, ``PooledMCPToolset``,
+a gateway toolset) and serves the tools listed in ``ttls`` through a shared
+``ToolResultCache``: results are keyed on the tool name plus the canonical
+JSON of its arguments, expire after the tool's TTL and are evicted
+least-recently-used beyond ``max_entries``. Identical calls that arrive while
+one is already in flight wait for it instead of making their own round trip.
+Error results are never cached.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+from adk_extensions.metrics import REGISTRY
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "mcp_cache_requests_total",
+    "MCP tool calls by cache outcome (hit, miss, coalesced).",
+    labelnames=("tool", "result"),
+)
+
+
+def cache_key(tool_name: str, args: dict) -> str:
+    return tool_name + ":" + json.dumps(args, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _is_error(result: Any) -> bool:
+    if isinstance(result, dict):
+        return bool(result.get("isError") or result.get("error"))
+    return bool(getattr(result, "isError", False))
+
+
+class ToolResultCache:
+    """TTL + LRU cache of tool results with single-flight for identical calls."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        # key -> (expires_at, result)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_call(self, tool_name: str, args: dict, ttl: float, call: Callable[[], Awaitable[Any]]) -> Any:
+        key = cache_key(tool_name, args)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(tool=tool_name, result="hit")
+                return entry[1]
+            del self._entries[key]
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            CACHE_REQUESTS.inc(tool=tool_name, result="coalesced")
+            try:
+                # Shielded: a cancelled waiter must not cancel the shared call
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The caller that owned the shared call went away; make our own
+                return await self.get_or_call(tool_name, args, ttl, call)
+
+        self.misses += 1
+        CACHE_REQUESTS.inc(tool=tool_name, result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody waited for is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        future.set_result(result)
+        if not _is_error(result):
+            self._entries[key] = (time.monotonic() + ttl, result)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / total, 3) if total else 0.0,
+        }
+
+
+class CachedTool(BaseTool):
+    """Read-only tool whose results are served from a ``ToolResultCache``."""
+
+    def __init__(self, tool: BaseTool, cache: ToolResultCache, ttl: float):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self._tool = tool
+        self._cache = cache
+        self._ttl = ttl
+
+    def _get_declaration(self):
+        return self._tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context) -> Any:
+        return await self._cache.get_or_call(
+            self.name,
+            args,
+            self._ttl,
+            lambda: self._tool.run_async(args=args, tool_context=tool_context),
+        )
+
+
+class CachingToolset(BaseToolset):
+    """Wraps a toolset; the tools named in ``ttls`` (seconds) are cached."""
+
+    def __init__(self, toolset: BaseToolset, ttls: dict[str, float], cache: Optional[ToolResultCache] = None):
+        super().__init__(tool_filter=toolset.tool_filter)
+        self.toolset = toolset
+        self.ttls = {name: ttl for name, ttl in ttls.items() if ttl > 0}
+        self.cache = cache or ToolResultCache(max_entries=int(os.getenv("MCP_CACHE_MAX_ENTRIES", "512")))
+
+    async def get_tools(self, readonly_context=None) -> list[BaseTool]:
+        tools = await self.toolset.get_tools(readonly_context)
+        return [
+            CachedTool(tool, self.cache, self.ttls[tool.name]) if tool.name in self.ttls else tool
+            for tool in tools
+        ]
+
+    async def close(self) -> None:
+        await self.toolset.close()
+
+
+def airbnb_cache_ttls() -> dict[str, float]:
+    """TTLs for the read-only airbnb tools; a TTL of 0 turns caching off for that tool."""
+    return {
+        "airbnb_search": float(os.getenv("AIRBNB_SEARCH_CACHE_TTL_SECONDS", "300")),
+        "airbnb_listing_details": float(os.getenv("AIRBNB_DETAILS_CACHE_TTL_SECONDS", "900")),
+    }
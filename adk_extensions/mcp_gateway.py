@@ -0,0 +1,216 @@
+"""
+MCP Gateway Module
+
+One local process that hosts each MCP server once and shares it with every
+agent over SSE, instead of every agent module spawning its own ``npx`` copy.
+
+Each hosted server is an ``MCPServerPool`` of warm stdio processes. Agents
+connect to ``http://<gateway>/<name>/sse``; every SSE connection gets its own
+MCP server session whose ``tools/list`` and ``tools/call`` requests are
+forwarded to the pool. The pool's ``ClientSession`` assigns its own JSON-RPC
+ids and routes each response back to the waiting caller, so many agent
+sessions share one backend without seeing each other's traffic. Each
+connection may have at most ``max_concurrency_per_client`` tool calls in
+flight; further calls wait.
+
+Run the gateway:
+    python -m adk_extensions.mcp_gateway --port 8090 --servers airbnb,line_bot
+
+and set ``MCP_GATEWAY_URL=http://localhost:8090`` for the agents.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+
+from google.adk.tools.mcp_tool.mcp_session_manager import SseConnectionParams, StdioConnectionParams
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
+from mcp import StdioServerParameters, types
+from mcp.server.lowlevel import Server
+from mcp.server.sse import SseServerTransport
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+from adk_extensions.mcp_pool import MCPServerPool, PooledMCPToolset
+from adk_extensions.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_CALL_SECONDS = REGISTRY.histogram(
+    "mcp_gateway_call_seconds",
+    "Tool calls forwarded by the MCP gateway, including time waiting for the client's concurrency cap.",
+    labelnames=("server", "tool"),
+)
+
+
+def _npx(package: str, *args: str, env: dict | None = None) -> StdioConnectionParams:
+    return StdioConnectionParams(
+        server_params=StdioServerParameters(command="npx", args=["-y", package, *args], env=env),
+    )
+
+
+def server_specs() -> dict[str, StdioConnectionParams]:
+    """The MCP servers the gateway can host, keyed by name."""
+    return {
+        "airbnb": _npx("@openbnb/mcp-server-airbnb", "--ignore-robots-txt"),
+        "line_bot": _npx(
+            "@line/line-bot-mcp-server",
+            env={
+                "CHANNEL_ACCESS_TOKEN": os.getenv("CHANNEL_ACCESS_TOKEN", ""),
+                "DESTINATION_USER_ID": os.getenv("DESTINATION_USER_ID", ""),
+            },
+        ),
+        "pinecone": _npx("@pinecone-database/mcp", env={"PINECONE_API_KEY": os.getenv("PINECONE_API_KEY", "")}),
+    }
+
+
+class HostedServer:
+    """One MCP server exposed over SSE at ``/<name>/sse``."""
+
+    def __init__(self, name: str, connection_params, pool_size: int = 2, max_concurrency_per_client: int = 4):
+        self.name = name
+        self.pool = MCPServerPool(connection_params, size=pool_size, name=name)
+        self.max_concurrency_per_client = max_concurrency_per_client
+        self.clients = 0
+        self.transport = SseServerTransport(f"/{name}/messages/")
+        self._tools: list[types.Tool] | None = None
+
+    async def list_tools(self) -> list[types.Tool]:
+        # Tool definitions do not change while the backend runs
+        if self._tools is None:
+            session = await self.pool.create_session()
+            self._tools = (await session.list_tools()).tools
+        return self._tools
+
+    def _client_server(self) -> Server:
+        """MCP server for one agent connection, with its own concurrency cap."""
+        server = Server(f"gateway-{self.name}")
+        slots = asyncio.Semaphore(self.max_concurrency_per_client)
+
+        @server.list_tools()
+        async def list_tools() -> list[types.Tool]:
+            return await self.list_tools()
+
+        # The backend validates arguments; skip a second schema check here
+        @server.call_tool(validate_input=False)
+        async def call_tool(name: str, arguments: dict) -> types.CallToolResult:
+            with GATEWAY_CALL_SECONDS.time(server=self.name, tool=name):
+                async with slots:
+                    session = await self.pool.create_session()
+                    return await session.call_tool(name, arguments=arguments)
+
+        return server
+
+    async def handle_sse(self, request: Request) -> Response:
+        server = self._client_server()
+        self.clients += 1
+        try:
+            async with self.transport.connect_sse(request.scope, request.receive, request._send) as streams:
+                await server.run(streams[0], streams[1], server.create_initialization_options())
+        finally:
+            self.clients -= 1
+        return Response()
+
+    def routes(self) -> list:
+        return [
+            Route(f"/{self.name}/sse", endpoint=self.handle_sse, methods=["GET"]),
+            Mount(f"/{self.name}/messages/", app=self.transport.handle_post_message),
+        ]
+
+
+def create_gateway_app(
+    servers: list[str],
+    pool_size: int = 2,
+    max_concurrency_per_client: int = 4,
+) -> Starlette:
+    """Starlette app hosting the named servers from ``server_specs()``."""
+    specs = server_specs()
+    unknown = set(servers) - set(specs)
+    if unknown:
+        raise ValueError(f"Unknown MCP servers: {', '.join(sorted(unknown))}")
+    hosted = [HostedServer(name, specs[name], pool_size, max_concurrency_per_client) for name in servers]
+    REGISTRY.gauge(
+        "mcp_gateway_clients",
+        "Agent sessions connected to the MCP gateway.",
+        labelnames=("server",),
+        fn=lambda: {(h.name,): h.clients for h in hosted},
+    )
+
+    async def warm_up():
+        await asyncio.gather(*(h.pool.warm_up() for h in hosted))
+
+    async def shutdown():
+        await asyncio.gather(*(h.pool.close() for h in hosted), return_exceptions=True)
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({
+            h.name: {"healthy_servers": h.pool.healthy_count, "pool_size": h.pool.size, "clients": h.clients}
+            for h in hosted
+        })
+
+    async def metrics(request: Request) -> Response:
+        return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    routes = [Route("/health", health), Route("/metrics", metrics)]
+    for h in hosted:
+        routes.extend(h.routes())
+    return Starlette(routes=routes, on_startup=[warm_up], on_shutdown=[shutdown])
+
+
+def create_mcp_toolset(name: str, connection_params, pool_size: int | None = None, **kwargs) -> MCPToolset:
+    """Toolset for MCP server ``name``: through the gateway when ``MCP_GATEWAY_URL`` is set.
+
+    Without a gateway the agent runs its own warm pool of ``connection_params``
+    processes (``MCP_POOL_SIZE``). With one, the gateway starts the server from
+    ``server_specs()``, so ``connection_params`` that differ from it are ignored
+    with a warning.
+    """
+    gateway_url = os.getenv("MCP_GATEWAY_URL")
+    if gateway_url:
+        specs = server_specs()
+        if name not in specs:
+            raise ValueError(f"The MCP gateway cannot host {name!r}; choose from {', '.join(specs)}")
+        if connection_params is not None and connection_params != specs[name]:
+            logger.warning(
+                f"⚠️ MCP_GATEWAY_URL is set: {name} uses the gateway's server settings, "
+                "the connection_params passed here (command, args, env) are ignored"
+            )
+        return MCPToolset(
+            connection_params=SseConnectionParams(url=f"{gateway_url.rstrip('/')}/{name}/sse"),
+            **kwargs,
+        )
+    return PooledMCPToolset(
+        name=name,
+        size=pool_size or int(os.getenv("MCP_POOL_SIZE", "2")),
+        connection_params=connection_params,
+        **kwargs,
+    )
+
+
+def main():
+    from dotenv import load_dotenv
+    import uvicorn
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Shared MCP gateway over SSE")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--servers", default=os.getenv("MCP_GATEWAY_SERVERS", "airbnb"),
+                        help="comma-separated: airbnb, line_bot, pinecone")
+    parser.add_argument("--pool-size", type=int, default=int(os.getenv("MCP_POOL_SIZE", "2")))
+    parser.add_argument("--max-concurrency-per-client", type=int,
+                        default=int(os.getenv("MCP_GATEWAY_MAX_CONCURRENCY_PER_CLIENT", "4")))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    servers = [name.strip() for name in args.servers.split(",") if name.strip()]
+    app = create_gateway_app(servers, args.pool_size, args.max_concurrency_per_client)
+    logger.info(f"🌐 MCP gateway hosting {', '.join(servers)} on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+MCP Server Pool Module
+
+Keeps N warm MCP server processes per toolset instead of cold-starting
+``npx`` on first use.
+
+``PooledMCPToolset`` is a drop-in ``MCPToolset`` whose session manager is an
+``MCPServerPool``: every ``create_session`` call (tool listing and every tool
+call) gets the next healthy server round-robin. Each server lives in its own
+task, so it is started and shut down by the same task as anyio requires. A
+server whose connection closes during a call is taken out of rotation at once
+(ADK retries such calls once on another session), and a background loop pings
+every server and restarts the ones that crashed or stop answering. A caller
+waits at most ``wait_timeout`` seconds for a ready server and then gets a
+``ConnectionError``, so a server that can never start fails the call instead
+of hanging it. Spawn time, queue wait (time a caller waited for a ready
+server) and restarts are exported through ``adk_extensions.metrics``.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from typing import TextIO
+
+import anyio
+from google.adk.tools.mcp_tool.mcp_session_manager import MCPSessionManager
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+from adk_extensions.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SPAWN_SECONDS = REGISTRY.histogram(
+    "mcp_pool_spawn_seconds",
+    "Time to start and initialize one pooled MCP server.",
+    labelnames=("toolset",),
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "mcp_pool_queue_wait_seconds",
+    "Time a caller waited for a ready pooled MCP server.",
+    labelnames=("toolset",),
+)
+RESTARTS = REGISTRY.counter(
+    "mcp_pool_restarts_total",
+    "Pooled MCP servers restarted after a crash or failed health check.",
+    labelnames=("toolset",),
+)
+
+
+def _is_connection_closed(error: BaseException) -> bool:
+    if isinstance(error, (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)):
+        return True
+    return isinstance(error, McpError) and error.error.code == CONNECTION_CLOSED
+
+
+class _GuardedSession:
+    """Forwards to a pooled ``ClientSession``; a closed connection marks the server as closed."""
+
+    def __init__(self, server: "_PooledServer", session: ClientSession):
+        self._server = server
+        self._session = session
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._session, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            try:
+                return await attr(*args, **kwargs)
+            except Exception as e:
+                if _is_connection_closed(e):
+                    self._server.closed = True
+                raise
+
+        return call
+
+
+class _PooledServer:
+    """One MCP server process, owned by its own task."""
+
+    def __init__(self, pool: "MCPServerPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.session: _GuardedSession | None = None
+        # Set when a call or ping finds the connection closed
+        self.closed = False
+        self.error: Exception | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = asyncio.Event()
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and not self.closed
+
+    async def start(self) -> None:
+        self._stop = asyncio.Event()
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        await ready
+
+    async def _run(self, ready: asyncio.Future) -> None:
+        manager = MCPSessionManager(connection_params=self.pool.connection_params, errlog=self.pool.errlog)
+        start = time.perf_counter()
+        try:
+            self.closed = False
+            self.session = _GuardedSession(self, await manager.create_session())
+            self.error = None
+            SPAWN_SECONDS.observe(time.perf_counter() - start, toolset=self.pool.name)
+            logger.info(
+                f"🟢 MCP server {self.pool.name}#{self.index} ready in {time.perf_counter() - start:.2f}s"
+            )
+            ready.set_result(None)
+            self.pool._notify_ready()
+            await self._stop.wait()
+        except Exception as e:
+            self.error = e
+            logger.error(f"❌ MCP server {self.pool.name}#{self.index} failed to start: {e}")
+            if not ready.done():
+                ready.set_result(None)
+        finally:
+            self.session = None
+            await manager.close()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPServerPool:
+    """Round-robin pool of warm MCP server sessions; duck-types ``MCPSessionManager``."""
+
+    def __init__(
+        self,
+        connection_params,
+        size: int = 2,
+        name: str = "mcp",
+        errlog: TextIO = sys.stderr,
+        health_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        wait_timeout: float = 60.0,
+    ):
+        self.connection_params = connection_params
+        self.size = size
+        self.name = name
+        self.errlog = errlog
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.wait_timeout = wait_timeout
+        self._servers = [_PooledServer(self, i) for i in range(size)]
+        self._next = 0
+        self._started = False
+        self._ready = asyncio.Event()
+        self._spawning: list[asyncio.Task] = []
+        self._health_task: asyncio.Task | None = None
+        self._restarting: set[int] = set()
+        _pools.append(self)
+
+    @property
+    def healthy_count(self) -> int:
+        return sum(server.healthy for server in self._servers)
+
+    def _notify_ready(self) -> None:
+        self._ready.set()
+
+    def start(self) -> None:
+        """Spawn every server in the background (idempotent)."""
+        if self._started:
+            return
+        self._started = True
+        self._spawning = [asyncio.create_task(server.start()) for server in self._servers]
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def warm_up(self) -> None:
+        """Start every server and wait until each one is ready (or failed to start)."""
+        self.start()
+        await asyncio.gather(*self._spawning)
+        logger.info(f"🔥 MCP pool {self.name}: {self.healthy_count}/{self.size} servers warm")
+
+    def _restart(self, server: _PooledServer) -> None:
+        if server.index in self._restarting:
+            return
+        self._restarting.add(server.index)
+        RESTARTS.inc(toolset=self.name)
+        logger.warning(f"⚠️ Restarting MCP server {self.name}#{server.index}")
+
+        async def restart():
+            try:
+                await server.stop()
+                await server.start()
+            finally:
+                self._restarting.discard(server.index)
+
+        asyncio.create_task(restart())
+
+    async def _check(self, server: _PooledServer) -> None:
+        if server.index in self._restarting or server._task is None:
+            return
+        try:
+            if not server.healthy:
+                raise ConnectionError("session closed")
+            await asyncio.wait_for(server.session.send_ping(), self.ping_timeout)
+        except Exception as e:
+            server.closed = True
+            logger.warning(f"⚠️ MCP server {self.name}#{server.index} failed health check: {e}")
+            self._restart(server)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(*(self._check(server) for server in self._servers))
+
+    async def create_session(self, headers=None) -> _GuardedSession:
+        """Next healthy server session, round-robin; waits up to ``wait_timeout`` while none is ready."""
+        self.start()
+        start = time.perf_counter()
+        deadline = start + self.wait_timeout
+        while True:
+            self._ready.clear()
+            for _ in range(self.size):
+                server = self._servers[self._next]
+                self._next = (self._next + 1) % self.size
+                if server.healthy:
+                    QUEUE_WAIT_SECONDS.observe(time.perf_counter() - start, toolset=self.name)
+                    return server.session
+                # Crashed (closed session) or failed to start; a server still starting is left alone
+                crashed = server.session is not None or (server._task is not None and server._task.done())
+                if crashed and server.index not in self._restarting:
+                    self._restart(server)
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                errors = [str(server.error) for server in self._servers if server.error]
+                raise ConnectionError(
+                    f"No MCP server in pool {self.name} became ready within {self.wait_timeout:g}s"
+                    + (f": {errors[-1]}" if errors else "")
+                )
+            try:
+                await asyncio.wait_for(self._ready.wait(), min(self.ping_timeout, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(*(server.stop() for server in self._servers), return_exceptions=True)
+        self._started = False
+
+
+_pools: list[MCPServerPool] = []
+
+REGISTRY.gauge(
+    "mcp_pool_healthy_servers",
+    "Pooled MCP servers currently able to take calls.",
+    labelnames=("toolset",),
+    fn=lambda: {(pool.name,): pool.healthy_count for pool in _pools},
+)
+
+
+class PooledMCPToolset(MCPToolset):
+    """``MCPToolset`` backed by a pool of ``size`` warm server processes."""
+
+    def __init__(self, *, connection_params, size: int = 2, name: str = "mcp", wait_timeout: float = 60.0,
+                 **kwargs):
+        super().__init__(connection_params=connection_params, **kwargs)
+        self._mcp_session_manager = MCPServerPool(
+            connection_params=self._mcp_session_manager._connection_params,
+            size=size,
+            name=name,
+            errlog=self._errlog,
+            wait_timeout=wait_timeout,
+        )
+
+    async def warm_up(self) -> None:
+        """Pre-spawn the pool; call from the app's startup hook."""
+        await self._mcp_session_manager.warm_up()
@@ -0,0 +1,197 @@
+"""
+MCP Result Projection Module
+
+Shrinks large JSON tool results before they go into the model context.
+
+The Airbnb MCP server answers ``airbnb_search`` and ``airbnb_listing_details``
+with pretty-printed JSON full of URLs, badges and nested display fields. Every
+byte of it is sent back to the model on every later turn of the conversation.
+``ProjectingToolset`` wraps a toolset and rewrites the JSON text content of
+the tools listed in its ``projections``:
+
+- only the allowlisted fields are kept (dotted paths; lists are walked through),
+- lists are cut to the first ``top_k`` items,
+- strings are capped at ``max_chars`` characters,
+- the result is re-serialized without indentation.
+
+The walk only visits what it keeps: dropped fields and list items past
+``top_k`` are never copied. Each call logs and counts the bytes and estimated
+tokens (~4 bytes per token) it saved.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from mcp import types as mcp_types
+
+from adk_extensions.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_TOKEN = 4
+
+BYTES_SAVED = REGISTRY.counter(
+    "mcp_projection_bytes_saved_total",
+    "Bytes removed from MCP tool results before they reach the model.",
+    labelnames=("tool",),
+)
+TOKENS_SAVED = REGISTRY.counter(
+    "mcp_projection_tokens_saved_total",
+    "Estimated prompt tokens removed from MCP tool results (bytes / 4).",
+    labelnames=("tool",),
+)
+
+
+@dataclass
+class Projection:
+    """Which parts of a tool's JSON result to keep.
+
+    ``fields`` are dotted paths such as ``searchResults.structuredContent.primaryLine``;
+    a path that ends at an object or list keeps all of it. An empty ``fields``
+    keeps every field and only applies the list and string caps.
+    """
+
+    fields: tuple[str, ...] = ()
+    top_k: int = 5
+    max_chars: int = 300
+    _tree: dict = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._tree = {}
+        for path in self.fields:
+            node = self._tree
+            for key in path.split("."):
+                node = node.setdefault(key, {})
+
+    def apply(self, value: Any) -> Any:
+        return self._walk(value, self._tree or None)
+
+    def _walk(self, value: Any, tree: dict | None) -> Any:
+        if isinstance(value, dict):
+            if not tree:
+                return {k: self._walk(v, None) for k, v in value.items()}
+            return {k: self._walk(value[k], subtree or None) for k, subtree in tree.items() if k in value}
+        if isinstance(value, list):
+            return [self._walk(item, tree) for item in value[:self.top_k]]
+        if isinstance(value, str) and len(value) > self.max_chars:
+            return value[:self.max_chars] + "…"
+        return value
+
+
+def project_result(tool_name: str, result: Any, projection: Projection) -> Any:
+    """Project the JSON text content of an MCP ``CallToolResult``; anything else is returned as is."""
+    if not isinstance(result, mcp_types.CallToolResult) or result.isError:
+        return result
+
+    before = after = 0
+    content = []
+    for item in result.content:
+        if isinstance(item, mcp_types.TextContent):
+            try:
+                data = json.loads(item.text)
+            except ValueError:
+                content.append(item)
+                continue
+            text = json.dumps(projection.apply(data), ensure_ascii=False, separators=(",", ":"))
+            before += len(item.text.encode())
+            after += len(text.encode())
+            item = item.model_copy(update={"text": text})
+        content.append(item)
+
+    update: dict[str, Any] = {"content": content}
+    if isinstance(result.structuredContent, dict):
+        update["structuredContent"] = projection.apply(result.structuredContent)
+
+    saved = before - after
+    if saved > 0:
+        BYTES_SAVED.inc(saved, tool=tool_name)
+        TOKENS_SAVED.inc(saved // BYTES_PER_TOKEN, tool=tool_name)
+        logger.info(
+            f"✂️ {tool_name}: {before / 1024:.1f}KB -> {after / 1024:.1f}KB "
+            f"(~{saved // BYTES_PER_TOKEN} tokens saved)"
+        )
+    return result.model_copy(update=update)
+
+
+class ProjectedTool(BaseTool):
+    """Tool whose JSON results are cut down by a ``Projection``."""
+
+    def __init__(self, tool: BaseTool, projection: Projection):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self._tool = tool
+        self._projection = projection
+
+    def _get_declaration(self):
+        return self._tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context) -> Any:
+        result = await self._tool.run_async(args=args, tool_context=tool_context)
+        return project_result(self.name, result, self._projection)
+
+
+class ProjectingToolset(BaseToolset):
+    """Wraps a toolset; results of the tools named in ``projections`` are projected."""
+
+    def __init__(self, toolset: BaseToolset, projections: dict[str, Projection]):
+        super().__init__(tool_filter=toolset.tool_filter)
+        self.toolset = toolset
+        self.projections = projections
+
+    async def get_tools(self, readonly_context=None) -> list[BaseTool]:
+        tools = await self.toolset.get_tools(readonly_context)
+        return [
+            ProjectedTool(tool, self.projections[tool.name]) if tool.name in self.projections else tool
+            for tool in tools
+        ]
+
+    async def close(self) -> None:
+        await self.toolset.close()
+
+
+def airbnb_projections() -> dict[str, Projection]:
+    """Fields of the Airbnb results the travel agents actually use."""
+    top_k = int(os.getenv("AIRBNB_RESULT_TOP_K", "5"))
+    max_chars = int(os.getenv("MCP_RESULT_MAX_STRING_CHARS", "300"))
+    return {
+        "airbnb_search": Projection(
+            fields=(
+                "searchUrl",
+                "searchResults.id",
+                "searchResults.url",
+                "searchResults.demandStayListing.description",
+                "searchResults.demandStayListing.location",
+                "searchResults.structuredContent.primaryLine",
+                "searchResults.structuredContent.secondaryLine",
+                "searchResults.avgRatingA11yLabel",
+                "searchResults.structuredDisplayPrice.primaryLine.accessibilityLabel",
+                "searchResults.structuredDisplayPrice.secondaryLine.accessibilityLabel",
+                "paginationInfo.nextPageCursor",
+            ),
+            top_k=top_k,
+            max_chars=max_chars,
+        ),
+        "airbnb_listing_details": Projection(
+            fields=(
+                "listingUrl",
+                "details.id",
+                "details.title",
+                "details.subtitle",
+                "details.lat",
+                "details.lng",
+                "details.highlights.title",
+                "details.htmlDescription.htmlText",
+                "details.houseRulesSections.title",
+                "details.houseRulesSections.items.title",
+                "details.seeAllAmenitiesGroups.title",
+                "details.seeAllAmenitiesGroups.amenities.title",
+            ),
+            # Listing details are a handful of sections; keep them all, trim the amenity lists
+            top_k=max(top_k, 12),
+            max_chars=max_chars * 2,
+        ),
+    }
@@ -0,0 +1,70 @@
+"""
+Tool Concurrency Module
+
+Caps how many calls to one toolset run at the same time.
+
+When a model response holds several function calls (three
+``airbnb_listing_details`` lookups, or an Airbnb search plus a LINE push),
+ADK starts them all at once and merges the responses in the order the model
+asked for them. ``ConcurrencyLimitedToolset`` keeps that fan-out from
+flooding one MCP server: at most ``max_concurrency`` calls to the wrapped
+toolset are in flight, the rest wait for a free slot. The wait is exported as
+``tool_call_slot_wait_seconds``.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any
+
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+from adk_extensions.metrics import REGISTRY
+
+SLOT_WAIT_SECONDS = REGISTRY.histogram(
+    "tool_call_slot_wait_seconds",
+    "Time a tool call waited for a free slot in its toolset's concurrency limit.",
+    labelnames=("toolset",),
+)
+
+
+class LimitedTool(BaseTool):
+    """Tool whose calls take a slot from its toolset's semaphore."""
+
+    def __init__(self, tool: BaseTool, slots: asyncio.Semaphore, toolset_name: str):
+        super().__init__(name=tool.name, description=tool.description, is_long_running=tool.is_long_running)
+        self._tool = tool
+        self._slots = slots
+        self._toolset_name = toolset_name
+
+    def _get_declaration(self):
+        return self._tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context) -> Any:
+        start = time.perf_counter()
+        async with self._slots:
+            SLOT_WAIT_SECONDS.observe(time.perf_counter() - start, toolset=self._toolset_name)
+            return await self._tool.run_async(args=args, tool_context=tool_context)
+
+
+class ConcurrencyLimitedToolset(BaseToolset):
+    """Wraps a toolset so at most ``max_concurrency`` of its tool calls run at once.
+
+    ``max_concurrency`` defaults to ``MCP_MAX_PARALLEL_CALLS``; 1 runs the
+    calls one after another.
+    """
+
+    def __init__(self, toolset: BaseToolset, name: str, max_concurrency: int | None = None):
+        super().__init__(tool_filter=toolset.tool_filter)
+        self.toolset = toolset
+        self.name = name
+        self.max_concurrency = max_concurrency or int(os.getenv("MCP_MAX_PARALLEL_CALLS", "4"))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def get_tools(self, readonly_context=None) -> list[BaseTool]:
+        tools = await self.toolset.get_tools(readonly_context)
+        return [LimitedTool(tool, self._slots, self.name) for tool in tools]
+
+    async def close(self) -> None:
+        await self.toolset.close()
@@ -0,0 +1,16 @@
+"""
+The examples run from their own folders and import their modules by plain
+name (``from admission import ...``), so the tests put those folders on the
+path the same way.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Both examples have an agent.py; 4_a2a comes first so fastapi_app gets its own
+for folder in ("", "5_pinecone_rag_with_mcp_tools", "4_a2a"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,21 @@
+"""Stdio MCP server for the pool tests: ``echo`` answers, ``crash`` kills the process."""
+
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("echo", log_level="WARNING")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    return text
+
+
+@mcp.tool()
+def crash() -> str:
+    os._exit(1)
+
+
+if __name__ == "__main__":
+    mcp.run("stdio")
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from adk_extensions.a2a_balancer import LoadBalancingTransport
+
+A, B = "http://replica-a:8001", "http://replica-b:8001"
+
+
+def send(context_id: str | None = None) -> dict:
+    message = {"role": "user", "parts": [{"kind": "text", "text": "hi"}], "messageId": "m"}
+    if context_id:
+        message["contextId"] = context_id
+    return {"jsonrpc": "2.0", "id": 1, "method": "message/send", "params": {"message": message}}
+
+
+class Body(httpx.AsyncByteStream):
+    """Streamed body like a real transport's (a ``json=`` response is already read and closed)."""
+
+    def __init__(self, payload: dict):
+        self.payload = json.dumps(payload).encode()
+
+    async def __aiter__(self):
+        yield self.payload
+
+
+class Replicas:
+    """Mock replicas; records (host, contextId) per POST and fails hosts listed in ``failing``."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, str]] = []
+        self.failing: set[str] = set()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            return httpx.Response(200, json={"name": "travel_agent"})
+        context_id = json.loads(request.content)["params"]["message"]["contextId"]
+        self.calls.append((request.url.host, context_id))
+        return httpx.Response(503 if request.url.host in self.failing else 200, stream=Body({"result": {}}))
+
+
+def run(scenario, **kwargs):
+    replicas = Replicas()
+    transport = LoadBalancingTransport(httpx.MockTransport(replicas), [A, B], health_interval=60, **kwargs)
+
+    async def main():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await scenario(client, transport, replicas)
+
+    return asyncio.run(main()), replicas
+
+
+def test_conversations_stick_to_their_replica_and_spread_by_load():
+    async def scenario(client, transport, replicas):
+        async with client.stream("POST", A, json=send()):
+            # the first conversation is still streaming, so the second goes to the idle replica
+            await client.post(A, json=send())
+        first, second = (context for _, context in replicas.calls)
+        for _ in range(3):
+            await client.post(B, json=send(first))
+        return transport.stats(), first, second
+
+    (stats, first, second), replicas = run(scenario)
+    assert replicas.calls[:2] == [("replica-a", first), ("replica-b", second)]
+    assert replicas.calls[2:] == [("replica-a", first)] * 3
+    assert [s["outstanding"] for s in stats] == [0, 0]
+
+
+def test_failing_replica_is_ejected_and_its_conversations_move():
+    async def scenario(client, transport, replicas):
+        await client.post(A, json=send("ctx-1"))
+        replicas.failing.add("replica-a")
+        statuses = [(await client.post(A, json=send("ctx-1"))).status_code for _ in range(3)]
+        moved = await client.post(A, json=send("ctx-1"))
+        return statuses, moved.status_code, transport.stats()
+
+    (statuses, moved, stats), replicas = run(scenario, failure_threshold=2)
+    assert statuses == [503, 503, 200]
+    assert moved == 200
+    assert [host for host, _ in replicas.calls] == ["replica-a", "replica-a", "replica-a", "replica-b", "replica-b"]
+    assert stats[0]["available"] is False and stats[0]["ejections"] == 1
+
+
+def test_other_hosts_and_methods_pass_through():
+    async def scenario(client, transport, replicas):
+        response = await client.post("http://elsewhere/", json=send("ctx-9"))
+        return response.status_code
+
+    status, replicas = run(scenario)
+    assert status == 200
+    assert replicas.calls == [("elsewhere", "ctx-9")]
+
+
+def test_needs_an_endpoint():
+    with pytest.raises(ValueError):
+        LoadBalancingTransport(httpx.MockTransport(Replicas()), [])
@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+
+from adk_extensions.a2a_transport import AgentCardCachingTransport
+from adk_extensions.agent_card import AGENT_CARD_PATHS
+
+CARD_URL = "http://agent" + AGENT_CARD_PATHS[0]
+
+
+def make_client(handler, card_ttl: float):
+    transport = AgentCardCachingTransport(httpx.MockTransport(handler), card_ttl=card_ttl)
+    return transport, httpx.AsyncClient(transport=transport)
+
+
+def test_card_is_cached_then_revalidated_with_etag():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"name": "travel_agent"}, headers={"ETag": '"v1"'})
+
+    async def scenario(card_ttl):
+        transport, client = make_client(handler, card_ttl)
+        async with client:
+            bodies = [(await client.get(CARD_URL)).json() for _ in range(3)]
+        return transport, bodies
+
+    fresh, bodies = asyncio.run(scenario(card_ttl=60))
+    assert bodies == [{"name": "travel_agent"}] * 3
+    assert (fresh.misses, fresh.hits, seen) == (1, 2, [None])
+
+    seen.clear()
+    stale, bodies = asyncio.run(scenario(card_ttl=0))
+    assert bodies == [{"name": "travel_agent"}] * 3
+    assert (stale.misses, stale.revalidated, seen) == (1, 2, [None, '"v1"', '"v1"'])
+
+
+def test_other_requests_pass_through():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        transport, client = make_client(handler, card_ttl=60)
+        async with client:
+            await client.post("http://agent/", json={"method": "message/send"})
+            await client.post("http://agent/", json={"method": "message/send"})
+        return transport
+
+    transport = asyncio.run(scenario())
+    assert calls == ["/", "/"]
+    assert transport.misses == transport.hits == 0
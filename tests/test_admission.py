@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+async def drain(generator) -> list[int]:
+    return [position async for position in generator]
+
+
+async def queue_up(controller: AdmissionController, user_id: str) -> asyncio.Task:
+    task = asyncio.create_task(drain(controller.acquire(user_id)))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_free_slot_is_granted_without_queueing():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=2, max_per_user=2)
+        assert await drain(controller.acquire("a")) == []
+        assert controller.in_flight == 1
+        assert controller.queued_total == 0
+
+    asyncio.run(scenario())
+
+
+def test_user_at_limit_does_not_block_other_users():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=16, max_per_user=1, queue_timeout=1)
+        await drain(controller.acquire("a"))
+        blocked = await queue_up(controller, "a")
+        assert controller.queue_depth == 1
+
+        # B must get one of the 15 free slots instead of waiting behind A2
+        await asyncio.wait_for(drain(controller.acquire("b")), timeout=0.5)
+        assert controller.in_flight == 2
+        assert controller.queue_depth == 1
+
+        controller.release("a")
+        assert await asyncio.wait_for(blocked, timeout=0.5) == [1]
+        assert controller.in_flight == 2
+
+    asyncio.run(scenario())
+
+
+def test_queue_is_fifo_when_full():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_per_user=1)
+        await drain(controller.acquire("a"))
+        first = await queue_up(controller, "b")
+        second = await queue_up(controller, "c")
+
+        controller.release("a")
+        assert await asyncio.wait_for(first, timeout=0.5) == [1]
+        assert not second.done()
+        controller.release("b")
+        assert await asyncio.wait_for(second, timeout=0.5) == [2, 1]
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_queue_full_and_after_timeout():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_per_user=1, max_queue=1, queue_timeout=0.05)
+        await drain(controller.acquire("a"))
+        waiting = await queue_up(controller, "b")
+        with pytest.raises(AdmissionRejected):
+            await drain(controller.acquire("c"))
+        with pytest.raises(AdmissionRejected):
+            await waiting
+        assert controller.rejected_total == {"queue_full": 1, "timeout": 1}
+        assert controller.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_gives_back_its_slot():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_per_user=1)
+        await drain(controller.acquire("a"))
+        waiting = await queue_up(controller, "b")
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert controller.queue_depth == 0
+
+        controller.release("a")
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
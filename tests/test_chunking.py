@@ -0,0 +1,59 @@
+import pytest
+
+from chunking import estimate_tokens, get_chunker
+
+THAI = "การฟังอย่างตั้งใจ ช่วยให้นักขาย เข้าใจความต้องการ ที่แท้จริงของลูกค้า "
+TEXT = THAI * 20 + "\n\n" + "Listen first, then ask open questions. " * 15
+
+
+@pytest.mark.parametrize("max_tokens", [20, 60, 100])
+def test_char_chunks_fit_max_characters(max_tokens):
+    chunks = list(get_chunker("chars", max_tokens=max_tokens, overlap_tokens=10).chunks(TEXT))
+    assert chunks
+    assert max(map(len, chunks)) <= max_tokens
+
+
+@pytest.mark.parametrize("name", ["tokens", "sentences"])
+def test_token_chunks_fit_budget(name):
+    chunks = list(get_chunker(name, max_tokens=40, overlap_tokens=8).chunks(TEXT))
+    assert len(chunks) > 1
+    assert max(map(estimate_tokens, chunks)) <= 40
+
+
+@pytest.mark.parametrize("name", ["chars", "tokens", "sentences"])
+def test_thai_words_are_not_split(name):
+    words = set(THAI.split())
+    for chunk in get_chunker(name, max_tokens=60, overlap_tokens=10).chunks(THAI * 10):
+        assert set(chunk.split()) <= words
+
+
+def test_chunks_overlap_and_cover_the_text():
+    chunks = list(get_chunker("tokens", max_tokens=30, overlap_tokens=10).chunks(TEXT))
+    for previous, following in zip(chunks, chunks[1:]):
+        assert following.split()[0] in previous.split()
+    assert set(" ".join(chunks).split()) == set(TEXT.split())
+
+
+@pytest.mark.parametrize("name", ["chars", "tokens", "sentences"])
+def test_separators_inside_a_chunk_are_kept(name):
+    text = "Title:\n\n1. First point.\n\nSecond para here. ความต้องการ ของลูกค้า\n\nต่อท้าย"
+    assert list(get_chunker(name).chunks(text)) == [text]
+
+
+def test_sentence_chunks_keep_paragraph_breaks_after_overlap():
+    text = "Alpha beta gamma delta.\n\nEpsilon zeta eta theta iota.\n\nKappa lambda mu nu xi."
+    chunks = list(get_chunker("sentences", max_tokens=12, overlap_tokens=4).chunks(text))
+    assert chunks[0] == "Alpha beta gamma delta."
+    assert all("\n\n" in chunk for chunk in chunks[1:])
+    assert not any(".Epsilon" in chunk or ".Kappa" in chunk for chunk in chunks)
+
+
+def test_word_longer_than_a_chunk_is_cut_at_syllables():
+    chunks = list(get_chunker("chars", max_tokens=16, overlap_tokens=0).chunks("ความต้องการที่แท้จริงของลูกค้า"))
+    assert "".join(chunks) == "ความต้องการที่แท้จริงของลูกค้า"
+    assert all(len(c) <= 16 and c[0] not in "ัิีึืุู่้๊๋์" for c in chunks)
+
+
+def test_unknown_chunker():
+    with pytest.raises(ValueError):
+        get_chunker("paragraphs")
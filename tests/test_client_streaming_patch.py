@@ -0,0 +1,43 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import adk_client_streaming_patch
+from a2a.types import Artifact, DataPart, Part, Task, TaskArtifactUpdateEvent, TaskState, TaskStatus, TextPart
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
+
+TASK = Task(id="task-1", context_id="ctx-1", status=TaskStatus(state=TaskState.working))
+
+
+def chunk(*parts) -> tuple:
+    update = TaskArtifactUpdateEvent(
+        task_id="task-1", context_id="ctx-1", append=True, last_chunk=False,
+        artifact=Artifact(artifact_id="artifact-1", parts=[Part(root=p) for p in parts]),
+    )
+    return TASK, update
+
+
+def convert(responses, invocation_id: str = "inv-1") -> list:
+    agent = RemoteA2aAgent(name="travel_agent", agent_card="http://localhost:8001/.well-known/agent-card.json")
+    ctx = SimpleNamespace(invocation_id=invocation_id, branch="root.travel_agent")
+
+    async def scenario():
+        adk_client_streaming_patch._delegation_clock[invocation_id] = [time.perf_counter(), None]
+        try:
+            return [await agent._handle_a2a_response(r, ctx) for r in responses]
+        finally:
+            adk_client_streaming_patch._delegation_clock.pop(invocation_id, None)
+            adk_client_streaming_patch._event_templates.pop(invocation_id, None)
+
+    return asyncio.run(scenario())
+
+
+def test_partial_artifacts_become_partial_events():
+    events = convert([chunk(TextPart(text="ที่พัก")), chunk(TextPart(text="ใกล้ "), DataPart(data={"x": 1}), TextPart(text="BTS"))])
+
+    assert [e.content.parts[0].text for e in events] == ["ที่พัก", "ใกล้ BTS"]
+    assert all(len(e.content.parts) == 1 for e in events)
+    assert all(e.partial and e.author == "travel_agent" and e.branch == "root.travel_agent" for e in events)
+    assert all(e.invocation_id == "inv-1" and e.content.role == "model" for e in events)
+    # every event is its own object, not the shared template
+    assert events[0].id != events[1].id and events[0].content is not events[1].content
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import fastapi_app
+from sse_writer import format_sse
+from stream_resume import TurnRegistry
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_stream(user_id, session_id, message):
+        for text in (message, "more", "end"):
+            yield format_sse({"type": "text", "content": text, "session_id": session_id})
+        yield format_sse({"type": "done"})
+
+    monkeypatch.setattr(fastapi_app, "stream_agent_response", fake_stream)
+    monkeypatch.setattr(fastapi_app, "turns", TurnRegistry())
+    monkeypatch.setattr(fastapi_app, "session_service", object())
+    with TestClient(fastapi_app.app) as client:
+        yield client
+
+
+def events(response) -> list[tuple[str | None, dict]]:
+    """(event id, data) of every SSE frame in the response"""
+    parsed = []
+    for frame in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n") if ": " in line)
+        parsed.append((lines.get("id"), json.loads(lines["data"])))
+    return parsed
+
+
+def texts(response) -> list[str]:
+    return [data["content"] for _, data in events(response) if data["type"] == "text"]
+
+
+def test_last_event_id_of_an_earlier_turn_starts_a_new_turn(client):
+    first = client.post("/chat/stream", json={"message": "first", "session_id": "s1"})
+    client.post("/chat/stream", json={"message": "second", "session_id": "s1"})
+
+    third = client.post("/chat/stream", json={"message": "third", "session_id": "s1"},
+                        headers={"Last-Event-ID": events(first)[0][0]})
+    assert texts(third) == ["third", "more", "end"]
+
+    forged = client.post("/chat/stream", json={"message": "fourth", "session_id": "s1"},
+                         headers={"Last-Event-ID": "not-an-event"})
+    assert texts(forged) == ["fourth", "more", "end"]
+
+
+def test_last_event_id_of_the_current_turn_resumes_it(client):
+    first = client.post("/chat/stream", json={"message": "first", "session_id": "s1"})
+    seen = events(first)[0][0]
+
+    resumed = client.post("/chat/stream", json={"message": "ignored", "session_id": "s1"},
+                          headers={"Last-Event-ID": seen})
+    assert texts(resumed) == ["more", "end"]
+
+
+def test_session_header_wins_over_the_body(client):
+    response = client.post("/chat/stream", json={"message": "hi", "session_id": "from-body"},
+                           headers={"X-Session-Id": "from-router"})
+    assert response.headers["X-Session-Id"] == "from-router"
+    assert {data.get("session_id") for _, data in events(response) if data["type"] == "text"} == {"from-router"}
+    assert fastapi_app.turns.get("from-router") and not fastapi_app.turns.get("from-body")
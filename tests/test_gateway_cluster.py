@@ -0,0 +1,36 @@
+from collections import Counter
+
+import pytest
+
+from gateway_cluster import ConsistentHashRing
+
+WORKERS = [f"http://127.0.0.1:{port}" for port in range(9100, 9104)]
+SESSIONS = [f"session-{i}" for i in range(4000)]
+
+
+def test_sessions_stay_on_one_worker_and_spread_evenly():
+    ring = ConsistentHashRing(WORKERS)
+    placement = {s: ring.get(s) for s in SESSIONS}
+    assert placement == {s: ConsistentHashRing(WORKERS).get(s) for s in SESSIONS}
+
+    load = Counter(placement.values())
+    assert set(load) == set(WORKERS)
+    assert max(load.values()) < 1.5 * len(SESSIONS) / len(WORKERS)
+
+
+def test_adding_a_worker_only_moves_its_share():
+    ring = ConsistentHashRing(WORKERS)
+    before = {s: ring.get(s) for s in SESSIONS}
+    ring.add("http://127.0.0.1:9104")
+    moved = [s for s in SESSIONS if ring.get(s) != before[s]]
+
+    assert all(ring.get(s) == "http://127.0.0.1:9104" for s in moved)
+    assert 0.1 < len(moved) / len(SESSIONS) < 0.3
+
+    ring.remove("http://127.0.0.1:9104")
+    assert {s: ring.get(s) for s in SESSIONS} == before
+
+
+def test_empty_ring():
+    with pytest.raises(LookupError):
+        ConsistentHashRing([]).get("session-1")
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from hybrid_search import (
+    BM25Index, HybridRetriever, hybrid_search_tool, local_dense_search, reciprocal_rank_fusion, tokenize,
+)
+from local_index import HashingEmbedder, LocalVectorIndex
+
+RECORDS = [
+    {"_id": "a", "content": "closing techniques for sales calls", "category": "sales_skills"},
+    {"_id": "b", "content": "handling price objections in sales", "category": "objection_handling"},
+    {"_id": "c", "content": "SKU-4471 warranty terms", "category": "product"},
+    {"_id": "d", "content": "sales sales sales pipeline review", "category": "sales_skills"},
+]
+
+
+def hit(record_id: str, score: float = 1.0) -> dict:
+    return {"_id": record_id, "_score": score, "fields": {"content": record_id}}
+
+
+@pytest.fixture
+def bm25(tmp_path):
+    index = BM25Index.build(tmp_path / "bm25", [dict(r) for r in RECORDS])
+    yield index
+    index.close()
+
+
+def test_tokenize_lowercases_and_splits_words():
+    assert list(tokenize("Closing, SKU-4471!")) == ["closing", "sku", "4471"]
+    thai = list(tokenize("การขาย"))
+    assert thai and all(token.strip() for token in thai)
+
+
+def test_bm25_ranks_rare_terms_first(bm25):
+    hits = bm25.search("4471 sales", top_k=2)
+    assert hits[0]["_id"] == "c"
+    assert hits[0]["fields"] == {"content": "SKU-4471 warranty terms", "category": "product"}
+    assert len(hits) == 2
+
+
+def test_bm25_filter_and_unknown_terms(bm25):
+    hits = bm25.search("sales", top_k=10, filter={"category": {"$eq": "sales_skills"}})
+    assert {h["_id"] for h in hits} == {"a", "d"}
+    assert bm25.search("nothing-matches-zzz") == []
+
+
+def test_bm25_empty_index(tmp_path):
+    index = BM25Index.build(tmp_path / "empty", [])
+    try:
+        assert index.search("sales") == []
+    finally:
+        index.close()
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[hit("x"), hit("y")], [hit("y"), hit("z")]], k=60)
+    assert [h["_id"] for h in fused] == ["y", "x", "z"]
+    assert fused[0]["_score"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[1]["_score"] == pytest.approx(1 / 61)
+
+
+class ReverseReranker:
+    def __init__(self):
+        self.seen = []
+
+    async def rerank(self, query, hits, text_field="content"):
+        self.seen = [h["_id"] for h in hits]
+        return [float(i) for i in range(len(hits))]
+
+
+def test_retriever_fuses_then_reranks(bm25):
+    async def dense(text, top_k, filter):
+        return [hit("b", 0.9), hit("a", 0.8)]
+
+    reranker = ReverseReranker()
+    retriever = HybridRetriever(bm25, dense, reranker=reranker, candidates=3)
+    hits = asyncio.run(retriever.search("sales", top_k=2))
+
+    assert len(reranker.seen) == 3
+    assert [h["_id"] for h in hits] == list(reversed(reranker.seen))[:2]
+    assert hits[0]["_score"] == 2.0
+
+
+def test_tool_requires_a_query_and_filters_by_category(bm25):
+    async def dense(text, top_k, filter):
+        assert filter == {"category": {"$eq": "product"}}
+        return []
+
+    tool = hybrid_search_tool(HybridRetriever(bm25, dense))
+
+    async def call(**args):
+        return await tool.run_async(args=args, tool_context=None)
+
+    assert asyncio.run(call(query="  ")) == {"error": "query is required"}
+    result = asyncio.run(call(query="warranty", category="product"))
+    assert [h["_id"] for h in result["result"]["hits"]] == ["c"]
+
+
+class SlowEmbedder(HashingEmbedder):
+    """Blocks like a model forward pass and records how many embeds overlap."""
+
+    def __init__(self):
+        super().__init__()
+        self.running = self.peak = 0
+        self.lock = threading.Lock()
+
+    def embed(self, texts, kind="passage"):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(0.05)
+            return super().embed(texts, kind)
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def test_local_dense_search_runs_off_the_event_loop(tmp_path):
+    index = LocalVectorIndex.build(tmp_path / "dense", [dict(r) for r in RECORDS], HashingEmbedder())
+    embedder = SlowEmbedder()
+    search = local_dense_search(index, embedder)
+
+    async def scenario():
+        return await asyncio.gather(*(search(text, 2, None) for text in ("sales", "warranty", "price", "closing")))
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        index.close()
+    assert embedder.peak > 1
+    assert results[1][0]["_id"] == "c"
+    assert results[1][0]["fields"]["category"] == "product"
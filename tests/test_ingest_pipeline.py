@@ -0,0 +1,109 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import ingest_data
+from chunking import get_chunker
+from ingest_manifest import IngestManifest
+
+
+class ApiError(Exception):
+    def __init__(self, status):
+        super().__init__(f"status {status}")
+        self.status = status
+
+
+class SlowIndex:
+    """Records upserts, tracks how many run at once and fails the upserts listed in ``fail_on``."""
+
+    def __init__(self, fail_on=()):
+        self.records = {}
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+        self.fail_on = set(fail_on)
+        self._lock = threading.Lock()
+
+    def upsert_records(self, namespace, records):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            time.sleep(0.02)
+            if call in self.fail_on:
+                raise ApiError(400)
+            with self._lock:
+                self.records.update((record["_id"], record) for record in records)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def delete(self, ids, namespace):
+        for record_id in ids:
+            self.records.pop(record_id, None)
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_data, "CHUNKER", get_chunker("chars", max_tokens=40, overlap_tokens=0))
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.json"
+        content = " ".join(f"ประโยคที่ {i} ของเอกสาร {name}" for i in range(10))
+        path.write_text(json.dumps({"title": name, "category": "test", "content": content}, ensure_ascii=False))
+        paths.append(path)
+    return paths
+
+
+def run(index, files, manifest_path, workers=3):
+    manifest = IngestManifest(manifest_path)
+    try:
+        plan = ingest_data.SyncPlan(manifest)
+        return asyncio.run(ingest_data.run_pipeline(index, files, plan, workers=workers, batch_size=4))
+    finally:
+        manifest.close()
+
+
+def test_batches_are_upserted_concurrently(files, tmp_path):
+    index = SlowIndex()
+    totals = run(index, files, tmp_path / "manifest.db")
+    assert totals["records"] == len(index.records)
+    assert totals["batches"] == index.calls > 3
+    assert index.peak == 3
+
+
+def test_failed_run_resumes_with_the_unacknowledged_batches(files, tmp_path):
+    index = SlowIndex(fail_on={2})
+    with pytest.raises(ApiError):
+        run(index, files, tmp_path / "manifest.db")
+    first_run = len(index.records)
+
+    index.fail_on.clear()
+    totals = run(index, files, tmp_path / "manifest.db")
+    # batches that landed while the run was stopping may be sent again, acknowledged ones are not
+    assert len(index.records) - first_run <= totals["records"] < len(index.records)
+    assert {record["title"] for record in index.records.values()} == {"a", "b", "c"}
+
+
+def test_throttling_is_retried_and_client_errors_are_not(monkeypatch):
+    monkeypatch.setattr(ingest_data.random, "uniform", lambda low, high: 0)
+    attempts = []
+
+    def flaky(status):
+        attempts.append(status)
+        if len(attempts) < 3:
+            raise ApiError(status)
+        return "ok"
+
+    assert asyncio.run(ingest_data.call_with_retry("upsert", flaky, 429)) == "ok"
+    assert attempts == [429, 429, 429]
+
+    attempts.clear()
+    with pytest.raises(ApiError):
+        asyncio.run(ingest_data.call_with_retry("upsert", flaky, 400))
+    assert attempts == [400]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+import ingest_data
+from chunking import get_chunker
+from ingest_manifest import IngestManifest
+
+
+class FakeIndex:
+    def __init__(self):
+        self.records = {}
+        self.failing_deletes = 0
+
+    def upsert_records(self, namespace, records):
+        self.records.update((record["_id"], record) for record in records)
+
+    def delete(self, ids, namespace):
+        if self.failing_deletes:
+            self.failing_deletes -= 1
+            raise RuntimeError("delete failed")
+        for record_id in ids:
+            self.records.pop(record_id, None)
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_data, "CHUNKER", get_chunker("chars", max_tokens=40, overlap_tokens=0))
+    data = tmp_path / "sample_data"
+    data.mkdir()
+    return data, tmp_path / "manifest.db"
+
+
+def write_doc(folder, name, sentences):
+    content = " ".join(f"ประโยคที่ {i} ของเอกสารตัวอย่างนี้" for i in range(sentences))
+    path = folder / f"{name}.json"
+    path.write_text(json.dumps({"title": name, "category": "test", "content": content}, ensure_ascii=False))
+    return path
+
+
+def sync(index, folder, manifest_path):
+    manifest = IngestManifest(manifest_path)
+    plan = ingest_data.SyncPlan(manifest)
+    try:
+        files = sorted(folder.glob("*.json"))
+        return plan, asyncio.run(ingest_data.run_pipeline(index, files, plan, workers=2, batch_size=3))
+    finally:
+        manifest.close()
+
+
+def test_rerun_skips_unchanged_documents(workspace):
+    folder, manifest_path = workspace
+    write_doc(folder, "a", 12)
+    index = FakeIndex()
+    _, totals = sync(index, folder, manifest_path)
+    assert totals["records"] == len(index.records) > 3
+
+    plan, totals = sync(index, folder, manifest_path)
+    assert totals == {"records": 0, "batches": 0, "deleted": 0}
+    assert plan.unchanged_docs == 1
+
+
+def test_failed_orphan_delete_is_retried_on_next_run(workspace):
+    folder, manifest_path = workspace
+    write_doc(folder, "a", 12)
+    index = FakeIndex()
+    sync(index, folder, manifest_path)
+    before = set(index.records)
+
+    write_doc(folder, "a", 4)
+    index.failing_deletes = 1
+    with pytest.raises(RuntimeError):
+        sync(index, folder, manifest_path)
+    assert set(index.records) == before
+
+    # The shrunken document must not look unchanged until its orphans are gone
+    _, totals = sync(index, folder, manifest_path)
+    assert totals["deleted"] == len(before) - len(index.records) > 0
+    assert all(record["total_chunks"] == len(index.records) for record in index.records.values())
+
+    plan, totals = sync(index, folder, manifest_path)
+    assert plan.unchanged_docs == 1 and totals["deleted"] == 0
+
+
+def test_removed_document_is_deleted(workspace):
+    folder, manifest_path = workspace
+    write_doc(folder, "a", 4)
+    removed = write_doc(folder, "b", 4)
+    index = FakeIndex()
+    sync(index, folder, manifest_path)
+
+    removed.unlink()
+    _, totals = sync(index, folder, manifest_path)
+    assert totals["deleted"] > 0
+    assert {record["title"] for record in index.records.values()} == {"a"}
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import httpx
+
+from adk_extensions import line_delivery
+from adk_extensions.line_delivery import LineDeliveryQueue, LineDeliveryToolset, _Delivery
+from adk_extensions.metrics import REGISTRY
+
+
+def text(value: str) -> dict:
+    return {"type": "text", "text": value}
+
+
+def make_queue(handler) -> LineDeliveryQueue:
+    queue = LineDeliveryQueue("token", batch_window_ms=1, base_backoff=0.001, max_retries=1)
+    queue._client = httpx.AsyncClient(base_url="https://line.test", transport=httpx.MockTransport(handler))
+    return queue
+
+
+def test_plan_combines_messages_and_multicasts_shared_batches():
+    deliveries = [_Delivery("a", [text(str(i))]) for i in range(7)]
+    deliveries += [_Delivery("b", [text("hi")]), _Delivery("c", [text("hi")])]
+    waves = LineDeliveryQueue.plan(deliveries)
+
+    assert [(e, r, len(m)) for e, r, m, _ in waves[0]] == [("push", ["a"], 5), ("multicast", ["b", "c"], 1)]
+    assert [(e, r, len(m)) for e, r, m, _ in waves[1]] == [("push", ["a"], 2)]
+
+
+def test_worker_survives_an_unexpected_error():
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if body["messages"][0]["text"] == "boom":
+            raise RuntimeError("unexpected")
+        sent.append((body["to"], [m["text"] for m in body["messages"]]))
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        queue = make_queue(handler)
+        queue.enqueue("a", [text("boom")])
+        queue.enqueue("b", [text(str(i)) for i in range(7)])
+        worker = queue._worker
+        await asyncio.wait_for(queue._queue.join(), 1)
+        queue.enqueue("a", [text("after")])
+        await asyncio.wait_for(queue._queue.join(), 1)
+        same_worker = queue._worker is worker
+        await queue.close()
+        return same_worker
+
+    assert asyncio.run(scenario())
+    # b's second wave still goes out after a's push failed in the first one
+    assert sent == [("b", ["0", "1", "2", "3", "4"]), ("b", ["5", "6"]), ("a", ["after"])]
+
+
+def test_retries_server_errors_with_the_same_retry_key():
+    keys = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        keys.append(request.headers["X-Line-Retry-Key"])
+        return httpx.Response(503 if len(keys) == 1 else 200, json={})
+
+    async def scenario():
+        queue = make_queue(handler)
+        queue.enqueue("a", [text("hi")])
+        await asyncio.wait_for(queue._queue.join(), 1)
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert len(keys) == 2 and keys[0] == keys[1]
+
+
+def test_tools_require_a_recipient(monkeypatch):
+    monkeypatch.delenv("DESTINATION_USER_ID", raising=False)
+
+    async def scenario():
+        queue = make_queue(lambda request: httpx.Response(200, json={}))
+        tools = {tool.name: tool for tool in await LineDeliveryToolset(queue).get_tools()}
+        missing = await tools["push_text_message"].run_async(args={"text": "hi"}, tool_context=None)
+        queued = await tools["push_text_message"].run_async(args={"text": "hi", "user_id": "a"}, tool_context=None)
+        await queue.close()
+        return missing, queued
+
+    missing, queued = asyncio.run(scenario())
+    assert "error" in missing
+    assert queued == {"status": "queued"}
+
+
+def test_queue_depth_gauge_covers_every_queue(monkeypatch):
+    monkeypatch.setattr(line_delivery, "_queues", [])
+
+    async def scenario():
+        first, second = LineDeliveryQueue("token"), LineDeliveryQueue("token")
+        for queue, count in ((first, 1), (second, 2)):
+            queue._queue = asyncio.Queue()
+            for i in range(count):
+                queue._queue.put_nowait(_Delivery("a", [text(str(i))]))
+        depth = [line for line in REGISTRY.render().splitlines() if line.startswith("line_delivery_queue_depth ")]
+        second._queue = None
+        await second.close()
+        return depth, line_delivery._queues == [first]
+
+    assert asyncio.run(scenario()) == (["line_delivery_queue_depth 3"], True)
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from adk_extensions.line_flex import (
+    MAX_ALT_TEXT_CHARS,
+    MAX_CAROUSEL_BUBBLES,
+    FlexMessageError,
+    build_listing_carousel,
+    listing_carousel_tool,
+    repair_flex_before_tool,
+    repair_flex_message,
+)
+
+
+def listing(i: int, **extra) -> dict:
+    return {"name": f"คอนโดริมแม่น้ำ {i}", "price": "฿1,200 / คืน", "rating": "4.9", "url": f"https://airbnb.com/rooms/{i}", **extra}
+
+
+def test_carousel_is_capped_and_skips_unsafe_urls():
+    listings = [listing(i) for i in range(15)]
+    listings[0]["image_url"] = "http://insecure.example/photo.jpg"
+    listings[1]["image_url"] = "https://a0.muscache.com/photo.jpg"
+    message = build_listing_carousel(listings, alt_text="")
+
+    bubbles = message["contents"]["contents"]
+    assert len(bubbles) == MAX_CAROUSEL_BUBBLES
+    assert "hero" not in bubbles[0] and bubbles[1]["hero"]["url"].startswith("https://")
+    assert message["altText"] == "คอนโดริมแม่น้ำ 0"
+    assert all(t["wrap"] for b in bubbles for t in b["body"]["contents"])
+
+
+def test_no_listings_is_an_error():
+    with pytest.raises(FlexMessageError):
+        build_listing_carousel([], alt_text="ที่พัก")
+
+
+def test_repair_fixes_what_it_can():
+    message = {
+        "altText": "x" * 500,
+        "contents": (
+            '{"type": "bubble", "body": {"type": "box", "layout": "diagonal", "contents": ['
+            '{"type": "text", "text": ""}, {"type": "text", "text": "ที่พักแนะนำ"},'
+            '{"type": "image", "url": "http://example.com/a.png"},'
+            '{"type": "button", "action": {"type": "uri", "uri": "https://airbnb.com", "label": "' + "ก" * 50 + '"}}]}}'
+        ),
+    }
+    repaired, fixes = repair_flex_message(message)
+
+    body = repaired["contents"]["body"]
+    assert repaired["type"] == "flex" and len(repaired["altText"]) == MAX_ALT_TEXT_CHARS
+    assert body["layout"] == "vertical"
+    assert [c["type"] for c in body["contents"]] == ["text", "button"]
+    assert body["contents"][0]["wrap"] is True
+    assert len(body["contents"][1]["action"]["label"]) == 40
+    assert "parsed contents from a JSON string" in fixes
+
+
+def test_unrepairable_message_is_blocked_before_the_tool():
+    tool = SimpleNamespace(name="push_flex_message")
+    args = {"message": {"altText": "hi", "contents": {"type": "bubble", "body": {"type": "box", "contents": [
+        {"type": "text", "text": " "}]}}}}
+    result = asyncio.run(repair_flex_before_tool(tool, args, None))
+    assert "error" in result
+
+    other = SimpleNamespace(name="push_text_message")
+    assert asyncio.run(repair_flex_before_tool(other, {"message": "not flex"}, None)) is None
+
+
+def test_carousel_tool_reports_a_missing_push_tool():
+    sent = []
+
+    class PushTool(SimpleNamespace):
+        async def run_async(self, args, tool_context):
+            sent.append(args["message"]["altText"])
+            return SimpleNamespace(isError=False, content=[])
+
+    class Toolset:
+        def __init__(self, tools):
+            self.tools = tools
+
+        async def get_tools(self):
+            return self.tools
+
+    async def call(toolset):
+        tool = listing_carousel_tool(toolset)
+        return await tool.run_async(args={"listings": [listing(1)], "alt_text": "ที่พัก"}, tool_context=None)
+
+    filtered = Toolset([SimpleNamespace(name="push_text_message")])
+    assert asyncio.run(call(filtered)) == {"error": "LINE toolset has no push_flex_message tool"}
+    assert asyncio.run(call(Toolset([PushTool(name="push_flex_message")]))) == {"status": "sent", "bubbles": 1}
+    assert sent == ["ที่พัก"]
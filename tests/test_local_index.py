@@ -0,0 +1,113 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from local_index import HashingEmbedder, LocalVectorIndex, matches_filter, search_records_tool
+
+TOPICS = ["การฟังอย่างตั้งใจ", "การปิดการขาย", "การรับมือข้อโต้แย้ง", "การตั้งราคา", "การติดตามลูกค้า"]
+
+
+def make_records(count: int = 120):
+    return [
+        {
+            "_id": f"doc_{i}",
+            "content": f"{TOPICS[i % len(TOPICS)]} บทที่ {i} เทคนิคข้อที่ {i * 7}",
+            "category": "sales_skills" if i % 2 else "objection_handling",
+            "chunk_index": i,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = LocalVectorIndex.build(tmp_path / "index", make_records(), HashingEmbedder(), nlist=4, batch_size=32)
+    yield index
+    index.close()
+
+
+def test_build_then_search_finds_the_record_itself(index):
+    embedder = HashingEmbedder()
+    record = make_records()[37]
+    query = embedder.embed([record["content"]], kind="query")[0]
+
+    rows = index.search(query, top_k=3, nprobe=index.nlist)
+    assert index.record(rows[0][0])["_id"] == "doc_37"
+    assert rows[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert [score for _, score in rows] == sorted((score for _, score in rows), reverse=True)
+
+
+def test_probing_every_list_matches_brute_force(index):
+    embedder = HashingEmbedder()
+    vectors = embedder.embed([r["content"] for r in make_records()])
+    query = embedder.embed(["การปิดการขาย บทที่ 5"], kind="query")[0]
+
+    expected = np.sort(vectors @ query)[::-1][:5]
+    hits = index.search(query, top_k=5, nprobe=index.nlist)
+    assert [score for _, score in hits] == pytest.approx(list(expected), abs=1e-5)
+    assert all(score == pytest.approx(float(vectors[row] @ query), abs=1e-5) for row, score in hits)
+
+
+def test_filtered_search_only_returns_matching_records(index):
+    query = HashingEmbedder().embed(["การตั้งราคา"], kind="query")[0]
+    rows = index.search(query, top_k=10, nprobe=index.nlist, filter={"category": {"$eq": "sales_skills"}})
+    assert len(rows) == 10
+    assert all(index.record(row)["category"] == "sales_skills" for row, _ in rows)
+
+
+def test_empty_index_returns_no_hits(tmp_path):
+    index = LocalVectorIndex.build(tmp_path / "empty", [], HashingEmbedder())
+    try:
+        assert index.count == 0
+        assert index.search(HashingEmbedder().embed(["อะไรก็ได้"])[0]) == []
+    finally:
+        index.close()
+
+
+def test_rebuild_replaces_the_previous_index(index):
+    rebuilt = LocalVectorIndex.build(index.path, make_records(3), HashingEmbedder())
+    try:
+        assert rebuilt.count == 3
+        assert not index.path.with_name(index.path.name + ".tmp").exists()
+    finally:
+        rebuilt.close()
+
+
+@pytest.mark.parametrize("filter, expected", [
+    ({"category": "a"}, True),
+    ({"category": {"$ne": "a"}}, False),
+    ({"category": {"$in": ["a", "b"]}}, True),
+    ({"category": {"$nin": ["a"]}}, False),
+    ({"chunk": {"$gte": 2, "$lt": 3}}, True),
+    ({"chunk": {"$gt": 2}}, False),
+    ({"category": {"$gt": 1}}, False),
+    ({"missing": {"$exists": False}}, True),
+    ({"chunk": {"$exists": False}}, False),
+    ({"$or": [{"category": "b"}, {"chunk": 2}]}, True),
+    ({"$and": [{"category": "a"}, {"chunk": {"$lte": 1}}]}, False),
+])
+def test_matches_filter(filter, expected):
+    assert matches_filter({"category": "a", "chunk": 2}, filter) is expected
+
+
+def test_search_records_tool(index):
+    tool = search_records_tool(index, HashingEmbedder())
+
+    async def call(query, fields=None):
+        args = {"name": "local", "namespace": "", "query": query, "fields": fields}
+        return await tool.run_async(args=args, tool_context=None)
+
+    missing = asyncio.run(call({"topK": 3, "inputs": {}}))
+    assert missing == {"error": "query.inputs.text is required"}
+
+    result = asyncio.run(call({"topK": 3, "inputs": {"text": make_records()[12]["content"]}}, fields=["content"]))
+    hits = result["result"]["hits"]
+    assert len(hits) == 3
+    assert hits[0]["_id"] == "doc_12"
+    assert set(hits[0]["fields"]) == {"content"}
+
+
+def test_embedder_mismatch_is_rejected(index):
+    with pytest.raises(ValueError):
+        search_records_tool(index, HashingEmbedder(dim=256))
@@ -0,0 +1,108 @@
+import asyncio
+
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+
+from adk_extensions.mcp_cache import CachedTool, CachingToolset, ToolResultCache
+
+
+class CountingCall:
+    def __init__(self, result=None, delay: float = 0.01, error: Exception | None = None):
+        self.calls = 0
+        self.result = result if result is not None else {"listings": [1, 2]}
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_identical_calls_share_one_round_trip():
+    async def scenario():
+        cache, call = ToolResultCache(), CountingCall()
+        results = await asyncio.gather(
+            cache.get_or_call("airbnb_search", {"location": "Bangkok", "adults": 2}, 60, call),
+            cache.get_or_call("airbnb_search", {"adults": 2, "location": "Bangkok"}, 60, call),
+        )
+        results.append(await cache.get_or_call("airbnb_search", {"location": "Bangkok", "adults": 2}, 60, call))
+        return cache.stats(), call.calls, results
+
+    stats, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == [{"listings": [1, 2]}] * 3
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 1, 1)
+
+
+def test_errors_are_not_cached():
+    async def scenario():
+        cache = ToolResultCache()
+        error_result = CountingCall(result={"isError": True})
+        await cache.get_or_call("t", {}, 60, error_result)
+        await cache.get_or_call("t", {}, 60, error_result)
+
+        failing = CountingCall(error=RuntimeError("down"))
+        outcomes = await asyncio.gather(
+            cache.get_or_call("u", {}, 60, failing), cache.get_or_call("u", {}, 60, failing), return_exceptions=True,
+        )
+        return error_result.calls, failing.calls, outcomes, cache.stats()["entries"]
+
+    error_calls, failing_calls, outcomes, entries = asyncio.run(scenario())
+    assert error_calls == 2
+    assert failing_calls == 1 and all(isinstance(o, RuntimeError) for o in outcomes)
+    assert entries == 0
+
+
+def test_ttl_expiry_and_lru_eviction():
+    async def scenario():
+        cache, call = ToolResultCache(max_entries=2), CountingCall(delay=0)
+        await cache.get_or_call("t", {"q": "expired"}, 0, call)
+        await cache.get_or_call("t", {"q": "expired"}, 60, call)
+        for q in ("a", "b", "a", "c"):
+            await cache.get_or_call("t", {"q": q}, 60, call)
+        before = call.calls
+        await cache.get_or_call("t", {"q": "a"}, 60, call)
+        await cache.get_or_call("t", {"q": "b"}, 60, call)
+        return call.calls - before
+
+    # "a" was used recently and survives; "b" was evicted when "c" came in
+    assert asyncio.run(scenario()) == 1
+
+
+def test_waiter_retries_when_the_owner_is_cancelled():
+    async def scenario():
+        cache, call = ToolResultCache(), CountingCall(delay=0.05)
+        owner = asyncio.create_task(cache.get_or_call("t", {}, 60, call))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_call("t", {}, 60, call))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await waiter, call.calls
+
+    result, calls = asyncio.run(scenario())
+    assert result == {"listings": [1, 2]} and calls == 2
+
+
+def test_toolset_wraps_only_tools_with_a_ttl():
+    def airbnb_search(location: str) -> dict:
+        """Search."""
+        return {"location": location}
+
+    def airbnb_book(listing_id: str) -> dict:
+        """Book."""
+        return {"booked": listing_id}
+
+    class Tools(BaseToolset):
+        async def get_tools(self, readonly_context=None):
+            return [FunctionTool(airbnb_search), FunctionTool(airbnb_book)]
+
+        async def close(self):
+            pass
+
+    toolset = CachingToolset(Tools(), ttls={"airbnb_search": 60, "airbnb_book": 0})
+    tools = asyncio.run(toolset.get_tools())
+    assert [type(t) is CachedTool for t in tools] == [True, False]
+    assert tools[0]._get_declaration().name == "airbnb_search"
@@ -0,0 +1,44 @@
+import logging
+
+import pytest
+from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+from mcp import StdioServerParameters
+
+from adk_extensions.mcp_gateway import create_mcp_toolset, server_specs
+from adk_extensions.mcp_pool import PooledMCPToolset
+
+AIRBNB = StdioConnectionParams(
+    server_params=StdioServerParameters(
+        command="npx", args=["-y", "@openbnb/mcp-server-airbnb", "--ignore-robots-txt"],
+    ),
+)
+
+
+def test_gateway_url_selects_the_sse_endpoint(monkeypatch, caplog):
+    monkeypatch.setenv("MCP_GATEWAY_URL", "http://gateway:8090/")
+    with caplog.at_level(logging.WARNING, logger="adk_extensions.mcp_gateway"):
+        toolset = create_mcp_toolset("airbnb", connection_params=AIRBNB)
+    assert toolset._connection_params.url == "http://gateway:8090/airbnb/sse"
+    assert AIRBNB == server_specs()["airbnb"]
+    assert not caplog.records
+
+
+def test_gateway_warns_about_ignored_connection_params(monkeypatch, caplog):
+    monkeypatch.setenv("MCP_GATEWAY_URL", "http://gateway:8090")
+    custom = StdioConnectionParams(
+        server_params=StdioServerParameters(command="npx", args=["-y", "@openbnb/mcp-server-airbnb"]),
+    )
+    with caplog.at_level(logging.WARNING, logger="adk_extensions.mcp_gateway"):
+        create_mcp_toolset("airbnb", connection_params=custom)
+    assert "ignored" in caplog.text
+
+
+def test_gateway_rejects_servers_it_cannot_host(monkeypatch):
+    monkeypatch.setenv("MCP_GATEWAY_URL", "http://gateway:8090")
+    with pytest.raises(ValueError):
+        create_mcp_toolset("weather", connection_params=AIRBNB)
+
+
+def test_without_gateway_uses_a_local_pool(monkeypatch):
+    monkeypatch.delenv("MCP_GATEWAY_URL", raising=False)
+    assert isinstance(create_mcp_toolset("airbnb", connection_params=AIRBNB, pool_size=1), PooledMCPToolset)
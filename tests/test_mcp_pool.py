@@ -0,0 +1,77 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+from mcp import StdioServerParameters
+
+from adk_extensions.mcp_pool import MCPServerPool
+
+SERVER = os.path.join(os.path.dirname(__file__), "mcp_echo_server.py")
+
+
+def make_pool(size: int = 1) -> MCPServerPool:
+    params = StdioConnectionParams(
+        server_params=StdioServerParameters(command=sys.executable, args=[SERVER]), timeout=20,
+    )
+    return MCPServerPool(params, size=size, name="echo", errlog=open(os.devnull, "w"), health_interval=60, ping_timeout=10)
+
+
+def text_of(result) -> str:
+    return result.content[0].text
+
+
+def test_round_robin_over_warm_servers():
+    async def scenario():
+        pool = make_pool(size=2)
+        try:
+            await pool.warm_up()
+            sessions = [await pool.create_session() for _ in range(3)]
+            answers = [text_of(await s.call_tool("echo", {"text": "hi"})) for s in sessions]
+            return pool.healthy_count, sessions, answers
+        finally:
+            await pool.close()
+
+    healthy, sessions, answers = asyncio.run(scenario())
+    assert healthy == 2
+    assert sessions[0] is sessions[2] and sessions[0] is not sessions[1]
+    assert answers == ["hi"] * 3
+
+
+def test_crashed_server_is_taken_out_and_restarted():
+    async def scenario():
+        pool = make_pool()
+        try:
+            await pool.warm_up()
+            session = await pool.create_session()
+            try:
+                await session.call_tool("crash", {})
+            except Exception:
+                pass
+            healthy_after_crash = pool.healthy_count
+            replacement = await asyncio.wait_for(pool.create_session(), 30)
+            answer = text_of(await replacement.call_tool("echo", {"text": "back"}))
+            return healthy_after_crash, replacement is not session, answer
+        finally:
+            await pool.close()
+
+    assert asyncio.run(scenario()) == (0, True, "back")
+
+
+def test_server_that_cannot_start_fails_the_call():
+    async def scenario():
+        params = StdioConnectionParams(server_params=StdioServerParameters(command="/nonexistent-bin"), timeout=5)
+        pool = MCPServerPool(
+            params, size=1, name="broken", errlog=open(os.devnull, "w"), ping_timeout=0.2, wait_timeout=1,
+        )
+        started = time.perf_counter()
+        try:
+            with pytest.raises(ConnectionError, match="broken"):
+                await asyncio.wait_for(pool.create_session(), 10)
+            return time.perf_counter() - started
+        finally:
+            await pool.close()
+
+    assert asyncio.run(scenario()) < 5
@@ -0,0 +1,63 @@
+import json
+
+from mcp import types as mcp_types
+
+from adk_extensions.mcp_projection import Projection, airbnb_projections, project_result
+
+SEARCH = {
+    "searchUrl": "https://www.airbnb.com/s/Bangkok/homes",
+    "searchResults": [
+        {
+            "id": str(i),
+            "url": f"https://www.airbnb.com/rooms/{i}",
+            "badges": ["Guest favourite"],
+            "demandStayListing": {"description": {"name": "Condo " + "x" * 400}, "location": {"lat": 13.7}},
+            "structuredContent": {"primaryLine": "2 beds", "mapCategoryInfo": [{"body": "noise"}]},
+        }
+        for i in range(8)
+    ],
+    "paginationInfo": {"nextPageCursor": "abc", "pageCursors": ["a", "b"]},
+}
+
+
+def call_result(data, **kwargs) -> mcp_types.CallToolResult:
+    return mcp_types.CallToolResult(content=[mcp_types.TextContent(type="text", text=json.dumps(data, indent=2))], **kwargs)
+
+
+def test_keeps_allowlisted_fields_first_items_and_short_strings():
+    projected = Projection(
+        fields=("searchUrl", "searchResults.id", "searchResults.demandStayListing.description", "paginationInfo.nextPageCursor"),
+        top_k=3,
+        max_chars=20,
+    ).apply(SEARCH)
+
+    assert list(projected) == ["searchUrl", "searchResults", "paginationInfo"]
+    assert projected["searchUrl"] == SEARCH["searchUrl"][:20] + "…"
+    assert [r["id"] for r in projected["searchResults"]] == ["0", "1", "2"]
+    assert projected["searchResults"][0]["demandStayListing"] == {"description": {"name": "Condo " + "x" * 14 + "…"}}
+    assert projected["paginationInfo"] == {"nextPageCursor": "abc"}
+
+
+def test_empty_fields_only_applies_the_caps():
+    assert Projection(top_k=1, max_chars=3).apply({"a": ["long", "b"], "n": 1}) == {"a": ["lon…"], "n": 1}
+
+
+def test_call_result_text_is_projected_and_compacted():
+    projection = airbnb_projections()["airbnb_search"]
+    result = project_result("airbnb_search", call_result(SEARCH), projection)
+    text = result.content[0].text
+    data = json.loads(text)
+
+    assert "\n" not in text and len(text) < len(json.dumps(SEARCH, indent=2)) / 2
+    assert len(data["searchResults"]) == projection.top_k
+    assert "badges" not in data["searchResults"][0]
+    assert data["searchResults"][0]["structuredContent"] == {"primaryLine": "2 beds"}
+
+
+def test_errors_and_non_json_pass_through():
+    error = call_result(SEARCH, isError=True)
+    assert project_result("airbnb_search", error, Projection(top_k=1)) is error
+
+    plain = mcp_types.CallToolResult(content=[mcp_types.TextContent(type="text", text="no listings found")])
+    assert project_result("airbnb_search", plain, Projection(top_k=1)).content[0].text == "no listings found"
+    assert project_result("airbnb_search", {"error": "x"}, Projection()) == {"error": "x"}
@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.adk.tools.mcp_tool.mcp_tool import McpTool
+from mcp import types as mcp_types
+
+from adk_extensions.metrics import REGISTRY, Registry, instrument_mcp_tools
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("stage_seconds", "Stage latency.", labelnames=("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="llm")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP stage_seconds Stage latency.", "# TYPE stage_seconds histogram"]
+    assert lines[2:] == [
+        'stage_seconds_bucket{stage="llm",le="0.1"} 1',
+        'stage_seconds_bucket{stage="llm",le="1"} 3',
+        'stage_seconds_bucket{stage="llm",le="+Inf"} 4',
+        'stage_seconds_sum{stage="llm"} 6.05',
+        'stage_seconds_count{stage="llm"} 4',
+    ]
+
+
+def test_timer_marks_errors_when_the_histogram_has_a_status_label():
+    registry = Registry()
+    histogram = registry.histogram("call_seconds", "Calls.", labelnames=("tool", "status"))
+    with pytest.raises(ValueError):
+        with histogram.time(tool="search", status="ok"):
+            raise ValueError("failed")
+    with histogram.time(tool="search", status="ok"):
+        pass
+
+    text = registry.render()
+    assert 'call_seconds_count{tool="search",status="error"} 1' in text
+    assert 'call_seconds_count{tool="search",status="ok"} 1' in text
+
+
+def test_counter_gauge_and_label_escaping():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests.", labelnames=("path",))
+    assert registry.counter("requests_total", "Requests.", labelnames=("path",)) is counter
+    counter.inc(path='/chat "stream"')
+    counter.inc(2, path='/chat "stream"')
+    registry.gauge("queue_depth", "Queued.", fn=lambda: 3)
+    registry.gauge("in_flight", "Per user.", labelnames=("user",), fn=lambda: {("u1",): 2})
+
+    text = registry.render()
+    assert 'requests_total{path="/chat \\"stream\\""} 3' in text
+    assert "queue_depth 3" in text
+    assert 'in_flight{user="u1"} 2' in text
+
+
+def test_mcp_tool_results_with_is_error_are_counted_as_errors(monkeypatch):
+    async def run_async(self, *, args, tool_context):
+        return mcp_types.CallToolResult(content=[], isError=args["fail"])
+
+    monkeypatch.setattr(McpTool, "run_async", run_async)
+    assert instrument_mcp_tools()
+
+    tool = SimpleNamespace(name="metrics_test_tool")
+    for fail in (True, False, False):
+        asyncio.run(McpTool.run_async(tool, args={"fail": fail}, tool_context=None))
+
+    text = REGISTRY.render()
+    assert 'mcp_tool_call_seconds_count{tool="metrics_test_tool",status="error"} 1' in text
+    assert 'mcp_tool_call_seconds_count{tool="metrics_test_tool",status="ok"} 2' in text
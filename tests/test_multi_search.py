@@ -0,0 +1,97 @@
+import asyncio
+
+from chunking import estimate_tokens
+from multi_search import (
+    MAX_QUERIES, Passage, build_context, join_adjacent, merge_hits, multi_search_tool, rank_passages,
+)
+
+
+def hit(record_id: str, content: str, score: float, **fields) -> dict:
+    return {"_id": record_id, "_score": score, "fields": {"content": content, "title": "T", "category": "c", **fields}}
+
+
+def passage(doc: str, score: float, queries: list, text: str = "text") -> Passage:
+    return Passage(doc=doc, title=doc, category="c", first=0, last=0, total=None, text=text, ids=[doc],
+                   score=score, queries=queries)
+
+
+def test_join_adjacent_drops_the_overlap():
+    assert join_adjacent("the quick brown fox jumps", "brown fox jumps over the dog") == \
+        "the quick brown fox jumps over the dog"
+    # overlap สั้นกว่า probe หรือไม่มีส่วนที่ซ้ำกัน: ต่อด้วยบรรทัดใหม่
+    assert join_adjacent("abc", "abc def") == "abc\nabc def"
+    assert join_adjacent("one two three", "three two one") == "one two three\nthree two one"
+
+
+def test_merge_hits_joins_adjacent_chunks_and_dedupes():
+    results = [
+        [hit("doc_a_chunk_0", "alpha beta gamma", 0.5), hit("doc_a_chunk_1", "beta gamma delta", 0.9)],
+        [hit("doc_a_chunk_1", "beta gamma delta", 0.7), hit("doc_a_chunk_3", "far away", 0.4, total_chunks=4)],
+    ]
+    passages = merge_hits(results)
+
+    assert len(passages) == 2
+    joined, separate = passages
+    assert joined.doc == "doc_a"
+    assert (joined.first, joined.last, joined.ids) == (0, 1, ["doc_a_chunk_0", "doc_a_chunk_1"])
+    assert joined.text == "alpha beta gamma delta"
+    assert joined.score == 0.9
+    assert joined.queries == [0, 1]
+    assert (separate.first, separate.queries) == (3, [1])
+    assert separate.header(2) == "[2] T (c) chunk 4 of 4 | queries 2"
+    assert joined.header(1) == "[1] T (c) chunks 1-2 | queries 1,2"
+
+
+def test_merge_hits_uses_title_when_id_has_no_chunk():
+    passages = merge_hits([[hit("x1", "one", 0.3, title="Guide"), hit("x2", "two", 0.2, title="Guide")]])
+    assert len(passages) == 2
+    assert all(p.doc == "Guide" and p.first == -1 for p in passages)
+    assert passages[0].header(1) == "[1] Guide (c) | queries 1"
+
+
+def test_rank_passages_covers_every_query_first():
+    strong = passage("a", 0.9, [0])
+    strong_too = passage("b", 0.8, [0])
+    weak = passage("c", 0.1, [1])
+    assert rank_passages([strong_too, weak, strong], queries=2) == [strong, weak, strong_too]
+
+
+def test_build_context_respects_the_budget():
+    short = passage("a", 0.9, [0], text="x" * 40)
+    long = passage("b", 0.8, [0], text="y" * 400)
+    tail = passage("c", 0.7, [0], text="z" * 40)
+
+    context, kept, omitted = build_context([short, long, tail], max_tokens=40)
+    assert kept == [short, tail]
+    assert omitted == 1
+    assert estimate_tokens(context) <= 40
+
+    context, kept, omitted = build_context([long], max_tokens=20)
+    assert kept == [long] and omitted == 0
+    assert estimate_tokens(context) <= 20
+    assert context.startswith("[1] b (c) chunk 1 | queries 1\nyyy")
+
+
+def test_search_many_tool():
+    calls = []
+
+    async def search(text, top_k, filter):
+        calls.append((text, top_k, filter))
+        return [hit(f"doc_{text}_chunk_0", f"about {text}", 0.5)]
+
+    tool = multi_search_tool(search, max_tokens=500)
+
+    async def call(**args):
+        return await tool.run_async(args=args, tool_context=None)
+
+    assert asyncio.run(call(queries=[" ", ""])) == {"error": "queries is required"}
+    too_many = [f"q{i}" for i in range(MAX_QUERIES + 1)]
+    assert asyncio.run(call(queries=too_many)) == {"error": f"at most {MAX_QUERIES} queries per call"}
+    assert calls == []
+
+    result = asyncio.run(call(queries=["a", "b", "a"], top_k=99, category="c"))
+    assert calls == [("a", 20, {"category": {"$eq": "c"}}), ("b", 20, {"category": {"$eq": "c"}})]
+    assert result["queries"] == [{"query": "a", "hits": 1}, {"query": "b", "hits": 1}]
+    assert [s["ids"] for s in result["sources"]] == [["doc_a_chunk_0"], ["doc_b_chunk_0"]]
+    assert "about a" in result["context"] and "about b" in result["context"]
+    assert result["omitted"] == 0
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from pinecone_tool import MAX_BATCH_QUERIES, MAX_TOP_K, pinecone_search_tool
+
+
+class FakeIndex:
+    def __init__(self, delay: float = 0.0, fail: str = ""):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def search_records(self, namespace, top_k, inputs, filter, fields):
+        with self.lock:
+            self.calls.append({"namespace": namespace, "top_k": top_k, "text": inputs["text"],
+                               "filter": filter, "fields": fields})
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if inputs["text"] == self.fail:
+                raise RuntimeError("search failed")
+            hits = [
+                SimpleNamespace(id=f"{inputs['text']}_{i}", score=1 / 3 + i, fields={"content": inputs["text"]})
+                for i in range(top_k)
+            ]
+            return SimpleNamespace(
+                result=SimpleNamespace(hits=hits),
+                usage=SimpleNamespace(read_units=1, embed_total_tokens=None),
+            )
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def call(tool, **args):
+    return asyncio.run(tool.run_async(args=args, tool_context=None))
+
+
+def test_single_query():
+    index = FakeIndex()
+    result = call(pinecone_search_tool(index), query=" ปิดการขาย ", top_k=2, category="sales_skills")
+
+    assert index.calls == [{
+        "namespace": "__default__", "top_k": 2, "text": "ปิดการขาย",
+        "filter": {"category": {"$eq": "sales_skills"}}, "fields": ["content", "title", "category"],
+    }]
+    hits = result["result"]["hits"]
+    assert hits[0] == {"_id": "ปิดการขาย_0", "_score": 0.333333, "fields": {"content": "ปิดการขาย"}}
+    assert result["usage"] == {"readUnits": 1, "embedTotalTokens": 0}
+
+
+def test_batch_queries_run_concurrently_and_are_deduplicated():
+    index = FakeIndex(delay=0.05)
+    result = call(pinecone_search_tool(index, namespace="ns"), queries=["a", "b", "a ", "", "c"], top_k=1)
+
+    assert [r["query"] for r in result["results"]] == ["a", "b", "c"]
+    assert [r["hits"][0]["_id"] for r in result["results"]] == ["a_0", "b_0", "c_0"]
+    assert result["usage"]["readUnits"] == 3
+    assert index.peak > 1
+    assert {c["namespace"] for c in index.calls} == {"ns"}
+
+
+def test_top_k_is_clamped():
+    index = FakeIndex()
+    call(pinecone_search_tool(index), query="q", top_k=500)
+    call(pinecone_search_tool(index), query="q", top_k=0)
+    assert [c["top_k"] for c in index.calls] == [MAX_TOP_K, 1]
+
+
+def test_errors():
+    index = FakeIndex(fail="boom")
+    tool = pinecone_search_tool(index)
+
+    assert call(tool, query=" ", queries=[" "]) == {"error": "query or queries is required"}
+    too_many = [f"q{i}" for i in range(MAX_BATCH_QUERIES + 1)]
+    assert call(tool, queries=too_many) == {"error": f"at most {MAX_BATCH_QUERIES} queries per call"}
+    assert index.calls == []
+    assert call(tool, queries=["ok", "boom"]) == {"error": "search failed"}
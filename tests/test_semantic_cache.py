@@ -0,0 +1,102 @@
+import asyncio
+
+from google.adk.tools.function_tool import FunctionTool
+
+import semantic_cache
+from adk_extensions.metrics import REGISTRY
+from ingest_manifest import bump_index_stamp
+from local_index import HashingEmbedder
+from semantic_cache import SemanticQueryCache, key_terms, normalize_query, with_semantic_cache
+
+
+class ParaphraseEmbedder(HashingEmbedder):
+    """Stands in for e5: same vectors as hashing, but trusted for nearest-neighbour hits."""
+
+    semantic = True
+
+
+def make_cache(tmp_path, embedder=None, **kwargs) -> SemanticQueryCache:
+    return SemanticQueryCache(embedder=embedder or HashingEmbedder(), stamp_path=tmp_path / ".index_stamp", **kwargs)
+
+
+def lookup(cache, query, scope="search", namespace=""):
+    return asyncio.run(cache.get(scope, namespace, normalize_query(query)))
+
+
+def remember(cache, query, result, scope="search", namespace=""):
+    outcome, _, vector = lookup(cache, query, scope, namespace)
+    assert outcome == "miss"
+    cache.put(scope, namespace, normalize_query(query), vector, result)
+
+
+def test_normalize_query_ignores_spacing_punctuation_and_polite_endings():
+    assert normalize_query("เทคนิค การปิดการขาย ครับ?") == normalize_query("เทคนิคการปิดการขาย")
+    assert normalize_query("Refund  Policy!") == "refund policy"
+
+
+def test_hashing_embedder_only_serves_exact_matches(tmp_path):
+    cache = make_cache(tmp_path)
+    remember(cache, "what is the refund policy for plan 1", "plan 1 hits")
+
+    assert lookup(cache, "What is the refund policy for plan 1?")[:2] == ("exact", "plan 1 hits")
+    assert lookup(cache, "what is the refund policy for plan 2")[0] == "miss"
+    assert lookup(cache, "เทคนิคการปิดการขายแบบ A")[0] == "miss"
+
+
+def test_semantic_hit_requires_matching_key_terms(tmp_path):
+    cache = make_cache(tmp_path, embedder=ParaphraseEmbedder(), threshold=0.6)
+    remember(cache, "นโยบายคืนเงินของ plan 1 คืออะไร", "plan 1 hits")
+    remember(cache, "เทคนิคการปิดการขายแบบ A", "A hits")
+
+    assert lookup(cache, "นโยบายการคืนเงินของ plan 1 มีอะไรบ้าง")[:2] == ("semantic", "plan 1 hits")
+    assert lookup(cache, "นโยบายคืนเงินของ plan 2 คืออะไร")[0] == "miss"
+    assert lookup(cache, "เทคนิคการปิดการขายแบบ B")[0] == "miss"
+    assert key_terms(normalize_query("ลูกค้าไม่ซื้อแพ็กเกจ 2")) == ("ไม่", "2")
+
+
+def test_scope_namespace_stamp_and_ttl(tmp_path):
+    cache = make_cache(tmp_path)
+    remember(cache, "ปิดการขาย", "ns hits", namespace="sales")
+
+    assert lookup(cache, "ปิดการขาย", scope="other", namespace="sales")[0] == "miss"
+    assert lookup(cache, "ปิดการขาย", namespace="sales")[0] == "exact"
+    bump_index_stamp("sales", tmp_path / ".index_stamp")
+    assert lookup(cache, "ปิดการขาย", namespace="sales")[0] == "miss"
+
+    expired = make_cache(tmp_path, ttl=0)
+    remember(expired, "ปิดการขาย", "old hits")
+    assert lookup(expired, "ปิดการขาย")[0] == "miss"
+
+
+def test_cached_tool_skips_errors_and_calls_through_on_miss(tmp_path):
+    calls = []
+
+    def search_knowledge(query: str, top_k: int = 5) -> dict:
+        calls.append(query)
+        return {"error": "down"} if query == "broken" else {"result": {"hits": [query]}}
+
+    tool = with_semantic_cache(FunctionTool(search_knowledge), make_cache(tmp_path))
+
+    async def run(query, top_k=5):
+        return await tool.run_async(args={"query": query, "top_k": top_k}, tool_context=None)
+
+    async def scenario():
+        assert await run("ปิดการขาย ครับ") == {"result": {"hits": ["ปิดการขาย ครับ"]}}
+        assert await run("ปิดการขาย") == {"result": {"hits": ["ปิดการขาย ครับ"]}}
+        await run("ปิดการขาย", top_k=10)
+        await run("broken")
+        await run("broken")
+
+    asyncio.run(scenario())
+    assert calls == ["ปิดการขาย ครับ", "ปิดการขาย", "broken", "broken"]
+
+
+def test_hit_rate_gauge_covers_every_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "_caches", [])
+    first, second = make_cache(tmp_path), make_cache(tmp_path)
+    remember(first, "นโยบายคืนเงิน", {"hits": [1]})
+    assert lookup(first, "นโยบายคืนเงิน")[0] == "exact"
+    assert lookup(second, "ราคาแพ็กเกจ")[0] == "miss"
+
+    gauge = [line for line in REGISTRY.render().splitlines() if line.startswith("rag_query_cache_hit_rate ")]
+    assert gauge == ["rag_query_cache_hit_rate 0.3333333333333333"]
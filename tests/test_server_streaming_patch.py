@@ -0,0 +1,25 @@
+import time
+
+from remote_agent.travel_manager.adk_streaming_patch import PartialChunkCoalescer
+
+
+def test_text_is_held_until_the_char_budget():
+    coalescer = PartialChunkCoalescer(window_ms=10_000, max_chars=10)
+    assert [coalescer.add("task-1", t) for t in ("ที่พัก", "ใกล้", " BTS")] == [None, "ที่พักใกล้", None]
+    assert coalescer.flush("task-1") == " BTS"
+    assert coalescer.flush("task-1") is None
+
+
+def test_window_releases_slow_streams_per_task():
+    coalescer = PartialChunkCoalescer(window_ms=5, max_chars=1000)
+    assert coalescer.add("task-1", "a") is None
+    assert coalescer.add("task-2", "x") is None
+    time.sleep(0.01)
+    assert coalescer.add("task-1", "b") == "ab"
+    assert coalescer.flush("task-2") == "x"
+
+
+def test_zero_window_disables_coalescing(monkeypatch):
+    monkeypatch.setenv("A2A_COALESCE_WINDOW_MS", "0")
+    assert not PartialChunkCoalescer.from_env().enabled
+    assert PartialChunkCoalescer().enabled
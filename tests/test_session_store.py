@@ -0,0 +1,63 @@
+import asyncio
+import sqlite3
+
+import pytest
+from google.adk.events import Event, EventActions
+
+from session_store import SqliteSessionService
+
+
+def make_event(state_delta: dict) -> Event:
+    return Event(author="user", invocation_id="inv", actions=EventActions(state_delta=state_delta))
+
+
+def run_with_service(tmp_path, scenario, **kwargs):
+    async def main():
+        service = SqliteSessionService(str(tmp_path / "s.db"), batch_size=100, sweep_interval=0, **kwargs)
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def test_events_are_batched_and_read_back(tmp_path):
+    async def scenario(service):
+        session = await service.create_session(app_name="app", user_id="u", session_id="s1")
+        for i in range(3):
+            await service.append_event(session, make_event({"turn": i, "app:seen": True, "user:name": "a"}))
+        return await service.get_session(app_name="app", user_id="u", session_id="s1")
+
+    loaded = run_with_service(tmp_path, scenario)
+    assert len(loaded.events) == 3
+    assert loaded.state == {"turn": 2, "app:seen": True, "user:name": "a"}
+
+
+def test_failed_flush_keeps_the_batch_and_releases_the_connection(tmp_path, monkeypatch):
+    async def scenario(service):
+        session = await service.create_session(app_name="app", user_id="u", session_id="s1")
+        await service.append_event(session, make_event({"turn": 1, "user:name": "a"}))
+        merge = service._merge_scoped_state
+        failed = []
+
+        async def flaky_merge(conn, table, key, delta):
+            if not failed:
+                failed.append(table)
+                # an event appended while the batch is in flight must survive too
+                await service.append_event(session, make_event({"turn": 2}))
+                raise sqlite3.OperationalError("database is locked")
+            return await merge(conn, table, key, delta)
+
+        monkeypatch.setattr(service, "_merge_scoped_state", flaky_merge)
+        with pytest.raises(sqlite3.OperationalError):
+            await service.flush()
+        assert service.pool._idle.qsize() == service.pool.size
+        assert len(service._pending_events) == 2
+        assert service._pending_sessions[("app", "u", "s1")][0] == {"turn": 2}
+        assert service._pending_user_states[("app", "u")] == {"name": "a"}
+        return await service.get_session(app_name="app", user_id="u", session_id="s1")
+
+    loaded = run_with_service(tmp_path, scenario, pool_size=2)
+    assert len(loaded.events) == 2
+    assert loaded.state == {"turn": 2, "user:name": "a"}
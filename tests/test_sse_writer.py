@@ -0,0 +1,52 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from sse_writer import SSEFrameWriter
+
+
+def event(author: str, text: str, partial: bool = True):
+    return SimpleNamespace(author=author, partial=partial, content=SimpleNamespace(parts=[SimpleNamespace(text=text)]))
+
+
+async def agen(items):
+    for item in items:
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def frames(writer: SSEFrameWriter, items) -> list[dict]:
+    async def collect():
+        return [json.loads(frame[len("data: "):]) async for frame in writer.stream(agen(items))]
+
+    return asyncio.run(collect())
+
+
+def summary(result: list[dict]) -> list[tuple]:
+    return [(f["author"], f["content"], f["partial"]) for f in result]
+
+
+def test_partials_are_coalesced_and_final_flushes():
+    items = [event("a", t) for t in ("สวัส", "ดี", " ครับ")] + [event("a", "สวัสดี ครับ", partial=False)]
+    result = frames(SSEFrameWriter(window_ms=1000), items)
+    assert summary(result) == [("a", "สวัสดี ครับ", True), ("a", "สวัสดี ครับ", False)]
+
+
+def test_author_change_and_byte_budget_flush():
+    items = [event("a", "x" * 3), event("a", "y" * 3), event("b", "z")]
+    result = frames(SSEFrameWriter(window_ms=1000, max_bytes=5), items)
+    assert summary(result) == [("a", "xxxyyy", True), ("b", "z", True)]
+
+
+def test_events_without_text_are_skipped():
+    empty = SimpleNamespace(author="a", partial=True, content=None)
+    result = frames(SSEFrameWriter(), [empty, event("a", "hi", partial=False)])
+    assert summary(result) == [("a", "hi", False)]
+
+
+def test_agent_error_is_raised_to_the_caller():
+    with pytest.raises(RuntimeError, match="boom"):
+        frames(SSEFrameWriter(), [event("a", "hi"), RuntimeError("boom")])
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+from stream_resume import TurnInProgressError, TurnRegistry, TurnStream
+
+
+async def frames_of(*texts, error: Exception | None = None):
+    for text in texts:
+        yield f"data: {text}\n\n"
+    if error:
+        raise error
+
+
+def parse(frame: str) -> tuple[str | None, str]:
+    """(event id, data) of one SSE frame"""
+    event_id = None
+    for line in frame.strip().split("\n"):
+        if line.startswith("id: "):
+            event_id = line[len("id: "):]
+        elif line.startswith("data: "):
+            data = line[len("data: "):]
+    return event_id, data
+
+
+async def collect(turn: TurnStream, last_event_id: str | None = None) -> list[tuple]:
+    return [parse(f) async for f in turn.subscribe(last_event_id)]
+
+
+def test_resume_replays_only_missed_frames():
+    async def scenario():
+        turn = TurnStream("s1")
+        await turn.run(frames_of("a", "b", "c"))
+        everything = await collect(turn)
+        resumed = await collect(turn, everything[0][0])
+        other_turn = await collect(turn, "0123456789ab-2")
+        return turn, everything, resumed, other_turn
+
+    turn, everything, resumed, other_turn = asyncio.run(scenario())
+    assert everything == [(f"{turn.turn_id}-{i}", t) for i, t in enumerate("abc", 1)]
+    assert resumed == everything[1:]
+    assert other_turn == everything
+
+
+def test_overwritten_frames_are_reported_as_a_gap():
+    async def scenario():
+        turn = TurnStream("s1", buffer_size=2)
+        await turn.run(frames_of("a", "b", "c", "d", "e"))
+        return await collect(turn, f"{turn.turn_id}-1")
+
+    result = asyncio.run(scenario())
+    assert json.loads(result[0][1]) == {"type": "gap", "missed": 2}
+    assert [data for _, data in result[1:]] == ["d", "e"]
+
+
+def test_live_subscriber_follows_the_turn_and_sees_errors():
+    async def scenario():
+        registry = TurnRegistry()
+        release = asyncio.Event()
+
+        async def slow_frames():
+            yield "data: first\n\n"
+            await release.wait()
+            raise RuntimeError("model failed")
+
+        turn = registry.start("s1", slow_frames())
+        reader = asyncio.create_task(collect(turn))
+        await asyncio.sleep(0.01)
+        with pytest.raises(TurnInProgressError):
+            registry.start("s1", frames_of("again"))
+        release.set()
+        result = await reader
+        await turn.task
+        registry.start("s1", frames_of("next turn"))
+        await registry.close()
+        return result
+
+    result = asyncio.run(scenario())
+    assert result[0][1] == "first"
+    assert json.loads(result[1][1]) == {"type": "error", "message": "model failed"}
@@ -0,0 +1,54 @@
+import asyncio
+
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+
+from adk_extensions.tool_concurrency import ConcurrencyLimitedToolset
+
+
+class Listings(BaseToolset):
+    def __init__(self):
+        super().__init__()
+        self.running = 0
+        self.peak = 0
+
+    async def get_tools(self, readonly_context=None):
+        async def airbnb_listing_details(id: str) -> dict:
+            """Listing details."""
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            try:
+                await asyncio.sleep(0.01)
+                if id == "bad":
+                    raise RuntimeError("listing not found")
+                return {"id": id}
+            finally:
+                self.running -= 1
+
+        return [FunctionTool(airbnb_listing_details)]
+
+    async def close(self):
+        pass
+
+
+def test_calls_beyond_the_limit_wait_for_a_slot():
+    async def scenario():
+        inner = Listings()
+        (tool,) = await ConcurrencyLimitedToolset(inner, name="airbnb", max_concurrency=2).get_tools()
+        ids = ["1", "bad", "2", "3", "4", "5"]
+        results = await asyncio.gather(
+            *(tool.run_async(args={"id": i}, tool_context=None) for i in ids), return_exceptions=True,
+        )
+        return inner.peak, results
+
+    peak, results = asyncio.run(scenario())
+    assert peak == 2
+    # a failing call gives its slot back and the others still run, in the order asked
+    assert isinstance(results[1], RuntimeError)
+    assert [r["id"] for r in results if isinstance(r, dict)] == ["1", "2", "3", "4", "5"]
+
+
+def test_limit_defaults_to_the_environment(monkeypatch):
+    monkeypatch.setenv("MCP_MAX_PARALLEL_CALLS", "1")
+    toolset = ConcurrencyLimitedToolset(Listings(), name="airbnb")
+    assert toolset.max_concurrency == 1